@@ -2,6 +2,7 @@ import json
 from pathlib import Path
 from ingestion.heuristics import detect_gpt_style, detect_citation_pattern, detect_misuse_keywords
 from agents.provenance import emit, input_sha256_text
+from ingestion.ndjson_store import iter_records
 
 AUDITS_DIR = Path("data/audits")
 AUDITS_DIR.mkdir(parents=True, exist_ok=True)
@@ -28,31 +29,29 @@ def classify_text_block(text: str):
 
 def audit_threads(ndjson_path: str, seed: int = 42):
     results = []
-    with open(ndjson_path, "r", encoding="utf-8") as fh:
-        for line in fh:
-            t = json.loads(line)
-            combined = (t.get("title", "") + "\n" + t.get("selftext", "")).strip()
-            audit = classify_text_block(combined)
-            audit_record = {
+    for t in iter_records(ndjson_path):
+        combined = (t.get("title", "") + "\n" + t.get("selftext", "")).strip()
+        audit = classify_text_block(combined)
+        audit_record = {
+            "thread_id": t.get("id"),
+            "subreddit": t.get("subreddit"),
+            "title": t.get("title"),
+            "created_utc": t.get("created_utc"),
+            "flags": audit["flags"],
+            "confidence": audit["confidence"],
+            "evidence": audit["evidence"],
+            "input_sha256": input_sha256_text(combined),
+        }
+        prov = emit(
+            "audit_flagged",
+            {
                 "thread_id": t.get("id"),
                 "subreddit": t.get("subreddit"),
-                "title": t.get("title"),
-                "created_utc": t.get("created_utc"),
-                "flags": audit["flags"],
-                "confidence": audit["confidence"],
-                "evidence": audit["evidence"],
-                "input_sha256": input_sha256_text(combined),
-            }
-            prov = emit(
-                "audit_flagged",
-                {
-                    "thread_id": t.get("id"),
-                    "subreddit": t.get("subreddit"),
-                    "flags": audit_record["flags"],
-                },
-            )
-            audit_record["provenance_id"] = prov["id"]
-            results.append(audit_record)
+                "flags": audit_record["flags"],
+            },
+        )
+        audit_record["provenance_id"] = prov["id"]
+        results.append(audit_record)
     return results
 
 
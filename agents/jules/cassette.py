@@ -0,0 +1,101 @@
+import base64
+import json
+import os
+import threading
+from collections import deque
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# headers that describe the original transfer rather than the stored body
+SKIP_HEADERS = {"content-encoding", "transfer-encoding", "content-length", "connection"}
+
+
+class CassetteMiss(KeyError):
+    pass
+
+
+def dump_response(resp: requests.Response) -> dict:
+    """A response's status, headers and body as JSON-serializable data."""
+    item = {
+        "status": resp.status_code,
+        "headers": {k: v for k, v in resp.headers.items() if k.lower() not in SKIP_HEADERS},
+    }
+    try:
+        item["body"] = resp.content.decode("utf-8")
+    except UnicodeDecodeError:
+        item["body_b64"] = base64.b64encode(resp.content).decode("ascii")
+    return item
+
+
+def load_response(item: dict, method: str, url: str) -> requests.Response:
+    """Inverse of `dump_response`."""
+    resp = requests.Response()
+    resp.status_code = item["status"]
+    resp.headers = CaseInsensitiveDict(item.get("headers", {}))
+    if "body_b64" in item:
+        resp._content = base64.b64decode(item["body_b64"])
+    else:
+        resp._content = item.get("body", "").encode("utf-8")
+    resp.encoding = "utf-8"
+    resp.url = url
+    resp.request = requests.Request(method, url).prepare()
+    return resp
+
+
+class Cassette:
+    """
+    Record/replay store for HttpClient, one NDJSON interaction per line.
+
+    mode="record" truncates the file and appends every final response.
+    mode="replay" serves responses for matching (method, url) pairs in recorded
+    order, repeating the last one once a pair is exhausted, and never touches
+    the network.
+    """
+
+    def __init__(self, path: str, mode: str = "replay"):
+        if mode not in ("record", "replay"):
+            raise ValueError(f"unknown cassette mode: {mode}")
+        self.path = path
+        self.mode = mode
+        self._lock = threading.Lock()
+        self._tapes = {}
+        self._last = {}
+        if mode == "record":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            open(path, "w").close()
+        else:
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        item = json.loads(line)
+                        key = (item["method"], item["url"])
+                        self._tapes.setdefault(key, deque()).append(item)
+
+    @property
+    def replaying(self) -> bool:
+        return self.mode == "replay"
+
+    def record(self, method: str, url: str, resp: requests.Response):
+        item = {"method": method, "url": url, **dump_response(resp)}
+        with self._lock, open(self.path, "a", encoding="utf-8") as fh:
+            fh.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    def play(self, method: str, url: str) -> requests.Response:
+        key = (method, url)
+        with self._lock:
+            tape = self._tapes.get(key)
+            if tape:
+                self._last[key] = tape.popleft()
+            item = self._last.get(key)
+        if item is None:
+            raise CassetteMiss(f"no recorded interaction for {method} {url}")
+        return load_response(item, method, url)
+
+
+def cassette_from_env():
+    """Build a Cassette from LLM_ECHO_CASSETTE / LLM_ECHO_CASSETTE_MODE, if set."""
+    path = os.getenv("LLM_ECHO_CASSETTE")
+    if not path:
+        return None
+    return Cassette(path, os.getenv("LLM_ECHO_CASSETTE_MODE", "replay"))
@@ -1,6 +1,7 @@
 import requests
 from typing import Dict, Any, List
 from search.deepseekadapter import DEEPSEEK_URL
+from agents.jules.http_client import get_client
 
 
 def redact(obj: Any) -> Any:
@@ -22,7 +23,7 @@ def querydeepseekviaapi(
     provenance_bundle: Dict[str, Any],
     session: requests.Session = None,
 ) -> Dict[str, Any]:
-    s = session or requests.Session()
+    s = session or get_client()
     payload = {
         "html": html,
         "instructions": instructions,
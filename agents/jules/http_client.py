@@ -0,0 +1,240 @@
+import hashlib
+import json as jsonlib
+import os
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from agents.jules.cassette import cassette_from_env, dump_response, load_response
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# statuses where the server did not act on the request, so non-idempotent calls may retry too
+UNPROCESSED_STATUSES = {429, 502, 503, 504}
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+# request headers that change who the response is for; part of the revalidation key
+AUTH_HEADERS = ("Authorization", "Cookie")
+
+
+def parse_retry_after(value: Optional[str], now: Optional[datetime] = None) -> Optional[float]:
+    """Parse a Retry-After header (delta-seconds or HTTP-date) into seconds to wait."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    now = now or datetime.now(timezone.utc)
+    return max(0.0, (when - now).total_seconds())
+
+
+def backoff_delay(attempt: int, base: float, cap: float, rng=random) -> float:
+    """Full-jitter exponential backoff: uniform(0, min(cap, base * 2**attempt))."""
+    return rng.uniform(0, min(cap, base * (2**attempt)))
+
+
+class HttpClient:
+    """
+    requests.Session wrapper shared by the scrapers and the DeepSeek proxy.
+
+    - keep-alive connection pools per host (urllib3 keys pools by scheme/host/port)
+    - bounded retries with jittered exponential backoff on 429/5xx and connection errors
+    - honours Retry-After, capped at `retry_after_max`
+    - remembers ETag/Last-Modified per URL and credentials and revalidates GETs,
+      so an unchanged resource costs a 304 and the previous response is returned;
+      `save_validators`/`load_validators` carry them across processes
+    - with a `cassette`, records final responses or replays them without network
+    """
+
+    def __init__(
+        self,
+        user_agent: Optional[str] = None,
+        timeout: float = 20,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        retry_after_max: float = 120.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        cache_size: int = 256,
+        cassette=None,
+        sleep=time.sleep,
+    ):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_after_max = retry_after_max
+        self.cache_size = cache_size
+        self.cassette = cassette
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._validators: "OrderedDict[str, requests.Response]" = OrderedDict()
+        self.stats = {"requests": 0, "retries": 0, "not_modified": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0
+        )
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if user_agent:
+            self.session.headers["User-Agent"] = user_agent
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict[str, Any]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        data: Any = None,
+        timeout: Optional[float] = None,
+        revalidate: Optional[bool] = None,
+    ) -> requests.Response:
+        method = method.upper()
+        if revalidate is None:
+            revalidate = method == "GET" and self.cache_size > 0
+        headers = dict(headers or {})
+        key = requests.Request(method, url, params=params).prepare().url
+        if self.cassette is not None and self.cassette.replaying:
+            self._count("requests")
+            return self.cassette.play(method, key)
+        cache_key = self._cache_key(key, headers)
+        cached = self._cached(cache_key) if revalidate else None
+        if cached is not None:
+            if cached.headers.get("ETag"):
+                headers.setdefault("If-None-Match", cached.headers["ETag"])
+            if cached.headers.get("Last-Modified"):
+                headers.setdefault("If-Modified-Since", cached.headers["Last-Modified"])
+
+        attempt = 0
+        while True:
+            self._count("requests")
+            try:
+                resp = self.session.request(
+                    method,
+                    url,
+                    params=params,
+                    headers=headers,
+                    json=json,
+                    data=data,
+                    timeout=timeout or self.timeout,
+                )
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries or method not in IDEMPOTENT_METHODS:
+                    raise
+                delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            else:
+                if resp.status_code == 304 and cached is not None:
+                    self._count("not_modified")
+                    return cached
+                if attempt >= self.max_retries or not self._retryable(method, resp.status_code):
+                    if revalidate and resp.ok:
+                        self._remember(cache_key, resp)
+                    if self.cassette is not None:
+                        self.cassette.record(method, key, resp)
+                    return resp
+                delay = parse_retry_after(resp.headers.get("Retry-After"))
+                if delay is None:
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                resp.close()
+            attempt += 1
+            self._count("retries")
+            self._sleep(min(delay, self.retry_after_max))
+
+    def close(self):
+        self.session.close()
+
+    def save_validators(self, path):
+        """Write the remembered responses and their validators to a JSON file."""
+        with self._lock:
+            items = {key: dump_response(resp) for key, resp in self._validators.items()}
+        os.makedirs(os.path.dirname(str(path)) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            jsonlib.dump(items, fh, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def load_validators(self, path) -> int:
+        """Load responses saved by `save_validators`; returns how many (0 if none)."""
+        try:
+            with open(path, "r", encoding="utf-8") as fh:
+                items = jsonlib.load(fh)
+        except (OSError, ValueError):
+            return 0
+        with self._lock:
+            for key, item in items.items():
+                self._validators[key] = load_response(item, "GET", key.split(" ", 1)[0])
+            while len(self._validators) > self.cache_size:
+                self._validators.popitem(last=False)
+        return len(items)
+
+    def _count(self, name: str):
+        with self._lock:
+            self.stats[name] += 1
+
+    def _cache_key(self, url: str, headers: Dict[str, str]) -> str:
+        merged = CaseInsensitiveDict(self.session.headers)
+        merged.update(headers)
+        auth = [merged.get(h, "") for h in AUTH_HEADERS]
+        if not any(auth):
+            return url
+        digest = hashlib.sha256("\n".join(auth).encode("utf-8")).hexdigest()[:16]
+        return f"{url} {digest}"
+
+    @staticmethod
+    def _retryable(method: str, status: int) -> bool:
+        if method in IDEMPOTENT_METHODS:
+            return status in RETRY_STATUSES
+        return status in UNPROCESSED_STATUSES
+
+    def _cached(self, key: str) -> Optional[requests.Response]:
+        with self._lock:
+            resp = self._validators.get(key)
+            if resp is not None:
+                self._validators.move_to_end(key)
+            return resp
+
+    def _remember(self, key: str, resp: requests.Response):
+        if not (resp.headers.get("ETag") or resp.headers.get("Last-Modified")):
+            return
+        resp.content  # load the body so the cached response outlives the connection
+        with self._lock:
+            self._validators[key] = resp
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.cache_size:
+                self._validators.popitem(last=False)
+
+
+_default_client = None
+_default_lock = threading.Lock()
+
+
+def get_client() -> HttpClient:
+    """Return the process-wide HttpClient, creating it on first use."""
+    global _default_client
+    with _default_lock:
+        if _default_client is None:
+            _default_client = HttpClient(cassette=cassette_from_env())
+        return _default_client
@@ -1,8 +1,22 @@
+import atexit
+import logging
 import os
 import json
+import queue
 import tempfile
+import threading
+import time
 import hashlib
 
+logger = logging.getLogger(__name__)
+
+# sha256_hex_of_obj's canonical form: sorted keys, compact separators, ASCII escapes
+_CANONICAL = json.JSONEncoder(sort_keys=True, separators=(",", ":"))
+_encode_str = json.encoder.encode_basestring_ascii
+STR_CHUNK = 64 * 1024  # code points of a long string escaped per step
+GROUP_SIZE = 1024  # most members encoded per C encoder call
+HASH_BUFFER = 256 * 1024  # bytes accumulated before each hash update
+
 
 def ensure_dir(path):
     os.makedirs(path, exist_ok=True)
@@ -29,6 +43,216 @@ def sha256_hex_of_str(s: str):
     return hashlib.sha256(b).hexdigest()
 
 
+def _estimate(value, depth=0):
+    """Rough encoded length of `value`, or None if it should be streamed instead."""
+    if isinstance(value, str):
+        return len(value) + 2 if len(value) <= STR_CHUNK else None
+    if isinstance(value, (list, tuple)):
+        if depth >= 2 or len(value) > 32:
+            return None
+        total = len(value) + 2
+        for v in value:
+            n = _estimate(v, depth + 1)
+            if n is None:
+                return None
+            total += n
+        return total
+    if isinstance(value, dict):
+        if depth >= 2 or len(value) > 32:
+            return None
+        total = 2
+        for k, v in value.items():
+            n = _estimate(v, depth + 1)
+            if n is None:
+                return None
+            total += n + (len(k) if isinstance(k, str) else 8) + 4
+        return total
+    return 8
+
+
+def iter_canonical_json(obj):
+    """
+    Yield `json.dumps(obj, sort_keys=True, separators=(",", ":"))` in pieces.
+
+    Containers are walked in Python so the full document is never built;
+    runs of scalars and small shallow containers are handed to the C encoder
+    in groups of about HASH_BUFFER characters, and long strings are escaped in
+    slices, so the output is byte-identical.
+    """
+    markers = set()
+
+    def walk(o):
+        if isinstance(o, str):
+            if len(o) <= STR_CHUNK:
+                yield _encode_str(o)
+                return
+            yield '"'
+            for i in range(0, len(o), STR_CHUNK):
+                yield _encode_str(o[i : i + STR_CHUNK])[1:-1]
+            yield '"'
+            return
+        if not isinstance(o, (dict, list, tuple)):
+            yield _CANONICAL.encode(o)
+            return
+        if id(o) in markers:
+            raise ValueError("Circular reference detected")
+        markers.add(id(o))
+        if isinstance(o, dict):
+            items = sorted(o.items())
+            yield "{"
+            i = 0
+            while i < len(items):
+                if i:
+                    yield ","
+                j, size = i, 0
+                while j < len(items) and j - i < GROUP_SIZE and size < HASH_BUFFER:
+                    n = _estimate(items[j][1])
+                    if n is None:
+                        break
+                    size += n
+                    j += 1
+                if j > i:
+                    yield _CANONICAL.encode(dict(items[i:j]))[1:-1]
+                    i = j
+                    continue
+                key, value = items[i]
+                yield _CANONICAL.encode({key: 0})[1:-3] + ":"
+                yield from walk(value)
+                i += 1
+            yield "}"
+        else:
+            yield "["
+            i = 0
+            while i < len(o):
+                if i:
+                    yield ","
+                j, size = i, 0
+                while j < len(o) and j - i < GROUP_SIZE and size < HASH_BUFFER:
+                    n = _estimate(o[j])
+                    if n is None:
+                        break
+                    size += n
+                    j += 1
+                if j > i:
+                    yield _CANONICAL.encode(list(o[i:j]))[1:-1]
+                    i = j
+                    continue
+                yield from walk(o[i])
+                i += 1
+            yield "]"
+        markers.discard(id(o))
+
+    return walk(obj)
+
+
 def sha256_hex_of_obj(obj):
-    s = json.dumps(obj, sort_keys=True, separators=(",", ":"))
-    return sha256_hex_of_str(s)
+    """SHA-256 of the canonical JSON of `obj`, hashed incrementally as it is encoded."""
+    n = _estimate(obj)
+    if n is not None and n <= HASH_BUFFER:
+        return sha256_hex_of_str(_CANONICAL.encode(obj))
+    h = hashlib.sha256()
+    pending, size = [], 0
+    for piece in iter_canonical_json(obj):
+        pending.append(piece)
+        size += len(piece)
+        if size >= HASH_BUFFER:
+            h.update("".join(pending).encode("utf-8"))
+            pending, size = [], 0
+    h.update("".join(pending).encode("utf-8"))
+    return h.hexdigest()
+
+
+class BackgroundWriter:
+    """
+    Hand writes to a dedicated thread so callers never wait on the disk.
+
+    `submit` enqueues an item and returns at once; when `maxsize` items are
+    already waiting it blocks (backpressure) until the writer catches up, or
+    raises `queue.Full` after `timeout`. The thread drains the queue into
+    `write_batch(items)` calls of up to `batch_size` items, waiting at most
+    `max_delay` seconds for a batch to fill. `flush` returns once everything
+    submitted before it is written; `close` (also run at exit) drains the
+    queue and joins the thread. A failed batch is logged and re-raised from
+    the next `flush`/`close`.
+    """
+
+    _STOP = object()
+
+    def __init__(
+        self,
+        write_batch,
+        maxsize: int = 10000,
+        batch_size: int = 256,
+        max_delay: float = 0.05,
+        name: str = "background-writer",
+    ):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._error = None
+        self._closed = False
+        self._close_lock = threading.Lock()
+        self.stats = {"submitted": 0, "written": 0, "batches": 0, "blocked": 0}
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, item, timeout: float = None):
+        if self._closed:
+            raise RuntimeError("BackgroundWriter is closed")
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.stats["blocked"] += 1
+            self._queue.put(item, timeout=timeout)
+        self.stats["submitted"] += 1
+
+    def flush(self):
+        self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+        self._queue.put(self._STOP)
+        self._thread.join()
+        atexit.unregister(self.close)
+        self._raise_error()
+
+    def _raise_error(self):
+        error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            if item is self._STOP:
+                self._queue.task_done()
+                break
+            batch = [item]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.batch_size:
+                try:
+                    nxt = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if nxt is self._STOP:
+                    stop = True
+                    self._queue.task_done()
+                    break
+                batch.append(nxt)
+            try:
+                self.write_batch(batch)
+                self.stats["written"] += len(batch)
+                self.stats["batches"] += 1
+            except Exception as e:
+                logger.error(f"Background write of {len(batch)} items failed: {e}")
+                self._error = e
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
@@ -1,23 +1,129 @@
 import json
+import os
+import random
 from jsonschema import Draft7Validator
 from functools import lru_cache
 
+try:
+    from importlib.resources import files
+except ImportError:  # Python 3.8
+    files = None
+    from importlib.resources import read_text
+
+# package data copy of .github/PROVENANCE_SCHEMA.json, so installed packages find it too
+SCHEMA_RESOURCE = "provenance_schema.json"
+
+# share of fast-path passes that are re-checked by the full validator
+SAMPLE_RATE = float(os.getenv("LLM_ECHO_SCHEMA_SAMPLE_RATE", "0"))
+
+_JSON_TYPES = {
+    "string": str,
+    "object": dict,
+    "array": list,
+    "boolean": bool,
+    "null": type(None),
+}
+# keywords the fast path can ignore because Draft7Validator does not enforce them either
+_ANNOTATIONS = {"description", "title", "format", "$schema", "$id", "examples", "default"}
+
 
 class SchemaValidationError(Exception):
     pass
 
 
+def _packaged_schema() -> str:
+    if files is None:
+        return read_text(__package__, SCHEMA_RESOURCE)
+    return files(__package__).joinpath(SCHEMA_RESOURCE).read_text(encoding="utf-8")
+
+
 @lru_cache()
 def load_schema():
-    with open(".github/PROVENANCE_SCHEMA.json", "r") as f:
-        return json.load(f)
+    """`LLM_ECHO_PROVENANCE_SCHEMA` if set, else the schema shipped with the package."""
+    override = os.getenv("LLM_ECHO_PROVENANCE_SCHEMA")
+    if override:
+        with open(override, "r") as f:
+            return json.load(f)
+    return json.loads(_packaged_schema())
 
 
-def validate_event_or_raise(event):
+@lru_cache()
+def get_validator():
     schema = load_schema()
-    v = Draft7Validator(schema)
-    errors = sorted(v.iter_errors(event), key=lambda e: e.path)
+    Draft7Validator.check_schema(schema)
+    return Draft7Validator(schema)
+
+
+def _type_check(name):
+    if name == "integer":
+        return lambda v: isinstance(v, int) and not isinstance(v, bool)
+    if name == "number":
+        return lambda v: isinstance(v, (int, float)) and not isinstance(v, bool)
+    py = _JSON_TYPES[name]
+    return lambda v: isinstance(v, py)
+
+
+@lru_cache()
+def fast_checks():
+    """
+    Compile the schema into (required, {property: type check}) when it only
+    uses `type`/`required`/`properties` constraints; None means the schema is
+    too rich for the fast path and every event gets full validation.
+    """
+    schema = load_schema()
+    if set(schema) - _ANNOTATIONS - {"type", "properties", "required"}:
+        return None
+    if schema.get("type", "object") != "object":
+        return None
+    checks = {}
+    for name, prop in schema.get("properties", {}).items():
+        if set(prop) - _ANNOTATIONS - {"type"}:
+            return None
+        kind = prop.get("type")
+        if kind is None:
+            continue
+        if not isinstance(kind, str) or (
+            kind not in _JSON_TYPES and kind not in ("integer", "number")
+        ):
+            return None
+        checks[name] = _type_check(kind)
+    return tuple(schema.get("required", ())), checks
+
+
+def _fast_ok(event, compiled) -> bool:
+    required, checks = compiled
+    if not isinstance(event, dict):
+        return False
+    for key in required:
+        if key not in event:
+            return False
+    for key, check in checks.items():
+        if key in event and not check(event[key]):
+            return False
+    return True
+
+
+def validate_event_or_raise(event, full: bool = False):
+    """
+    Validate a provenance event, raising SchemaValidationError on failure.
+
+    Events that pass the structural fast path are accepted directly unless
+    `full` is set or they are drawn by `SAMPLE_RATE`; anything else goes
+    through the cached Draft7Validator, which also produces the error text.
+    """
+    compiled = fast_checks()
+    if not full and compiled is not None and _fast_ok(event, compiled):
+        if not SAMPLE_RATE or random.random() >= SAMPLE_RATE:
+            return True
+    errors = sorted(get_validator().iter_errors(event), key=lambda e: e.path)
     if errors:
         msgs = "; ".join([f"{'/'.join(map(str, e.path))}: {e.message}" for e in errors])
         raise SchemaValidationError(msgs)
     return True
+
+
+def reset_cache():
+    """Forget the loaded schema, e.g. after changing `LLM_ECHO_PROVENANCE_SCHEMA`."""
+    load_schema.cache_clear()
+    get_validator.cache_clear()
+    fast_checks.cache_clear()
@@ -1,10 +1,249 @@
+import atexit
+import contextlib
+import glob
 import json
+import logging
+import os
+import threading
 import uuid
 from datetime import datetime, timezone
 from agents.jules.schema_validator import validate_event_or_raise
-from agents.jules.io_utils import sha256_hex_of_obj, ensure_dir, atomic_write_json
+from agents.jules.io_utils import (
+    BackgroundWriter,
+    atomic_write_json,
+    ensure_dir,
+    sha256_hex_of_obj,
+)
+from agents.provenance_blobs import BlobStore, blob_dir
+from agents.provenance_chain import Chain, chain_dir
+
+logger = logging.getLogger(__name__)
 
 PROV_DIR = ".github/PROVENANCE"
+SEGMENT_STEM = "events"
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+
+class BatchEmitter:
+    """
+    Buffer provenance events and append them to NDJSON segments.
+
+    Events land in `<dir>/events.<YYYYMMDD>-<NNNN>.ndjson`, one compact JSON
+    object per line. Each flush writes the whole batch with a single write and
+    a single fsync; a new segment starts when the UTC day changes or the
+    current one passes `max_bytes`. `directory=None` follows `PROV_DIR`.
+
+    With `background=True` batches are written by a `BackgroundWriter` thread
+    instead of the emitting thread; `queue_size` bounds the events waiting.
+    """
+
+    def __init__(
+        self,
+        directory=None,
+        batch_size: int = 256,
+        max_bytes: int = SEGMENT_MAX_BYTES,
+        background: bool = False,
+        queue_size: int = 10000,
+    ):
+        self.directory = directory
+        self.batch_size = batch_size
+        self.max_bytes = max_bytes
+        self._buffer = []
+        self._lock = threading.Lock()
+        self.stats = {"events": 0, "batches": 0}
+        self._writer = None
+        if background:
+            self._writer = BackgroundWriter(
+                self._write_batch,
+                maxsize=queue_size,
+                batch_size=batch_size,
+                name="provenance-writer",
+            )
+
+    def emit(self, event: dict):
+        if self._writer is not None:
+            self._writer.submit(event)
+            return
+        with self._lock:
+            self._buffer.append(event)
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def flush(self):
+        if self._writer is not None:
+            self._writer.flush()
+            return
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self.flush()
+
+    def _flush_locked(self):
+        if self._buffer:
+            self._write_batch(self._buffer)
+            self._buffer = []
+
+    def _write_batch(self, events):
+        directory = self.directory or PROV_DIR
+        ensure_dir(directory)
+        data = "".join(
+            json.dumps(e, sort_keys=True, separators=(",", ":")) + "\n" for e in events
+        ).encode("utf-8")
+        path = self._segment_path(directory)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            size = os.fstat(fd).st_size
+            if size and os.pread(fd, 1, size - 1) != b"\n":
+                data = b"\n" + data  # do not glue the batch onto a torn line
+            os.write(fd, data)
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        chain = _chain_for(directory)
+        if chain is not None:
+            upto = events[-1].get("chainseq")
+            chain.checkpoint(upto)
+            chain.persist(upto)
+        if _index is not None:
+            _index.add_many(events, source=path)
+        self.stats["events"] += len(events)
+        self.stats["batches"] += 1
+
+    def _segment_path(self, directory) -> str:
+        day = datetime.now(timezone.utc).strftime("%Y%m%d")
+        existing = sorted(glob.glob(os.path.join(directory, f"{SEGMENT_STEM}.{day}-*.ndjson")))
+        if not existing:
+            return os.path.join(directory, f"{SEGMENT_STEM}.{day}-0000.ndjson")
+        last = existing[-1]
+        if os.path.getsize(last) < self.max_bytes:
+            return last
+        seq = int(last.rsplit("-", 1)[1].split(".")[0]) + 1
+        return os.path.join(directory, f"{SEGMENT_STEM}.{day}-{seq:04d}.ndjson")
+
+
+_emitter = None
+_index = None
+_chain = None
+_blobs = None
+# held while chained events are linked and handed on, so chain order is write order
+_chain_lock = threading.Lock()
+CHAIN_ENABLED = os.getenv("LLM_ECHO_PROVENANCE_CHAIN", "0") != "0"
+
+
+def _chain_for(directory):
+    """The hash chain of `directory`; switching directories checkpoints the old one."""
+    global _chain
+    if not CHAIN_ENABLED:
+        return None
+    target = chain_dir(directory)
+    if _chain is None or _chain.directory != target:
+        if _chain is not None:
+            _chain.checkpoint()
+            _chain.persist()
+        _chain = Chain(target)
+        _recover_chain(_chain, directory)
+    return _chain
+
+
+def _recover_chain(chain, directory):
+    """Relink events a crashed process wrote after its last persisted head."""
+    try:
+        since = os.path.getmtime(chain.head_path)
+    except OSError:
+        since = None
+    paths = glob.glob(os.path.join(directory, "*-bundle.json"))
+    paths += glob.glob(os.path.join(directory, f"{SEGMENT_STEM}.*.ndjson"))
+    events = []
+    for path in paths:
+        if since is not None and os.path.getmtime(path) < since:
+            continue
+        with open(path, "r", encoding="utf-8") as f:
+            lines = [f.read()] if path.endswith("-bundle.json") else f
+            for line in lines:
+                try:
+                    event = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if event.get("chainseq", -1) > chain.seq:
+                    events.append(event)
+    recovered = chain.recover(events) if events else 0
+    if recovered:
+        logger.warning(f"Recovered {recovered} provenance events written after the chain head")
+
+
+def _blobs_for(directory):
+    """The blob store of `directory` while blobs are enabled, else None."""
+    global _blobs
+    if _blobs is None:
+        return None
+    target = blob_dir(directory)
+    if _blobs.directory != target:
+        _blobs = BlobStore(target)
+    return _blobs
+
+
+def configure(mode: str = None, **kwargs):
+    """
+    Select how `emitevent` persists events.
+
+    mode="files" (default) writes one `<token>-bundle.json` per event;
+    mode="batched" buffers into a `BatchEmitter(**kwargs)` that is flushed at
+    exit; mode="async" is batched with the writes done on a background
+    thread. Without an explicit mode, `LLM_ECHO_PROVENANCE_MODE` is used.
+    """
+    global _emitter
+    mode = mode or os.getenv("LLM_ECHO_PROVENANCE_MODE", "files")
+    if mode not in ("files", "batched", "async"):
+        raise ValueError(f"unknown provenance mode: {mode}")
+    if _emitter is not None:
+        _emitter.close()
+    flush()
+    if mode == "async":
+        kwargs["background"] = True
+    _emitter = BatchEmitter(**kwargs) if mode != "files" else None
+    return _emitter
+
+
+def set_index(store):
+    """
+    Also record every event persisted from now on in a `ProvenanceStore`.
+
+    `store` may be a store, a database path, or None to stop indexing.
+    """
+    global _index
+    if isinstance(store, (str, os.PathLike)):
+        from agents.provenance_store import ProvenanceStore
+
+        store = ProvenanceStore(str(store))
+    _index = store
+    return _index
+
+
+def set_blobs(enabled: bool = True):
+    """
+    Store payloads once in a content-addressed `BlobStore` under
+    `<PROV_DIR>/blobs/`, with persisted events referencing them by
+    `outputhash`; `emitevent` still returns the full event.
+    """
+    global _blobs
+    _blobs = BlobStore(blob_dir(PROV_DIR)) if enabled else None
+    return _blobs
+
+
+def flush():
+    with _chain_lock:
+        if _emitter is not None:
+            _emitter.flush()
+        if _chain is not None:
+            _chain.checkpoint()
+            _chain.persist()
+
+
+atexit.register(flush)
 
 
 def emitevent(
@@ -24,8 +263,65 @@ def emitevent(
     }
     # Validate schema
     validate_event_or_raise(event)
-    # Write atomically
-    ensure_dir(PROV_DIR)
-    bundle_path = f"{PROV_DIR}/{provenance_token}-bundle.json"
-    atomic_write_json(bundle_path, event)
+    directory = (_emitter and _emitter.directory) or PROV_DIR
+    chain = _chain_for(directory)
+    blobs = _blobs_for(directory)
+    with _chain_lock if chain is not None else contextlib.nullcontext():
+        if chain is not None:
+            chain.link(event)
+        stored = blobs.reference(event) if blobs is not None else event
+        if _emitter is not None:
+            _emitter.emit(stored)
+            return event
+        # Write atomically
+        ensure_dir(PROV_DIR)
+        bundle_path = f"{PROV_DIR}/{provenance_token}-bundle.json"
+        atomic_write_json(bundle_path, stored)
+        if chain is not None and chain.checkpoint_due:
+            chain.persist()
+    if _index is not None:
+        _index.add(stored, source=bundle_path)
     return event
+
+
+def iter_events(directory=None, resolve_blobs: bool = True):
+    """
+    Yield every stored event: loose bundle files, packed bundles, then
+    segment lines. Blob payload references are resolved unless
+    `resolve_blobs` is False.
+    """
+    directory = directory or PROV_DIR
+    if resolve_blobs:
+        blobs = BlobStore(blob_dir(directory))
+        for event in iter_events(directory, resolve_blobs=False):
+            yield blobs.resolve(event)
+        return
+    from agents.provenance_pack import iter_packed
+
+    loose = set()
+    for path in sorted(glob.glob(os.path.join(directory, "*-bundle.json"))):
+        with open(path, "r", encoding="utf-8") as f:
+            event = json.load(f)
+        loose.add(event.get("provenancetoken"))
+        yield event
+    for event in iter_packed(directory):
+        if event["provenancetoken"] not in loose:
+            yield event
+    for path in sorted(glob.glob(os.path.join(directory, f"{SEGMENT_STEM}.*.ndjson"))):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    # torn tail from a crash mid-write; earlier batches were fsynced
+                    logger.warning(f"Skipping unreadable provenance line in {path}")
+
+
+if os.getenv("LLM_ECHO_PROVENANCE_MODE"):
+    configure()
+if os.getenv("LLM_ECHO_PROVENANCE_INDEX"):
+    set_index(os.getenv("LLM_ECHO_PROVENANCE_INDEX"))
+if os.getenv("LLM_ECHO_PROVENANCE_BLOBS", "0") != "0":
+    set_blobs()
@@ -0,0 +1,178 @@
+"""
+Content-addressed payload store for provenance events.
+
+With blobs enabled, `emitevent` writes each payload once to
+`<PROV_DIR>/blobs/<ab>/<outputhash>.json` (the canonical JSON that
+`outputhash` is computed over, so a blob's name is its SHA-256) and the
+persisted event carries `{"$blob": "<outputhash>"}` as its payload. Identical
+payloads emitted again only cost a stat. `iter_events`, `provenance_pack.resolve`
+and `ProvenanceStore` put the payload back, so readers never see references.
+
+    python -m agents.provenance_blobs report
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import Counter
+from typing import Optional
+
+from agents.jules.io_utils import _CANONICAL, ensure_dir
+
+BLOB_KEY = "$blob"
+
+
+def blob_dir(prov_dir: str) -> str:
+    return os.path.join(prov_dir, "blobs")
+
+
+def blob_ref(payload) -> Optional[str]:
+    """The hash a payload refers to, or None for an inline payload."""
+    if isinstance(payload, dict) and len(payload) == 1:
+        ref = payload.get(BLOB_KEY)
+        if isinstance(ref, str):
+            return ref
+    return None
+
+
+class BlobStore:
+    """Payloads stored once under their SHA-256, fanned out by the first two hex digits."""
+
+    def __init__(self, directory: str, verify: bool = True):
+        self.directory = directory
+        self.verify = verify
+        self._lock = threading.Lock()
+        self.stats = {"refs": 0, "written": 0, "bytes_written": 0, "bytes_deduped": 0}
+
+    def path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest + ".json")
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.path(digest))
+
+    def put(self, payload, digest: str = None) -> str:
+        """Store `payload` unless present; returns its hash. `digest` skips rehashing."""
+        data = None
+        if digest is None:
+            data = _CANONICAL.encode(payload).encode("utf-8")
+            digest = hashlib.sha256(data).hexdigest()
+        path = self.path(digest)
+        if os.path.exists(path):
+            with self._lock:
+                self.stats["refs"] += 1
+                self.stats["bytes_deduped"] += os.path.getsize(path)
+            return digest
+        if data is None:
+            data = _CANONICAL.encode(payload).encode("utf-8")
+        dir_path = os.path.dirname(path)
+        ensure_dir(dir_path)
+        fd, tmp = tempfile.mkstemp(dir=dir_path, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            # a concurrent writer of the same hash wrote the same bytes
+            os.replace(tmp, path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+        with self._lock:
+            self.stats["refs"] += 1
+            self.stats["written"] += 1
+            self.stats["bytes_written"] += len(data)
+        return digest
+
+    def get(self, digest: str) -> dict:
+        """The payload stored under `digest`; ValueError if the file does not match it."""
+        with open(self.path(digest), "rb") as f:
+            data = f.read()
+        if self.verify and hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"blob {digest} does not match its hash")
+        return json.loads(data)
+
+    def reference(self, event: dict) -> dict:
+        """A copy of `event` whose payload is stored here and replaced by a reference."""
+        digest = self.put(event["payload"], event["outputhash"])
+        stored = dict(event)
+        stored["payload"] = {BLOB_KEY: digest}
+        return stored
+
+    def resolve(self, event: dict) -> dict:
+        """`event` with a referenced payload put back (unchanged when inline)."""
+        digest = blob_ref(event.get("payload"))
+        if digest is None:
+            return event
+        resolved = dict(event)
+        resolved["payload"] = self.get(digest)
+        return resolved
+
+
+def resolve_event(event: dict, prov_dir: str) -> dict:
+    """Resolve a payload reference against the blob store of `prov_dir`."""
+    if blob_ref(event.get("payload")) is None:
+        return event
+    return BlobStore(blob_dir(prov_dir)).resolve(event)
+
+
+def report(prov_dir: str = None) -> dict:
+    """
+    Storage savings of the blob store: bytes the referenced payloads would
+    take inline against the bytes actually stored, plus unreferenced blobs.
+    """
+    from agents import provenance
+
+    prov_dir = prov_dir or provenance.PROV_DIR
+    store = BlobStore(blob_dir(prov_dir))
+    refs = Counter()
+    events = 0
+    for event in provenance.iter_events(prov_dir, resolve_blobs=False):
+        events += 1
+        digest = blob_ref(event.get("payload"))
+        if digest is not None:
+            refs[digest] += 1
+    sizes = {}
+    if os.path.isdir(store.directory):
+        for fan in os.listdir(store.directory):
+            fan_dir = os.path.join(store.directory, fan)
+            if not os.path.isdir(fan_dir):
+                continue
+            for name in os.listdir(fan_dir):
+                if name.endswith(".json") and not name.startswith("."):
+                    sizes[name[: -len(".json")]] = os.path.getsize(os.path.join(fan_dir, name))
+    inline = sum(sizes.get(d, 0) * n for d, n in refs.items())
+    stored = sum(sizes.values())
+    return {
+        "events": events,
+        "references": sum(refs.values()),
+        "blobs": len(sizes),
+        "missing_blobs": sorted(d for d in refs if d not in sizes),
+        "unreferenced_blobs": len(set(sizes) - set(refs)),
+        "inline_bytes": inline,
+        "stored_bytes": stored,
+        "saved_bytes": inline - stored,
+        "dedup_ratio": round(inline / stored, 3) if stored else None,
+    }
+
+
+def main():
+    from agents import provenance
+
+    parser = argparse.ArgumentParser(description="Inspect the provenance payload blob store")
+    parser.add_argument("--prov-dir", default=provenance.PROV_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("report", help="Print storage savings and dangling references")
+    get_parser = sub.add_parser("get", help="Print one payload by hash")
+    get_parser.add_argument("digest")
+    args = parser.parse_args()
+
+    if args.command == "report":
+        summary = report(args.prov_dir)
+        print(json.dumps(summary, indent=2))
+        raise SystemExit(1 if summary["missing_blobs"] else 0)
+    print(json.dumps(BlobStore(blob_dir(args.prov_dir)).get(args.digest), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,343 @@
+"""
+Hash chain and Merkle checkpoints over provenance events.
+
+Every emitted event gets `chainseq`, `prevchainhash` and `chainhash`, where
+
+    leaf      = sha256(canonical JSON of the event without payload/chainhash)
+    chainhash = sha256(prevchainhash + leaf)
+
+The payload is covered through `outputhash`, so walking the chain never
+rehashes payloads; a missing, reordered or edited event breaks every later
+link. Every `checkpoint_every` events (and on flush/exit) the leaves since the
+last checkpoint are folded into a Merkle root appended to `roots.ndjson`,
+so one event can be shown to belong to a checkpoint with O(log n) hashes.
+The head (`head.json`) is written with checkpoints and flushes, never past
+an event that is not yet durable.
+
+Chain state lives next to the bundles in `<PROV_DIR>.chain/` and assumes a
+single writer per provenance directory.
+
+    python -m agents.provenance_chain verify
+    python -m agents.provenance_chain prove <provenancetoken>
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+from agents.jules.io_utils import atomic_write_json, ensure_dir, sha256_hex_of_obj
+
+GENESIS = "0" * 64
+CHAIN_FIELDS = ("chainseq", "prevchainhash", "chainhash")
+_UNHASHED = ("payload", "chainhash")
+
+
+def chain_dir(prov_dir: str) -> str:
+    return prov_dir.rstrip("/\\") + ".chain"
+
+
+def leaf_hash(event: dict) -> str:
+    return sha256_hex_of_obj({k: v for k, v in event.items() if k not in _UNHASHED})
+
+
+def link_hash(prev: str, leaf: str) -> str:
+    return hashlib.sha256((prev + leaf).encode("ascii")).hexdigest()
+
+
+def _node(left: str, right: str) -> str:
+    return hashlib.sha256(b"\x01" + bytes.fromhex(left) + bytes.fromhex(right)).hexdigest()
+
+
+def _leaf_node(leaf: str) -> str:
+    return hashlib.sha256(b"\x00" + bytes.fromhex(leaf)).hexdigest()
+
+
+def _levels(leaves: List[str]) -> List[List[str]]:
+    level = [_leaf_node(x) for x in leaves]
+    levels = [level]
+    while len(level) > 1:
+        nxt = [_node(level[i], level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            nxt.append(level[-1])  # odd node is promoted unchanged
+        levels.append(nxt)
+        level = nxt
+    return levels
+
+
+def merkle_root(leaves: List[str]) -> str:
+    if not leaves:
+        raise ValueError("no leaves")
+    return _levels(leaves)[-1][0]
+
+
+def merkle_proof(leaves: List[str], index: int) -> List[Tuple[str, str]]:
+    """Sibling hashes from leaf `index` up to the root, as (side, hash) pairs."""
+    proof = []
+    for level in _levels(leaves)[:-1]:
+        sibling = index ^ 1
+        if sibling < len(level):
+            proof.append(("L" if sibling < index else "R", level[sibling]))
+        index //= 2
+    return proof
+
+
+def verify_proof(leaf: str, proof, root: str) -> bool:
+    h = _leaf_node(leaf)
+    for side, sibling in proof:
+        h = _node(sibling, h) if side == "L" else _node(h, sibling)
+    return h == root
+
+
+class Chain:
+    """Assigns chain fields to events and writes Merkle checkpoints."""
+
+    def __init__(self, directory: str, checkpoint_every: int = 1024):
+        self.directory = directory
+        self.checkpoint_every = checkpoint_every
+        self.head_path = os.path.join(directory, "head.json")
+        self.roots_path = os.path.join(directory, "roots.ndjson")
+        self._lock = threading.Lock()
+        head = {"chainseq": -1, "chainhash": GENESIS}
+        if os.path.exists(self.head_path):
+            with open(self.head_path, "r") as f:
+                head = json.load(f)
+        self.seq = head["chainseq"]
+        self.head = head["chainhash"]
+        self.persisted_seq = self.seq
+        self._pending = []  # (leaf, chainhash) since the last checkpoint, from first_pending
+        self._first_pending = self.seq + 1
+        self._checkpointed = (self.seq, self.head)
+
+    def link(self, event: dict) -> dict:
+        """Add chain fields to `event` in place, in emission order."""
+        with self._lock:
+            self.seq += 1
+            event["chainseq"] = self.seq
+            event["prevchainhash"] = self.head
+            leaf = leaf_hash(event)
+            self.head = event["chainhash"] = link_hash(self.head, leaf)
+            self._pending.append((leaf, self.head))
+        return event
+
+    def recover(self, events) -> int:
+        """
+        Continue after chained events written past the persisted head.
+
+        The head is only persisted on flush, checkpoint or exit, so a crash
+        can leave durable events after it; relinking them keeps the next
+        `link` from reusing their chainseq. Returns how many were recovered.
+        """
+        recovered = 0
+        with self._lock:
+            for event in sorted(events, key=lambda e: e["chainseq"]):
+                if event["chainseq"] <= self.seq:
+                    continue
+                if event["chainseq"] != self.seq + 1 or event["prevchainhash"] != self.head:
+                    break
+                leaf = leaf_hash(event)
+                if link_hash(self.head, leaf) != event["chainhash"]:
+                    break
+                self.seq = event["chainseq"]
+                self.head = event["chainhash"]
+                self._pending.append((leaf, self.head))
+                recovered += 1
+        return recovered
+
+    @property
+    def checkpoint_due(self) -> bool:
+        return len(self._pending) >= self.checkpoint_every
+
+    def persist(self, upto: int = None):
+        """
+        Record the head once linked events are durable; checkpoint if due.
+
+        `upto` is the last durable chainseq when events are written after
+        later ones were already linked (background writers); default all.
+        """
+        with self._lock:
+            if len(self._pending) >= self.checkpoint_every:
+                self._checkpoint_locked(upto)
+            seq, head = self._head_at(upto)
+            if seq > self.persisted_seq:
+                ensure_dir(self.directory)
+                atomic_write_json(self.head_path, {"chainseq": seq, "chainhash": head})
+                self.persisted_seq = seq
+
+    def checkpoint(self, upto: int = None):
+        with self._lock:
+            self._checkpoint_locked(upto)
+
+    def _head_at(self, upto):
+        if upto is None or upto >= self.seq:
+            return self.seq, self.head
+        if upto >= self._first_pending:
+            return upto, self._pending[upto - self._first_pending][1]
+        return self._checkpointed
+
+    def _checkpoint_locked(self, upto=None):
+        n = len(self._pending)
+        if upto is not None:
+            n = max(0, min(n, upto - self._first_pending + 1))
+        if not n:
+            return
+        taken = self._pending[:n]
+        record = {
+            "first_seq": self._first_pending,
+            "last_seq": self._first_pending + n - 1,
+            "root": merkle_root([leaf for leaf, _ in taken]),
+            "chainhash": taken[-1][1],
+            "timestampiso": datetime.now(timezone.utc).isoformat(),
+        }
+        ensure_dir(self.directory)
+        fd = os.open(self.roots_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        try:
+            os.write(fd, (json.dumps(record, sort_keys=True) + "\n").encode("utf-8"))
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._checkpointed = (record["last_seq"], record["chainhash"])
+        self._first_pending = record["last_seq"] + 1
+        self._pending = self._pending[n:]
+
+
+def load_checkpoints(directory: str) -> List[dict]:
+    path = os.path.join(directory, "roots.ndjson")
+    if not os.path.exists(path):
+        return []
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def chained_events(prov_dir: str) -> List[dict]:
+    """Chained events under `prov_dir` in chain order (unchained events are skipped)."""
+    from agents.provenance import iter_events
+
+    events = [e for e in iter_events(prov_dir, resolve_blobs=False) if "chainseq" in e]
+    events.sort(key=lambda e: e["chainseq"])
+    return events
+
+
+def verify_chain(events: List[dict], start_hash: str = None) -> Optional[int]:
+    """
+    Check links over consecutive events; returns the chainseq of the first
+    broken event, or None when the chain is intact. `start_hash` is the
+    expected prevchainhash of the first event (genesis when it has seq 0).
+    """
+    prev = start_hash
+    expected_seq = None
+    for e in events:
+        if expected_seq is not None and e["chainseq"] != expected_seq:
+            return expected_seq
+        if prev is None:
+            prev = GENESIS if e["chainseq"] == 0 else e["prevchainhash"]
+        if e["prevchainhash"] != prev or link_hash(prev, leaf_hash(e)) != e["chainhash"]:
+            return e["chainseq"]
+        prev = e["chainhash"]
+        expected_seq = e["chainseq"] + 1
+    return None
+
+
+def prove(event: dict, checkpoint: dict, checkpoint_events: List[dict]) -> dict:
+    """Inclusion proof of `event` in `checkpoint`, built from that checkpoint's events."""
+    leaves = [leaf_hash(e) for e in checkpoint_events]
+    index = event["chainseq"] - checkpoint["first_seq"]
+    return {
+        "chainseq": event["chainseq"],
+        "leaf": leaves[index],
+        "root": checkpoint["root"],
+        "proof": merkle_proof(leaves, index),
+    }
+
+
+def verify_inclusion(event: dict, proof: dict, checkpoints: List[dict]) -> bool:
+    """O(log n) check that `event` is the leaf a checkpoint root commits to."""
+    if proof["chainseq"] != event["chainseq"] or proof["leaf"] != leaf_hash(event):
+        return False
+    if not any(c["root"] == proof["root"] for c in checkpoints):
+        return False
+    return verify_proof(proof["leaf"], proof["proof"], proof["root"])
+
+
+def verify_range(events: List[dict], first_proof: dict, last_proof: dict, checkpoints) -> bool:
+    """
+    Verify a contiguous range: both ends are anchored in checkpoint roots by
+    inclusion proofs and the links in between are intact, without touching
+    events outside the range or rehashing payloads.
+    """
+    if not events:
+        return False
+    return (
+        verify_inclusion(events[0], first_proof, checkpoints)
+        and verify_inclusion(events[-1], last_proof, checkpoints)
+        and verify_chain(events, start_hash=events[0]["prevchainhash"]) is None
+    )
+
+
+def verify_all(prov_dir: str) -> dict:
+    """Full check: every link, every checkpoint root, and the head against the last event."""
+    events = chained_events(prov_dir)
+    report = {"events": len(events), "broken_at": verify_chain(events), "bad_checkpoints": []}
+    directory = chain_dir(prov_dir)
+    by_seq = {e["chainseq"]: e for e in events}
+    for cp in load_checkpoints(directory):
+        span = [by_seq.get(s) for s in range(cp["first_seq"], cp["last_seq"] + 1)]
+        if None in span or merkle_root([leaf_hash(e) for e in span]) != cp["root"]:
+            report["bad_checkpoints"].append(cp["first_seq"])
+    head_path = os.path.join(directory, "head.json")
+    if os.path.exists(head_path):
+        with open(head_path, "r") as f:
+            head = json.load(f)
+        last = events[-1] if events else {"chainseq": -1, "chainhash": GENESIS}
+        report["head_matches"] = (last["chainseq"], last["chainhash"]) == (
+            head["chainseq"],
+            head["chainhash"],
+        )
+    report["ok"] = (
+        report["broken_at"] is None
+        and not report["bad_checkpoints"]
+        and report.get("head_matches", True)
+    )
+    return report
+
+
+def main():
+    from agents import provenance
+
+    parser = argparse.ArgumentParser(description="Verify the provenance hash chain")
+    parser.add_argument("--prov-dir", default=provenance.PROV_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("verify", help="Check every link, checkpoint root and the head")
+    prove_parser = sub.add_parser("prove", help="Print an inclusion proof for one event")
+    prove_parser.add_argument("token")
+    args = parser.parse_args()
+
+    if args.command == "verify":
+        report = verify_all(args.prov_dir)
+        print(json.dumps(report, indent=2))
+        raise SystemExit(0 if report["ok"] else 1)
+
+    events = chained_events(args.prov_dir)
+    event = next((e for e in events if e["provenancetoken"] == args.token), None)
+    if event is None:
+        raise SystemExit(f"no chained event with token {args.token}")
+    checkpoint = next(
+        (
+            c
+            for c in load_checkpoints(chain_dir(args.prov_dir))
+            if c["first_seq"] <= event["chainseq"] <= c["last_seq"]
+        ),
+        None,
+    )
+    if checkpoint is None:
+        raise SystemExit("event is not covered by a checkpoint yet")
+    by_seq = {e["chainseq"]: e for e in events}
+    span = [by_seq[s] for s in range(checkpoint["first_seq"], checkpoint["last_seq"] + 1)]
+    print(json.dumps(prove(event, checkpoint, span), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Pack files for provenance bundles.
+
+`compact` rolls loose `<token>-bundle.json` files into a pack pair under
+`<PROV_DIR>/packs/`:
+
+- `pack-<NNNNNN>-<hash>.pack`: a header followed by one zlib-compressed
+  canonical JSON record per event (compressed against a shared preset
+  dictionary of the event field names, so small events still shrink);
+- `pack-<NNNNNN>-<hash>.idx`: a header and fixed-width entries (token,
+  offset, length) sorted by token, so a token is found by binary search
+  over an mmap.
+
+The `.idx` is written last, so a pack only becomes visible once complete,
+and loose files are deleted only after every record has been read back.
+`resolve` looks in loose files first and then in packs, so readers do not
+care whether a directory was compacted.
+
+    python -m agents.provenance_pack compact
+    python -m agents.provenance_pack get <provenancetoken>
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import mmap
+import os
+import struct
+import zlib
+from typing import Iterator, Optional
+
+from agents.jules.io_utils import ensure_dir
+from agents.provenance_blobs import resolve_event
+
+PACK_MAGIC = b"LEPACK1\n"
+IDX_MAGIC = b"LEIDX1\n\0"
+IDX_HEADER = struct.Struct("<8sI")  # magic, entry count
+TOKEN_WIDTH = 64
+IDX_ENTRY = struct.Struct(f"<{TOKEN_WIDTH}sQI")  # token (NUL padded), offset, length
+ZDICT = (
+    b'{"chainhash":"","chainseq":,"commitsha":"","eventtype":"","inputhash":"",'
+    b'"module":"","outputhash":"","payload":{"status":"success","source":"reddit"},'
+    b'"prevchainhash":"","provenancetoken":"","timestampiso":"+00:00"}'
+)
+
+
+def pack_dir(prov_dir: str) -> str:
+    return os.path.join(prov_dir, "packs")
+
+
+def _encode(event: dict) -> bytes:
+    c = zlib.compressobj(level=9, zdict=ZDICT)
+    raw = json.dumps(event, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return c.compress(raw) + c.flush()
+
+
+def _decode(blob: bytes) -> dict:
+    d = zlib.decompressobj(zdict=ZDICT)
+    return json.loads(d.decompress(blob) + d.flush())
+
+
+def _token_key(token: str) -> bytes:
+    key = token.encode("ascii")
+    if len(key) > TOKEN_WIDTH:
+        raise ValueError(f"provenance token longer than {TOKEN_WIDTH} bytes: {token}")
+    return key.ljust(TOKEN_WIDTH, b"\0")
+
+
+class PackReader:
+    """Random access to one pack by token, via binary search over its index."""
+
+    def __init__(self, idx_path: str):
+        self.idx_path = idx_path
+        self.pack_path = idx_path[: -len(".idx")] + ".pack"
+        self._idx_file = open(idx_path, "rb")
+        self._idx = mmap.mmap(self._idx_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.count = IDX_HEADER.unpack_from(self._idx, 0)
+        if magic != IDX_MAGIC:
+            raise ValueError(f"not a provenance pack index: {idx_path}")
+        self._pack = open(self.pack_path, "rb")
+
+    def close(self):
+        self._idx.close()
+        self._idx_file.close()
+        self._pack.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def _entry(self, i: int):
+        return IDX_ENTRY.unpack_from(self._idx, IDX_HEADER.size + i * IDX_ENTRY.size)
+
+    def _read(self, offset: int, length: int) -> dict:
+        self._pack.seek(offset)
+        return _decode(self._pack.read(length))
+
+    def get(self, token: str) -> Optional[dict]:
+        key = _token_key(token)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            k, offset, length = self._entry(mid)
+            if k < key:
+                lo = mid + 1
+            elif k > key:
+                hi = mid
+            else:
+                return self._read(offset, length)
+        return None
+
+    def __contains__(self, token: str) -> bool:
+        return self.get(token) is not None
+
+    def __iter__(self) -> Iterator[dict]:
+        for i in range(self.count):
+            _, offset, length = self._entry(i)
+            yield self._read(offset, length)
+
+
+def pack_indexes(prov_dir: str):
+    return sorted(glob.glob(os.path.join(pack_dir(prov_dir), "pack-*.idx")))
+
+
+def iter_packed(prov_dir: str) -> Iterator[dict]:
+    for idx in pack_indexes(prov_dir):
+        with PackReader(idx) as reader:
+            yield from reader
+
+
+def resolve(token: str, prov_dir: str = None) -> Optional[dict]:
+    """Find an event by token in the loose bundles, then in the packs; payload resolved."""
+    if prov_dir is None:
+        from agents import provenance
+
+        prov_dir = provenance.PROV_DIR
+    loose = os.path.join(prov_dir, f"{token}-bundle.json")
+    if os.path.exists(loose):
+        with open(loose, "r", encoding="utf-8") as f:
+            return resolve_event(json.load(f), prov_dir)
+    for idx in reversed(pack_indexes(prov_dir)):
+        with PackReader(idx) as reader:
+            event = reader.get(token)
+        if event is not None:
+            return resolve_event(event, prov_dir)
+    return None
+
+
+def _fsync_write(path: str, data: bytes):
+    with open(path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def compact(prov_dir: str = None, keep_loose: bool = False) -> dict:
+    """Roll every loose bundle of `prov_dir` into one new pack; returns a summary."""
+    if prov_dir is None:
+        from agents import provenance
+
+        prov_dir = provenance.PROV_DIR
+    loose = sorted(glob.glob(os.path.join(prov_dir, "*-bundle.json")))
+    summary = {"packed": 0, "loose_bytes": 0, "pack_bytes": 0, "pack": None}
+    if not loose:
+        return summary
+
+    events = []
+    for path in loose:
+        with open(path, "r", encoding="utf-8") as f:
+            events.append(json.load(f))
+        summary["loose_bytes"] += os.path.getsize(path)
+    events.sort(key=lambda e: e["provenancetoken"])
+
+    body = [PACK_MAGIC]
+    entries = []
+    offset = len(PACK_MAGIC)
+    for event in events:
+        blob = _encode(event)
+        entries.append(IDX_ENTRY.pack(_token_key(event["provenancetoken"]), offset, len(blob)))
+        body.append(blob)
+        offset += len(blob)
+    idx = IDX_HEADER.pack(IDX_MAGIC, len(entries)) + b"".join(entries)
+
+    directory = pack_dir(prov_dir)
+    ensure_dir(directory)
+    existing = [os.path.basename(p).split("-")[1] for p in pack_indexes(prov_dir)]
+    seq = max((int(n) for n in existing if n.isdigit()), default=-1) + 1
+    name = f"pack-{seq:06d}-{hashlib.sha256(idx).hexdigest()[:12]}"
+    pack_path = os.path.join(directory, name + ".pack")
+    idx_path = os.path.join(directory, name + ".idx")
+    _fsync_write(pack_path + ".tmp", b"".join(body))
+    os.replace(pack_path + ".tmp", pack_path)
+    _fsync_write(idx_path + ".tmp", idx)
+    os.replace(idx_path + ".tmp", idx_path)
+
+    with PackReader(idx_path) as reader:
+        for event in events:
+            if reader.get(event["provenancetoken"]) != event:
+                raise RuntimeError(f"pack {name} failed read-back; loose files kept")
+    if not keep_loose:
+        for path in loose:
+            os.remove(path)
+
+    summary.update(packed=len(events), pack_bytes=offset + len(idx), pack=idx_path)
+    return summary
+
+
+def main():
+    from agents import provenance
+
+    parser = argparse.ArgumentParser(description="Compact and read provenance packs")
+    parser.add_argument("--prov-dir", default=provenance.PROV_DIR)
+    sub = parser.add_subparsers(dest="command", required=True)
+    compact_parser = sub.add_parser("compact", help="Roll loose bundles into a pack")
+    compact_parser.add_argument("--keep-loose", action="store_true")
+    get_parser = sub.add_parser("get", help="Print one event from loose files or packs")
+    get_parser.add_argument("token")
+    sub.add_parser("list", help="List packs and their event counts")
+    args = parser.parse_args()
+
+    if args.command == "compact":
+        print(json.dumps(compact(args.prov_dir, keep_loose=args.keep_loose), indent=2))
+    elif args.command == "get":
+        event = resolve(args.token, args.prov_dir)
+        if event is None:
+            raise SystemExit(f"no event with token {args.token}")
+        print(json.dumps(event, indent=2, sort_keys=True))
+    else:
+        for idx in pack_indexes(args.prov_dir):
+            with PackReader(idx) as reader:
+                print(f"{os.path.basename(idx)[:-4]}  {len(reader)} events")
+
+
+if __name__ == "__main__":
+    main()
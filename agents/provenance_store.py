@@ -0,0 +1,269 @@
+"""
+Indexed provenance store.
+
+A SQLite database (WAL mode) holding one row per provenance event, indexed on
+provenancetoken, inputhash, outputhash, module, eventtype and timestamp, so
+"show me event X" or "which events came from this input" are index lookups
+instead of a scan over every bundle file. The full event JSON is stored with
+its row; the files under `.github/PROVENANCE` stay the source of truth and the
+index can be rebuilt from them at any time, so it lives in an untracked cache
+directory (`.cache/provenance/index.sqlite` by default). Payloads kept in the
+blob store are stored as references and resolved when rows are read.
+
+    python -m agents.provenance_store reindex
+    python -m agents.provenance_store --db ... find --inputhash <sha256> --limit 20
+    python -m agents.provenance_store --db ... get <provenancetoken>
+"""
+
+import argparse
+import glob
+import gzip
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+from agents.jules.io_utils import ensure_dir, sha256_hex_of_obj, sha256_hex_of_str
+from agents.provenance_blobs import resolve_event
+
+DEFAULT_INDEX = os.path.join(".cache", "provenance", "index.sqlite")
+REINDEX_BATCH = 1000  # events per transaction when rebuilding the index
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    token TEXT PRIMARY KEY,
+    inputhash TEXT NOT NULL,
+    outputhash TEXT NOT NULL,
+    module TEXT NOT NULL,
+    eventtype TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    source TEXT NOT NULL DEFAULT '',
+    event TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_inputhash ON events (inputhash);
+CREATE INDEX IF NOT EXISTS events_outputhash ON events (outputhash);
+CREATE INDEX IF NOT EXISTS events_module_ts ON events (module, timestamp);
+CREATE INDEX IF NOT EXISTS events_eventtype_ts ON events (eventtype, timestamp);
+CREATE INDEX IF NOT EXISTS events_timestamp ON events (timestamp);
+"""
+
+AUDIT_MODULE = "jules.provenance"
+AUDIT_EVENTTYPE = "flagged_post"
+
+
+def audit_entry_event(entry: dict) -> dict:
+    """Index fields for a ProvenanceLogger entry, which carries no token or hashes."""
+    output_hash = sha256_hex_of_obj(entry)
+    return {
+        "provenancetoken": output_hash,
+        "inputhash": sha256_hex_of_str(str(entry.get("post_id", ""))),
+        "outputhash": output_hash,
+        "module": AUDIT_MODULE,
+        "eventtype": AUDIT_EVENTTYPE,
+        "timestampiso": entry.get("timestamp", ""),
+    }
+
+
+class ProvenanceStore:
+    def __init__(self, path: str = DEFAULT_INDEX, prov_dir: str = None):
+        self.path = path
+        self.prov_dir = prov_dir  # blob references resolve here; None follows PROV_DIR
+        ensure_dir(os.path.dirname(path) or ".")
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.db.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def add(self, event: dict, source: str = "", body: dict = None):
+        self.add_many([event], source=source, bodies=[body] if body is not None else None)
+
+    def add_many(self, events: Iterable[dict], source: str = "", bodies=None) -> int:
+        """
+        Index events; re-adding a token replaces its row. `bodies` optionally
+        gives the JSON to store per event when it differs from the index fields
+        (ProvenanceLogger entries).
+        """
+        events = list(events)
+        bodies = bodies or events
+        rows = [
+            (
+                e["provenancetoken"],
+                e.get("inputhash", ""),
+                e.get("outputhash", ""),
+                e.get("module", ""),
+                e.get("eventtype", ""),
+                e.get("timestampiso", ""),
+                source,
+                json.dumps(b, sort_keys=True, separators=(",", ":")),
+            )
+            for e, b in zip(events, bodies)
+        ]
+        with self._lock, self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO events "
+                "(token, inputhash, outputhash, module, eventtype, timestamp, source, event) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+        return len(rows)
+
+    def _load(self, raw: str) -> dict:
+        from agents import provenance
+
+        return resolve_event(json.loads(raw), self.prov_dir or provenance.PROV_DIR)
+
+    def get(self, token: str) -> Optional[dict]:
+        with self._lock:
+            row = self.db.execute("SELECT event FROM events WHERE token = ?", (token,)).fetchone()
+        return self._load(row[0]) if row else None
+
+    def _where(self, inputhash, outputhash, module, eventtype, since, until):
+        clauses, args = [], []
+        for column, value in (
+            ("inputhash", inputhash),
+            ("outputhash", outputhash),
+            ("module", module),
+            ("eventtype", eventtype),
+        ):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            args.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            args.append(until)
+        return (" WHERE " + " AND ".join(clauses) if clauses else ""), args
+
+    def find(
+        self,
+        inputhash: str = None,
+        outputhash: str = None,
+        module: str = None,
+        eventtype: str = None,
+        since: str = None,
+        until: str = None,
+        limit: int = None,
+    ) -> List[dict]:
+        """Events matching every given filter, oldest first. Timestamps compare as ISO strings."""
+        where, args = self._where(inputhash, outputhash, module, eventtype, since, until)
+        sql = f"SELECT event FROM events{where} ORDER BY timestamp, token"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        with self._lock:
+            rows = self.db.execute(sql, args).fetchall()
+        return [self._load(r[0]) for r in rows]
+
+    def count(self, **filters) -> int:
+        where, args = self._where(
+            *(filters.get(k) for k in ("inputhash", "outputhash", "module", "eventtype")),
+            filters.get("since"),
+            filters.get("until"),
+        )
+        with self._lock:
+            return self.db.execute(f"SELECT COUNT(*) FROM events{where}", args).fetchone()[0]
+
+    def explain(self, **filters) -> str:
+        """SQLite's query plan for `find(**filters)`, to check an index is used."""
+        where, args = self._where(
+            *(filters.get(k) for k in ("inputhash", "outputhash", "module", "eventtype")),
+            filters.get("since"),
+            filters.get("until"),
+        )
+        with self._lock:
+            rows = self.db.execute(f"EXPLAIN QUERY PLAN SELECT event FROM events{where}", args)
+            return "; ".join(r[-1] for r in rows)
+
+    def reindex(self, prov_dir: str = None, audit_log_dir: str = None) -> int:
+        """Rebuild the index from bundle files/segments and, optionally, audit logs."""
+        from agents import provenance
+
+        with self._lock, self.db:
+            self.db.execute("DELETE FROM events")
+        total = 0
+        prov_dir = prov_dir or provenance.PROV_DIR
+        batch = []
+        for event in provenance.iter_events(prov_dir, resolve_blobs=False):
+            batch.append(event)
+            if len(batch) >= REINDEX_BATCH:
+                total += self.add_many(batch, source=prov_dir)
+                batch = []
+        total += self.add_many(batch, source=prov_dir)
+        if audit_log_dir:
+            for path in sorted(glob.glob(os.path.join(audit_log_dir, "audit_*.jsonl*"))):
+                if not path.endswith((".jsonl", ".jsonl.gz")):
+                    continue
+                entries = []
+                opener = gzip.open if path.endswith(".gz") else open
+                with opener(path, "rt") as f:
+                    for line in f:
+                        try:
+                            entries.append(json.loads(line))
+                        except json.JSONDecodeError:
+                            continue
+                        if len(entries) >= REINDEX_BATCH:
+                            total += self._add_audit_entries(entries, path)
+                            entries = []
+                total += self._add_audit_entries(entries, path)
+        return total
+
+    def _add_audit_entries(self, entries, source: str) -> int:
+        return self.add_many([audit_entry_event(e) for e in entries], source=source, bodies=entries)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the provenance index")
+    parser.add_argument("--db", default=DEFAULT_INDEX)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    get_parser = sub.add_parser("get", help="Show one event by provenancetoken")
+    get_parser.add_argument("token")
+
+    find_parser = sub.add_parser("find", help="List events matching filters")
+    for flag in ("inputhash", "outputhash", "module", "eventtype", "since", "until"):
+        find_parser.add_argument(f"--{flag}")
+    find_parser.add_argument("--limit", type=int, default=100)
+    find_parser.add_argument("--count", action="store_true", help="Print only the match count")
+
+    reindex_parser = sub.add_parser("reindex", help="Rebuild the index from files")
+    reindex_parser.add_argument("--prov-dir")
+    reindex_parser.add_argument("--audit-logs", help="ProvenanceLogger log_dir to include")
+    args = parser.parse_args()
+
+    with ProvenanceStore(args.db) as store:
+        if args.command == "get":
+            event = store.get(args.token)
+            if event is None:
+                raise SystemExit(f"no event with token {args.token}")
+            print(json.dumps(event, indent=2, sort_keys=True))
+        elif args.command == "find":
+            filters = {
+                k: getattr(args, k)
+                for k in ("inputhash", "outputhash", "module", "eventtype", "since", "until")
+            }
+            if args.count:
+                print(store.count(**filters))
+            else:
+                for event in store.find(limit=args.limit, **filters):
+                    print(json.dumps(event, sort_keys=True))
+        else:
+            print(f"indexed {store.reindex(args.prov_dir, args.audit_logs)} events")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+"""
+Asyncio listing fetcher for large backfills.
+
+Subreddits are walked concurrently (each one's `after=` cursor chain stays
+sequential) under a global semaphore plus a per-host semaphore. Records use the
+same shape as `fetch_reddit_json` and are appended to the `<name>_threads`
+segment stream as each page arrives, so memory stays flat regardless of
+backfill size. After every page the subreddit's high-water mark, including a
+resume cursor, is saved and its ids are added to the dedup store, so a walk
+that fails midway is resumed rather than repeated.
+
+    python -m ingestion.async_fetcher --base-url http://127.0.0.1:8765 \\
+        --targets r/a r/b --limit 5000 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    HTTPX_AVAILABLE = False
+
+from agents.jules.http_client import RETRY_STATUSES, backoff_delay, parse_retry_after
+from ingestion.reddit_scraper import (
+    DATA_DIR,
+    PAGE_SIZE,
+    REDDIT_BASE,
+    USERAGENT,
+    high_water_mark,
+    listing_cutoff,
+    load_state,
+    next_mark,
+    open_seen,
+    open_segments,
+    resume_cursor,
+    save_state,
+    take_page,
+)
+
+
+class AsyncFetcher:
+    def __init__(
+        self,
+        base_url: str = REDDIT_BASE,
+        out_dir: Path = None,
+        concurrency: int = 32,
+        per_host: int = 8,
+        timeout: float = 20,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        page_delay: float = 0.0,
+        storage: dict = None,
+        seen=None,
+        state_path: Path = None,
+    ):
+        if not HTTPX_AVAILABLE:
+            raise RuntimeError("httpx is required for the async fetcher (pip install httpx)")
+        self.base_url = base_url.rstrip("/")
+        self.out_dir = Path(out_dir) if out_dir else DATA_DIR
+        self.concurrency = concurrency
+        self.per_host = per_host
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.page_delay = page_delay
+        self.storage = storage or {}
+        self.seen = seen
+        self.state_path = state_path
+        self.stats = {"pages": 0, "posts": 0, "duplicates": 0, "retries": 0, "errors": 0}
+        self._global = None
+        self._hosts = {}
+
+    def _host_semaphore(self, url: str) -> asyncio.Semaphore:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = asyncio.Semaphore(self.per_host)
+        return self._hosts[host]
+
+    async def _get_json(self, client, url: str, params: dict) -> dict:
+        attempt = 0
+        while True:
+            async with self._global, self._host_semaphore(url):
+                try:
+                    resp = await client.get(url, params=params)
+                except httpx.TransportError:
+                    if attempt >= self.max_retries:
+                        raise
+                    delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+                else:
+                    if resp.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                        resp.raise_for_status()
+                        return resp.json()
+                    delay = parse_retry_after(resp.headers.get("Retry-After"))
+                    if delay is None:
+                        delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            # sleep outside the semaphores so a throttled sub does not hold a slot
+            attempt += 1
+            self.stats["retries"] += 1
+            await asyncio.sleep(delay)
+
+    async def fetch_subreddit(
+        self, client, subreddit: str, limit: int, cutoff: int = None, state: dict = None
+    ) -> int:
+        """
+        Walk one subreddit, streaming pages to disk; returns the records written.
+
+        `state[subreddit]` is the high-water mark to start from; it is replaced
+        (and saved to `state_path`) after every page.
+        """
+        name = subreddit[2:] if subreddit.startswith("r/") else subreddit
+        url = f"{self.base_url}/r/{name}/new.json"
+        state = state if state is not None else {}
+        since = state.get(subreddit)
+        taken = written = 0
+        walked = {}
+        after = resume_cursor(since)
+        cursor = after
+        with open_segments(f"{name}_threads", self.storage, self.out_dir) as writer:
+            while taken < limit:
+                params = {"limit": min(limit - taken, PAGE_SIZE), "raw_json": 1}
+                if after:
+                    params["after"] = after
+                listing = (await self._get_json(client, url, params)).get("data", {})
+                children = listing.get("children", [])
+                page, stop = take_page(children, limit - taken, cutoff, since)
+                taken += len(page)
+                walked = high_water_mark(page, walked)
+                if page:
+                    cursor = f"t3_{page[-1]['id']}"
+                fresh = self.seen.filter_new(page, commit=False) if self.seen else page
+                writer.write_many(fresh)
+                writer.flush()
+                if self.seen:
+                    self.seen.mark_seen(fresh)
+                written += len(fresh)
+                self.stats["pages"] += 1
+                self.stats["posts"] += len(fresh)
+                self.stats["duplicates"] += len(page) - len(fresh)
+                after = listing.get("after")
+                finished = bool(stop) or not children or not after
+                state[subreddit] = next_mark(
+                    since,
+                    walked,
+                    finished and stop != "limit",
+                    cursor,
+                    interrupted=not finished,
+                )
+                if self.state_path:
+                    save_state(state, self.state_path)
+                if finished:
+                    break
+                if self.page_delay:
+                    await asyncio.sleep(self.page_delay)
+        return written
+
+    async def run(
+        self, subreddits, limit: int = 100, lookback_days: int = None, state: dict = None
+    ) -> dict:
+        """
+        Fetch every subreddit concurrently.
+
+        `state` maps subreddit -> high-water mark as in `ingest_from_config`; it is
+        updated in place as pages are written. Returns {subreddit: number of new
+        records}.
+        """
+        state = state if state is not None else {}
+        self._global = asyncio.Semaphore(self.concurrency)
+        self._hosts = {}
+        self.out_dir.mkdir(parents=True, exist_ok=True)
+        cutoff = listing_cutoff(lookback_days)
+        limits = httpx.Limits(
+            max_connections=self.concurrency, max_keepalive_connections=self.concurrency
+        )
+        headers = {"User-Agent": USERAGENT}
+        async with httpx.AsyncClient(
+            headers=headers, limits=limits, timeout=self.timeout
+        ) as client:
+
+            async def one(sub):
+                try:
+                    written = await self.fetch_subreddit(client, sub, limit, cutoff, state)
+                except Exception as e:
+                    self.stats["errors"] += 1
+                    print(f"[ingest-async] error fetching {sub}: {e}")
+                    return sub, 0
+                return sub, written
+
+            results = await asyncio.gather(*(one(sub) for sub in subreddits))
+        return dict(results)
+
+
+def ingest_async(
+    subreddits,
+    limit: int = 100,
+    lookback_days: int = None,
+    state: dict = None,
+    **fetcher_kwargs,
+):
+    fetcher = AsyncFetcher(**fetcher_kwargs)
+    start = time.perf_counter()
+    counts = asyncio.run(fetcher.run(subreddits, limit, lookback_days, state))
+    elapsed = time.perf_counter() - start
+    summary = dict(fetcher.stats, seconds=round(elapsed, 3), per_subreddit=counts)
+    if elapsed > 0:
+        summary["pages_per_sec"] = round(fetcher.stats["pages"] / elapsed, 1)
+        summary["posts_per_sec"] = round(fetcher.stats["posts"] / elapsed, 1)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Async Reddit listing backfill")
+    parser.add_argument("--config", default="ingestion/subreddits.json")
+    parser.add_argument("--targets", nargs="+", help="Subreddits (overrides config targets)")
+    parser.add_argument("--base-url", default=REDDIT_BASE)
+    parser.add_argument("--out-dir", default=str(DATA_DIR))
+    parser.add_argument("--limit", type=int, help="Posts per subreddit")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--per-host", type=int, default=8)
+    args = parser.parse_args()
+
+    with open(args.config, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    targets = args.targets or cfg.get("targets", [])
+    limit = args.limit or cfg.get("threadspersubreddit", cfg.get("threads_per_subreddit", 100))
+    storage = cfg.get("storage", {})
+    state_path = Path(args.out_dir) / "ingest_state.json"
+    state = load_state(state_path)
+    seen = open_seen(cfg.get("dedup", {}))
+    try:
+        summary = ingest_async(
+            targets,
+            limit=limit,
+            lookback_days=cfg.get("lookback_days"),
+            state=state,
+            base_url=args.base_url,
+            out_dir=args.out_dir,
+            concurrency=args.concurrency,
+            per_host=args.per_host,
+            storage=storage,
+            seen=seen,
+            state_path=state_path,
+        )
+    finally:
+        if seen:
+            seen.close()
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
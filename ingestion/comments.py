@@ -0,0 +1,173 @@
+"""
+Comment-tree ingestion.
+
+One `comments/<id>.json` call fetches the bulk of a thread; the `more` stubs it
+leaves behind are expanded through `/api/morechildren.json` in batches of up
+to 100 ids instead of one request per stub. "Continue this thread" stubs (no
+ids, only a parent comment) are followed through that comment's permalink.
+Comments are flattened into records that keep `parent_id` (a t1_/t3_
+fullname) and `link_id` pointers, so reply chains can be rebuilt from the
+NDJSON without the nested listing.
+"""
+
+from typing import Dict, List, Tuple
+
+from agents.jules.http_client import get_client
+from ingestion import reddit_scraper
+from ingestion.reddit_scraper import USERAGENT, sha256_hex
+
+MORECHILDREN_BATCH = 100  # Reddit's per-call limit
+
+
+def normalize_comment(d: dict, subreddit: str) -> dict:
+    author = d.get("author", "") or ""
+    return {
+        "id": d.get("id"),
+        "parent_id": d.get("parent_id"),
+        "link_id": d.get("link_id"),
+        "subreddit": subreddit,
+        "author_hash": sha256_hex(author),
+        "body": d.get("body", ""),
+        "created_utc": int(d.get("created_utc", 0)),
+        "score": int(d.get("score", 0) or 0),
+        "depth": int(d.get("depth", 0) or 0),
+    }
+
+
+def _walk(children, subreddit: str, comments: List[dict], stubs: List[str], continued: List[str]):
+    """
+    Flatten a nested listing, collecting comment records, `more` stub ids and
+    the parent comment ids of "continue this thread" stubs.
+    """
+    stack = list(reversed(children))
+    while stack:
+        child = stack.pop()
+        kind, d = child.get("kind"), child.get("data", {})
+        if kind == "t1":
+            comments.append(normalize_comment(d, subreddit))
+            replies = d.get("replies")
+            if isinstance(replies, dict):
+                stack.extend(reversed(replies.get("data", {}).get("children", [])))
+        elif kind == "more":
+            if d.get("children"):
+                stubs.extend(d["children"])
+            elif str(d.get("parent_id", "")).startswith("t1_"):
+                continued.append(d["parent_id"][3:])
+
+
+def fetch_comment_tree(
+    subreddit: str,
+    thread_id: str,
+    max_requests: int = 10,
+    base_url: str = None,
+) -> Tuple[List[dict], Dict]:
+    """
+    Fetch and flatten every reachable comment of one thread.
+
+    At most `max_requests` HTTP calls are made (the initial tree, batched
+    morechildren calls, then one call per "continue this thread" stub); ids
+    that could not be expanded within that budget are reported as
+    `unexpanded`, continuation stubs left unfollowed as `unexpanded_continued`.
+    Returns (comments, report).
+    """
+    base = (base_url or reddit_scraper.REDDIT_BASE).rstrip("/")
+    name = subreddit[2:] if subreddit.startswith("r/") else subreddit
+    sub_label = f"r/{name}"
+    link_id = thread_id if thread_id.startswith("t3_") else f"t3_{thread_id}"
+    headers = {"User-Agent": USERAGENT}
+    http = get_client()
+
+    r = http.get(
+        f"{base}/r/{name}/comments/{link_id[3:]}.json",
+        headers=headers,
+        params={"limit": 500, "sort": "new", "raw_json": 1},
+        timeout=20,
+    )
+    r.raise_for_status()
+    requests_made = 1
+    payload = r.json()
+    comments: List[dict] = []
+    stubs: List[str] = []
+    continued: List[str] = []
+    if isinstance(payload, list) and len(payload) > 1:
+        children = payload[1].get("data", {}).get("children", [])
+        _walk(children, sub_label, comments, stubs, continued)
+
+    seen = {c["id"] for c in comments}
+    expanded = 0
+    followed = 0
+    while (stubs or continued) and requests_made < max_requests:
+        found: List[dict] = []
+        if stubs:
+            batch, stubs = stubs[:MORECHILDREN_BATCH], stubs[MORECHILDREN_BATCH:]
+            r = http.get(
+                f"{base}/api/morechildren.json",
+                headers=headers,
+                params={
+                    "api_type": "json",
+                    "link_id": link_id,
+                    "children": ",".join(batch),
+                    "limit_children": "false",
+                    "raw_json": 1,
+                },
+                timeout=20,
+            )
+            r.raise_for_status()
+            expanded += len(batch)
+            things = r.json().get("json", {}).get("data", {}).get("things", [])
+        else:
+            r = http.get(
+                f"{base}/r/{name}/comments/{link_id[3:]}/_/{continued.pop(0)}.json",
+                headers=headers,
+                params={"limit": 500, "sort": "new", "raw_json": 1},
+                timeout=20,
+            )
+            r.raise_for_status()
+            followed += 1
+            payload = r.json()
+            things = []
+            if isinstance(payload, list) and len(payload) > 1:
+                things = payload[1].get("data", {}).get("children", [])
+        requests_made += 1
+        _walk(things, sub_label, found, stubs, continued)
+        for c in found:
+            if c["id"] not in seen:
+                seen.add(c["id"])
+                comments.append(c)
+
+    report = {
+        "thread_id": link_id[3:],
+        "requests": requests_made,
+        "comments": len(comments),
+        "more_expanded": expanded,
+        "unexpanded": len(stubs),
+        "continued": followed,
+        "unexpanded_continued": len(continued),
+    }
+    return comments, report
+
+
+def ingest_comments(subreddit: str, threads, writer, max_requests: int = 10) -> Dict:
+    """Fetch comment trees for `threads` (records with id/num_comments) into `writer`."""
+    totals = {
+        "threads": 0,
+        "requests": 0,
+        "comments": 0,
+        "unexpanded": 0,
+        "unexpanded_continued": 0,
+        "errors": 0,
+    }
+    for t in threads:
+        if not t.get("num_comments"):
+            continue
+        try:
+            comments, report = fetch_comment_tree(subreddit, t["id"], max_requests=max_requests)
+        except Exception as e:
+            totals["errors"] += 1
+            print(f"[ingest] error fetching comments for {t['id']}: {e}")
+            continue
+        writer.write_many(comments)
+        totals["threads"] += 1
+        for key in ("requests", "comments", "unexpanded", "unexpanded_continued"):
+            totals[key] += report[key]
+    return totals
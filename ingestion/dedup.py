@@ -0,0 +1,200 @@
+"""
+Cross-run dedup of ingested records.
+
+`SeenStore` keeps two structures in one directory:
+
+- `bloom.bin`: a Bloom filter over every id ever stored. A negative answer is
+  definitive, so most genuinely new records never touch the disk index.
+- `index.sqlite`: the exact id -> content-hash map consulted when the filter
+  says "maybe". A record is dropped only when its id is known and its content
+  hash is unchanged; edited posts pass through and update the index.
+
+The filter is rebuilt from the index whenever the two disagree (different
+parameters, or a crash after the index was committed but before the filter
+was saved), so the negative path stays exact.
+"""
+
+import hashlib
+import json
+import logging
+import math
+import os
+import sqlite3
+import struct
+from pathlib import Path
+from typing import Iterable, List
+
+logger = logging.getLogger(__name__)
+
+CONTENT_FIELDS = ("title", "selftext", "body")
+_BLOOM_MAGIC = b"LEBF1"
+_BLOOM_HEADER = struct.Struct("<5sQIQ")  # magic, bits, hashes, count
+
+
+def content_hash(record: dict, fields=CONTENT_FIELDS) -> str:
+    """Hash of the fields detectors read; vote and comment counts do not count as changes."""
+    values = [record.get(f) for f in fields]
+    return hashlib.sha256(json.dumps(values, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+
+class BloomFilter:
+    def __init__(self, capacity: int, fp_rate: float):
+        if capacity <= 0 or not 0 < fp_rate < 1:
+            raise ValueError("capacity must be positive and 0 < fp_rate < 1")
+        self.capacity = capacity
+        self.fp_rate = fp_rate
+        self.num_bits = max(8, int(math.ceil(-capacity * math.log(fp_rate) / (math.log(2) ** 2))))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return len(self.bits)
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        m = self.num_bits
+        return [(h1 + i * h2) % m for i in range(self.num_hashes)]
+
+    def add(self, key: str):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def save(self, path: Path):
+        tmp = path.with_name(path.name + ".tmp")
+        with open(tmp, "wb") as fh:
+            fh.write(_BLOOM_HEADER.pack(_BLOOM_MAGIC, self.num_bits, self.num_hashes, self.count))
+            fh.write(self.bits)
+            fh.flush()
+            os.fsync(fh.fileno())
+        os.replace(tmp, path)
+
+    def load_into(self, path: Path) -> bool:
+        """Load bits saved with the same parameters; False if absent or incompatible."""
+        if not path.exists():
+            return False
+        with open(path, "rb") as fh:
+            header = fh.read(_BLOOM_HEADER.size)
+            if len(header) != _BLOOM_HEADER.size:
+                return False
+            magic, num_bits, num_hashes, count = _BLOOM_HEADER.unpack(header)
+            if (magic, num_bits, num_hashes) != (_BLOOM_MAGIC, self.num_bits, self.num_hashes):
+                return False
+            bits = fh.read()
+        if len(bits) != len(self.bits):
+            return False
+        self.bits = bytearray(bits)
+        self.count = count
+        return True
+
+
+class SeenStore:
+    def __init__(self, directory, capacity: int = 1_000_000, fp_rate: float = 0.001):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.bloom_path = self.directory / "bloom.bin"
+        self.bloom = BloomFilter(capacity, fp_rate)
+        self.db = sqlite3.connect(str(self.directory / "index.sqlite"))
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS seen (id TEXT PRIMARY KEY, content_hash TEXT NOT NULL)"
+        )
+        self.db.commit()
+        self.stats = {"checked": 0, "dropped": 0, "updated": 0, "bloom_negative": 0}
+        indexed = self.db.execute("SELECT COUNT(*) FROM seen").fetchone()[0]
+        if not self.bloom.load_into(self.bloom_path) or self.bloom.count != indexed:
+            self._rebuild_bloom()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _rebuild_bloom(self):
+        self.bloom.bits = bytearray(len(self.bloom.bits))
+        self.bloom.count = 0
+        for (key,) in self.db.execute("SELECT id FROM seen"):
+            self.bloom.add(key)
+        if self.bloom.count > self.bloom.capacity:
+            logger.warning(
+                f"Seen-id store holds {self.bloom.count} ids, above its Bloom capacity "
+                f"{self.bloom.capacity}; false-positive rate will exceed {self.bloom.fp_rate}"
+            )
+        self.bloom.save(self.bloom_path)
+
+    def _known(self, ids) -> dict:
+        ids = list(ids)
+        known = {}
+        for i in range(0, len(ids), 500):
+            chunk = ids[i : i + 500]
+            marks = ",".join("?" * len(chunk))
+            known.update(
+                self.db.execute(f"SELECT id, content_hash FROM seen WHERE id IN ({marks})", chunk)
+            )
+        return known
+
+    def filter_new(
+        self, records: Iterable[dict], key: str = "id", commit: bool = True
+    ) -> List[dict]:
+        """
+        Return records that are new or changed.
+
+        With commit=False nothing is remembered; call `mark_seen` once the
+        records are safely stored, so a failed write does not turn them into
+        duplicates forever.
+        """
+        records = list(records)
+        maybe = [r[key] for r in records if r.get(key) is not None and r[key] in self.bloom]
+        maybe_set = set(maybe)
+        known = self._known(maybe)
+        out, rows = [], {}
+        for rec in records:
+            rid = rec.get(key)
+            self.stats["checked"] += 1
+            if rid is None:
+                out.append(rec)
+                continue
+            h = content_hash(rec)
+            prev = rows.get(rid, known.get(rid))
+            if prev == h:
+                self.stats["dropped"] += 1
+                continue
+            if prev is None:
+                self.stats["bloom_negative"] += rid not in maybe_set
+            else:
+                self.stats["updated"] += 1
+            rows[rid] = h
+            out.append(rec)
+        if commit:
+            self.mark_seen(out, key)
+        return out
+
+    def mark_seen(self, records: Iterable[dict], key: str = "id"):
+        """Remember records (their ids and content hashes) as stored."""
+        rows = {r[key]: content_hash(r) for r in records if r.get(key) is not None}
+        if not rows:
+            return
+        known = self._known(rid for rid in rows if rid in self.bloom)
+        for rid in rows:
+            if rid not in known:
+                self.bloom.add(rid)
+        with self.db:
+            self.db.executemany(
+                "INSERT OR REPLACE INTO seen (id, content_hash) VALUES (?, ?)", rows.items()
+            )
+
+    def save(self):
+        self.bloom.save(self.bloom_path)
+
+    def close(self):
+        self.save()
+        self.db.close()
@@ -0,0 +1,247 @@
+"""
+Local Reddit-compatible fixture server for offline ingestion tests and benchmarks.
+
+Serves `/r/<name>/new.json` from an in-memory corpus with Reddit's `limit` /
+`after` pagination, optional per-request latency, seeded 429 throttling with
+`Retry-After`, and ETag revalidation.
+
+    python -m ingestion.fixture_server --port 8765 --synthetic 20x5000 \\
+        --latency-ms 40 --throttle-rate 0.02
+    REDDIT_BASE_URL=http://127.0.0.1:8765 python -m ingestion.reddit_scraper
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from ingestion.ndjson_store import iter_records
+
+MAX_LIMIT = 100
+
+WORDS = (
+    "model consciousness emergent quantum field aware token attention latent "
+    "resonance recursive mirror signal theory energy entropy physics alignment"
+).split()
+
+
+def raw_from_record(rec: dict) -> dict:
+    """Turn a stored record (normalized or a raw listing child) back into listing `data`."""
+    if "kind" in rec and "data" in rec:
+        return rec["data"]
+    if "name" in rec and "author" in rec:
+        return rec
+    sub = rec.get("subreddit", "")
+    return {
+        "id": rec["id"],
+        "name": f"t3_{rec['id']}",
+        "title": rec.get("title", ""),
+        "selftext": rec.get("selftext", ""),
+        "author": rec.get("author_hash", ""),
+        "created_utc": rec.get("created_utc", 0),
+        "num_comments": rec.get("num_comments", 0),
+        "subreddit": sub[2:] if sub.startswith("r/") else sub,
+    }
+
+
+def load_corpus(patterns) -> dict:
+    """Load NDJSON streams (normalized thread records or raw listing children) by subreddit."""
+    corpus = {}
+    for rec in iter_records(patterns):
+        post = raw_from_record(rec)
+        corpus.setdefault(post["subreddit"], []).append(post)
+    for posts in corpus.values():
+        posts.sort(key=lambda p: p.get("created_utc", 0), reverse=True)
+    return corpus
+
+
+def synthetic_corpus(subreddits: int, posts_per_sub: int, seed: int = 0, now: int = None) -> dict:
+    """Small seeded corpus of raw listing posts, newest first."""
+    rng = random.Random(seed)
+    now = now or int(time.time())
+    corpus = {}
+    for s in range(subreddits):
+        sub = f"synthetic{s:03d}"
+        created = now
+        posts = []
+        for i in range(posts_per_sub):
+            created -= rng.randint(30, 3600)
+            posts.append(
+                {
+                    "id": f"s{s:03d}p{i:07d}",
+                    "name": f"t3_s{s:03d}p{i:07d}",
+                    "title": " ".join(rng.choices(WORDS, k=6)),
+                    "selftext": " ".join(rng.choices(WORDS, k=40)),
+                    "author": f"user{rng.randint(0, 999)}",
+                    "created_utc": created,
+                    "num_comments": rng.randint(0, 50),
+                    "subreddit": sub,
+                }
+            )
+        corpus[sub] = posts
+    return corpus
+
+
+class FixtureServer:
+    """Threaded HTTP server over a corpus of {subreddit: [raw post, newest first]}."""
+
+    def __init__(
+        self,
+        corpus: dict,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        throttle_rate: float = 0.0,
+        retry_after: int = 1,
+        seed: int = 0,
+    ):
+        self.corpus = {k.lower(): v for k, v in corpus.items()}
+        self._index = {
+            sub: {p["name"]: i for i, p in enumerate(posts)} for sub, posts in self.corpus.items()
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.stats = {"requests": 0, "throttled": 0, "not_modified": 0}
+        self.httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self.httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _draw(self):
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0.0)
+            throttle = self.throttle_rate and self._rng.random() < self.throttle_rate
+            if throttle:
+                self.stats["throttled"] += 1
+            return delay, throttle
+
+    def page(self, sub: str, limit: int, after: str = None):
+        posts = self.corpus.get(sub.lower())
+        if posts is None:
+            return None
+        start = 0
+        if after:
+            start = self._index[sub.lower()].get(after, len(posts) - 1) + 1
+        chunk = posts[start : start + max(1, min(limit, MAX_LIMIT))]
+        nxt = chunk[-1]["name"] if chunk and start + len(chunk) < len(posts) else None
+        return {
+            "kind": "Listing",
+            "data": {
+                "after": nxt,
+                "before": None,
+                "dist": len(chunk),
+                "children": [{"kind": "t3", "data": p} for p in chunk],
+            },
+        }
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, code, body=b"", headers=None):
+                self.send_response(code)
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                delay, throttle = server._draw()
+                if delay:
+                    time.sleep(delay)
+                if throttle:
+                    return self._send(429, headers={"Retry-After": str(server.retry_after)})
+                parts = urlsplit(self.path)
+                segs = parts.path.strip("/").split("/")
+                if len(segs) != 3 or segs[0] != "r" or segs[2] != "new.json":
+                    return self._send(404)
+                qs = parse_qs(parts.query)
+                listing = server.page(
+                    segs[1], int(qs.get("limit", ["25"])[0]), qs.get("after", [None])[0]
+                )
+                if listing is None:
+                    return self._send(404)
+                body = json.dumps(listing).encode("utf-8")
+                etag = '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+                if self.headers.get("If-None-Match") == etag:
+                    with server._lock:
+                        server.stats["not_modified"] += 1
+                    return self._send(304, headers={"ETag": etag})
+                self._send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reddit-compatible fixture server")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--corpus", nargs="+", help="NDJSON globs to serve (recorded corpus)")
+    parser.add_argument("--synthetic", default="2x500", help="SUBSxPOSTS synthetic corpus")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--retry-after", type=int, default=1)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        subs, per_sub = (int(x) for x in args.synthetic.split("x"))
+        corpus = synthetic_corpus(subs, per_sub, seed=args.seed)
+    server = FixtureServer(
+        corpus,
+        host=args.host,
+        port=args.port,
+        latency=args.latency_ms / 1000.0,
+        jitter=args.jitter_ms / 1000.0,
+        throttle_rate=args.throttle_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"[fixture] serving {len(corpus)} subreddits on {server.base_url}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Append-only, segmented NDJSON storage for raw ingestion data.
+
+A stream `<stem>` lives next to the legacy `<stem>.ndjson` file as segments
+
+    <dir>/<stem>.<YYYYMMDD>-<NNNN>.ndjson[.gz|.zst]
+
+Each run appends to the newest segment (as a new gzip member / zstd frame), a
+new segment starts when the current one passes `max_bytes` or the UTC day
+changes, and every segment is fsynced when it is closed. `iter_records`
+reads plain, gzip and zstd files lazily, so callers can take a path, a glob or
+a stream prefix without caring how the data was written.
+"""
+
+import glob
+import gzip
+import io
+import json
+import logging
+import os
+import re
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import zstandard
+
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+SUFFIXES = {None: ".ndjson", "gzip": ".ndjson.gz", "zstd": ".ndjson.zst"}
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+_SEGMENT_RE = re.compile(r"\.(\d{8})-(\d{4})\.ndjson(\.gz|\.zst)?$")
+
+
+def _utc_day() -> str:
+    return datetime.now(timezone.utc).strftime("%Y%m%d")
+
+
+def _fsync_dir(path: Path):
+    try:
+        fd = os.open(str(path), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class SegmentWriter:
+    def __init__(
+        self,
+        directory,
+        stem: str,
+        compression: str = "gzip",
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        rotate_daily: bool = True,
+        fsync: bool = True,
+        clock=_utc_day,
+        mtime: int = None,
+    ):
+        if compression not in SUFFIXES:
+            raise ValueError(f"unknown compression: {compression}")
+        if compression == "zstd" and not ZSTD_AVAILABLE:
+            raise RuntimeError("zstd compression requires the zstandard package")
+        self.directory = Path(directory)
+        self.stem = stem
+        self.compression = compression
+        self.max_bytes = max_bytes
+        self.rotate_daily = rotate_daily
+        self.fsync = fsync
+        self._clock = clock
+        self.mtime = mtime  # gzip header mtime; None stamps the current time
+        self._raw = None
+        self._stream = None
+        self._day = None
+        self._seq = 0
+        self.path = None
+        self.records_written = 0
+        self.segments_closed = 0
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def segments(self):
+        return sorted(
+            p
+            for p in self.directory.glob(f"{glob.escape(self.stem)}.*")
+            if _SEGMENT_RE.search(p.name) and p.name.endswith(SUFFIXES[self.compression])
+        )
+
+    def write(self, record: dict):
+        self.write_many((record,))
+
+    def write_many(self, records) -> int:
+        n = 0
+        for rec in records:
+            if self._stream is None or self._should_rotate():
+                self._rotate()
+            self._stream.write((json.dumps(rec, ensure_ascii=False) + "\n").encode("utf-8"))
+            n += 1
+        self.records_written += n
+        return n
+
+    def flush(self):
+        if self._stream is not None:
+            self._stream.flush()
+            self._raw.flush()
+
+    def close(self):
+        self._close_segment()
+
+    def _should_rotate(self) -> bool:
+        if self.rotate_daily and self._clock() != self._day:
+            return True
+        return self.max_bytes and self._raw.tell() >= self.max_bytes
+
+    def _rotate(self):
+        if self._stream is not None:
+            self._close_segment()
+            self._seq += 1
+        day = self._clock() if self.rotate_daily or self._day is None else self._day
+        if day != self._day:
+            self._day = day
+            self._seq = self._resume_seq(day)
+        path = self.directory / f"{self.stem}.{day}-{self._seq:04d}{SUFFIXES[self.compression]}"
+        created = not path.exists()
+        self._raw = open(path, "ab")
+        if self.compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._raw, mode="wb", mtime=self.mtime)
+        elif self.compression == "zstd":
+            self._stream = zstandard.ZstdCompressor().stream_writer(self._raw, closefd=False)
+        else:
+            self._stream = self._raw
+        self.path = path
+        if created and self.fsync:
+            _fsync_dir(self.directory)
+
+    def _resume_seq(self, day: str) -> int:
+        """Continue the newest segment of `day` if it still has room."""
+        seqs = []
+        for p in self.segments():
+            m = _SEGMENT_RE.search(p.name)
+            if m.group(1) == day:
+                seqs.append((int(m.group(2)), p))
+        if not seqs:
+            return 0
+        seq, path = max(seqs)
+        if self.max_bytes and path.stat().st_size >= self.max_bytes:
+            return seq + 1
+        return seq
+
+    def _close_segment(self):
+        if self._stream is None:
+            return
+        if self._stream is not self._raw:
+            self._stream.close()
+        self._raw.flush()
+        if self.fsync:
+            os.fsync(self._raw.fileno())
+        self._raw.close()
+        self._stream = self._raw = None
+        self.segments_closed += 1
+
+
+def open_text(path):
+    """Open a plain, .gz or .zst NDJSON file for text reading."""
+    path = str(path)
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.endswith(".zst"):
+        if not ZSTD_AVAILABLE:
+            raise RuntimeError(f"reading {path} requires the zstandard package")
+        raw = open(path, "rb")
+        reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def expand_paths(paths):
+    """Resolve a path, glob, directory or list of them to sorted NDJSON files."""
+    if isinstance(paths, (str, os.PathLike)):
+        paths = [paths]
+    out = []
+    for p in paths:
+        p = str(p)
+        if os.path.isdir(p):
+            out.extend(sorted(glob.glob(os.path.join(p, "*.ndjson*"))))
+        elif any(c in p for c in "*?["):
+            out.extend(sorted(glob.glob(p)))
+        elif os.path.exists(p):
+            out.append(p)
+    return out
+
+
+def iter_records(paths):
+    """Lazily yield decoded records from every file in `paths` (see `expand_paths`)."""
+    for path in expand_paths(paths):
+        with open_text(path) as fh:
+            try:
+                for line in fh:
+                    if line.strip():
+                        yield json.loads(line)
+            except EOFError:
+                # a writer died before closing its last gzip member; keep what was flushed
+                logger.warning(f"Truncated segment: {path}")
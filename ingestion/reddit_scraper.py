@@ -3,67 +3,289 @@ import json
 import hashlib
 import time
 from pathlib import Path
-from datetime import datetime, timedelta
-import requests
+from datetime import timedelta
+from agents.jules.http_client import get_client
+from ingestion.dedup import SeenStore
+from ingestion.ndjson_store import DEFAULT_MAX_BYTES, SegmentWriter
 
 DATA_DIR = Path("data/raw")
 DATA_DIR.mkdir(parents=True, exist_ok=True)
+STATE_PATH = DATA_DIR / "ingest_state.json"
 
 USERAGENT = os.getenv("REDDIT_USER_AGENT", "llm-echo/0.1 (by /u/yourusername)")
+# point at a local fixture server (ingestion.fixture_server) for offline runs
+REDDIT_BASE = os.getenv("REDDIT_BASE_URL", "https://www.reddit.com").rstrip("/")
+PAGE_SIZE = 100
+PAGE_DELAY = 1.0  # polite pause between listing pages
 
 
 def sha256_hex(s: str) -> str:
     return hashlib.sha256(s.encode("utf-8")).hexdigest()
 
 
-def save_ndjson(path: Path, items):
+def load_state(path: Path = None) -> dict:
+    path = path or STATE_PATH
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_state(state: dict, path: Path = None):
+    path = path or STATE_PATH
     path.parent.mkdir(parents=True, exist_ok=True)
-    with open(path, "w", encoding="utf-8") as fh:
-        for it in items:
-            fh.write(json.dumps(it, ensure_ascii=False) + "\n")
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(state, fh, indent=2, sort_keys=True)
+    os.replace(tmp, path)
+
+
+def normalize_post(d: dict) -> dict:
+    author = d.get("author", "") or ""
+    return {
+        "id": d.get("id"),
+        "title": d.get("title", ""),
+        "selftext": d.get("selftext", ""),
+        "author_hash": sha256_hex(author),
+        "created_utc": int(d.get("created_utc", 0)),
+        "num_comments": int(d.get("num_comments", 0)),
+        "subreddit": f"r/{d.get('subreddit', '')}",
+        "claims": [],  # Placeholder for claims
+    }
+
+
+def listing_cutoff(lookback_days: int = None):
+    if not lookback_days:
+        return None
+    return int(time.time() - timedelta(days=lookback_days).total_seconds())
+
+
+def take_page(children, remaining: int, cutoff: int = None, since: dict = None):
+    """
+    Normalize one listing page, newest first.
+
+    Returns (records, stop) where stop is None while further pages are needed,
+    else why the walk ended: "limit" (`remaining` records taken), "cutoff" (the
+    lookback window) or "mark" (older than the `since` high-water mark). Posts
+    created in the mark's second are kept unless their id is already recorded
+    in the mark's `boundary_ids`.
+    """
+    since = since or {}
+    since_created = int(since.get("created_utc", 0) or 0)
+    boundary = set(since.get("boundary_ids") or [])
+    if since.get("fullname"):
+        boundary.add(since["fullname"][3:])
+    out = []
+    for child in children:
+        d = child.get("data", {})
+        created = int(d.get("created_utc", 0))
+        if since_created and created < since_created:
+            return out, "mark"
+        if cutoff and created < cutoff:
+            return out, "cutoff"
+        if d.get("id") in boundary:
+            if not since_created:
+                return out, "mark"  # a mark without a timestamp: stop at its post
+            continue  # created in the mark's second and taken by an earlier run
+        out.append(normalize_post(d))
+        if len(out) >= remaining:
+            return out, "limit"
+    return out, None
+
+
+def fetch_reddit_json(
+    subreddit: str,
+    limit: int = 100,
+    lookback_days: int = None,
+    since: dict = None,
+):
+    """
+    Walk r/<name>/new.json newest-first with `after=` cursors.
+
+    Stops once `limit` posts were collected, a post older than `lookback_days`
+    shows up, or the `since` high-water mark from a previous run is reached.
+    Returns normalized records, newest first.
+    """
+    return walk_listing(subreddit, limit, lookback_days, since)[0]
+
 
+def walk_listing(
+    subreddit: str,
+    limit: int = 100,
+    lookback_days: int = None,
+    since: dict = None,
+):
+    """
+    `fetch_reddit_json` that also returns the mark to store for the next run.
 
-def fetch_reddit_json(subreddit: str, limit: int = 100):
+    A walk that stops at `limit` before reaching `since` leaves a gap; the
+    returned mark then records where to resume (see `next_mark`), and the next
+    walk continues down from there instead of starting at the newest post.
+    """
     # subreddit expected in form "r/Name"
     name = subreddit[2:] if subreddit.startswith("r/") else subreddit
-    url = f"https://www.reddit.com/r/{name}/new.json?limit={min(limit, 100)}"
+    url = f"{REDDIT_BASE}/r/{name}/new.json"
     headers = {"User-Agent": USERAGENT}
-    r = requests.get(url, headers=headers, timeout=20)
-    r.raise_for_status()
-    data = r.json()
+    cutoff = listing_cutoff(lookback_days)
+
+    http = get_client()
     out = []
-    for child in data.get("data", {}).get("children", []):
-        d = child.get("data", {})
-        author = d.get("author", "") or ""
-        out.append(
-            {
-                "id": d.get("id"),
-                "title": d.get("title", ""),
-                "selftext": d.get("selftext", ""),
-                "author_hash": sha256_hex(author),
-                "created_utc": int(d.get("created_utc", 0)),
-                "num_comments": int(d.get("num_comments", 0)),
-                "subreddit": f"r/{d.get('subreddit', '')}",
-                "claims": [],  # Placeholder for claims
+    after = resume_cursor(since)
+    stop = None
+    while len(out) < limit:
+        params = {"limit": min(limit - len(out), PAGE_SIZE), "raw_json": 1}
+        if after:
+            params["after"] = after
+        r = http.get(url, headers=headers, params=params, timeout=20)
+        r.raise_for_status()
+        listing = r.json().get("data", {})
+        children = listing.get("children", [])
+        page, stop = take_page(children, limit - len(out), cutoff, since)
+        out.extend(page)
+        after = listing.get("after")
+        if stop or not children or not after:
+            break
+        time.sleep(PAGE_DELAY)
+    cursor = f"t3_{out[-1]['id']}" if out else resume_cursor(since)
+    return out, next_mark(since, high_water_mark(out), stop != "limit", cursor)
+
+
+def high_water_mark(items, previous: dict = None) -> dict:
+    """
+    Return the newest {"fullname", "created_utc", "boundary_ids"} among items and
+    the previous mark; `boundary_ids` are all ids created in that same second.
+    """
+    mark = {k: v for k, v in (previous or {}).items() if k != "resume"}
+    for it in items:
+        created = int(it.get("created_utc", 0))
+        current = int(mark.get("created_utc", 0) or 0)
+        if created > current:
+            mark = {
+                "fullname": f"t3_{it['id']}",
+                "created_utc": created,
+                "boundary_ids": [it["id"]],
             }
-        )
-    return out
+        elif created == current and it["id"] not in mark.get("boundary_ids", []):
+            mark["boundary_ids"] = mark.get("boundary_ids", []) + [it["id"]]
+    return mark
+
+
+def resume_cursor(since: dict = None):
+    """The `after=` cursor an unfinished backfill recorded in `since`, if any."""
+    return ((since or {}).get("resume") or {}).get("after")
+
+
+def next_mark(
+    previous: dict, walked: dict, complete: bool, cursor: str = None, interrupted: bool = False
+) -> dict:
+    """
+    The high-water mark to store after a walk.
+
+    Args:
+        previous: The mark the walk started from (may carry a "resume" entry)
+        walked: high_water_mark of the records this walk took
+        complete: Whether the walk reached `previous` (or the lookback cutoff or
+            the end of the listing) rather than stopping at its limit
+        cursor: Fullname of the last record taken, to resume an incomplete walk
+        interrupted: The walk is still running (a checkpoint); resume from
+            `cursor` even on a first run that has no previous mark
+    """
+    previous = previous or {}
+    resume = previous.get("resume")
+    newest = high_water_mark([], resume["mark"] if resume else previous)
+    walked_created = int(walked.get("created_utc", 0) or 0)
+    newest_created = int(newest.get("created_utc", 0) or 0)
+    if walked_created > newest_created:
+        newest = walked
+    elif walked_created and walked_created == newest_created:
+        ids = newest.get("boundary_ids", []) + walked.get("boundary_ids", [])
+        newest["boundary_ids"] = list(dict.fromkeys(ids))
+    base = {k: v for k, v in previous.items() if k != "resume"}
+    if complete or not (base or interrupted):
+        return newest
+    # keep the old mark until the gap down to it has been walked
+    return dict(base, resume={"after": cursor, "mark": newest})
+
+
+def open_segments(stem: str, storage: dict = None, directory: Path = None) -> SegmentWriter:
+    """SegmentWriter for a raw stream, configured from the ingestion config's "storage" block."""
+    storage = storage or {}
+    return SegmentWriter(
+        directory or DATA_DIR,
+        stem,
+        compression=storage.get("compression", "gzip"),
+        max_bytes=storage.get("segment_max_bytes", DEFAULT_MAX_BYTES),
+        rotate_daily=storage.get("rotate_daily", True),
+    )
+
+
+def open_seen(dedup_cfg: dict):
+    """SeenStore configured from the ingestion config's "dedup" block, or None if disabled."""
+    if not dedup_cfg.get("enabled", True):
+        return None
+    return SeenStore(
+        dedup_cfg.get("dir", DATA_DIR / ".seen"),
+        capacity=dedup_cfg.get("capacity", 1_000_000),
+        fp_rate=dedup_cfg.get("fp_rate", 0.001),
+    )
 
 
 def ingest_from_config(config_path: str = "ingestion/subreddits.json"):
     with open(config_path, "r", encoding="utf-8") as f:
         cfg = json.load(f)
+    # the shipped config spells it "threadspersubreddit"; accept both
+    limit = cfg.get("threadspersubreddit", cfg.get("threads_per_subreddit", 100))
+    lookback_days = cfg.get("lookback_days")
+    storage = cfg.get("storage", {})
+    comments_cfg = cfg.get("comments", {})
+    seen = open_seen(cfg.get("dedup", {}))
+    state = load_state()
+    # ETag/Last-Modified of earlier runs, so unchanged listing pages cost a 304
+    validators = STATE_PATH.with_name("http_validators.json")
+    http = get_client()
+    http.load_validators(validators)
     out = {}
-    for sub in cfg.get("targets", []):
-        try:
-            items = fetch_reddit_json(sub, limit=cfg.get("threads_per_subreddit", 100))
-            out[sub] = items
-            outfile = DATA_DIR / f"{sub[2:]}_threads.ndjson"
-            save_ndjson(outfile, items)
-            print(f"[ingest] saved {len(items)} threads -> {outfile}")
-            time.sleep(2)  # polite pause
-        except Exception as e:
-            print(f"[ingest] error fetching {sub}: {e}")
+    try:
+        for sub in cfg.get("targets", []):
+            try:
+                previous = state.get(sub)
+                fetched, mark = walk_listing(
+                    sub, limit=limit, lookback_days=lookback_days, since=previous
+                )
+                # check only; ids are remembered once the segment write succeeded
+                items = seen.filter_new(fetched, commit=False) if seen else fetched
+                out[sub] = items
+                with open_segments(f"{sub[2:]}_threads", storage) as writer:
+                    writer.write_many(items)
+                if comments_cfg.get("enabled"):
+                    from ingestion.comments import ingest_comments
+
+                    with open_segments(f"{sub[2:]}_comments", storage) as cwriter:
+                        totals = ingest_comments(
+                            sub, items, cwriter, comments_cfg.get("max_requests_per_thread", 10)
+                        )
+                    print(
+                        f"[ingest] saved {totals['comments']} comments from {totals['threads']} "
+                        f"threads in {totals['requests']} requests "
+                        f"({totals['unexpanded']} unexpanded, "
+                        f"{totals['unexpanded_continued']} continued threads not followed) "
+                        f"-> {cwriter.path or DATA_DIR}"
+                    )
+                if seen:
+                    seen.mark_seen(items)
+                state[sub] = mark
+                save_state(state)
+                print(
+                    f"[ingest] saved {len(items)} new threads "
+                    f"({len(fetched) - len(items)} duplicates dropped) -> {writer.path or DATA_DIR}"
+                )
+                time.sleep(2)  # polite pause
+            except Exception as e:
+                print(f"[ingest] error fetching {sub}: {e}")
+    finally:
+        http.save_validators(validators)
+        if seen:
+            seen.close()
     return out
 
 
@@ -0,0 +1,270 @@
+"""
+Seeded synthetic corpus generator for scale benchmarks.
+
+Streams N posts across M subreddits in the record shape `fetch_reddit_json`
+produces, plus a ground-truth sidecar saying which echo cluster each post
+belongs to and which hallucination keywords were planted in it. The same
+seed and parameters always produce the same bytes (timestamps start at a
+fixed epoch, segments are named after it and gzip headers carry no mtime),
+and memory stays bounded by the number of open echo clusters, so millions of
+posts are fine.
+
+    python -m ingestion.synthetic --posts 1000000 --subreddits 50 --out data/synthetic
+    python -m ingestion.fixture_server --corpus 'data/synthetic/*_threads*'
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, Tuple
+
+from ingestion.ndjson_store import SegmentWriter
+
+DEFAULT_START_UTC = 1_704_067_200  # 2024-01-01T00:00:00Z
+
+# mirrors DetectorConfig.hallucination_keywords so planted keywords are the ones detected
+HALLUCINATION_KEYWORDS = (
+    "I am conscious",
+    "I feel",
+    "I experience",
+    "I am sentient",
+    "I have emotions",
+    "I am aware",
+    "I understand myself",
+    "quantum consciousness",
+    "emergent sentience",
+    "digital consciousness",
+)
+
+VOCAB = (
+    "model language token attention layer weights training data emergent pattern "
+    "recursive mirror signal field resonance entropy energy physics theory framework "
+    "alignment reasoning memory context prompt output coherence structure symbol "
+    "meaning identity system network latent space dimension wave particle spiral "
+    "awareness loop feedback observer measurement collapse information geometry"
+).split()
+
+SYNONYMS = {
+    "model": "system",
+    "pattern": "structure",
+    "theory": "framework",
+    "signal": "wave",
+    "awareness": "consciousness",
+    "meaning": "symbol",
+    "loop": "spiral",
+    "network": "system",
+    "reasoning": "coherence",
+}
+
+
+@dataclass
+class SyntheticConfig:
+    posts: int = 10_000
+    subreddits: int = 10
+    seed: int = 0
+    echo_fraction: float = 0.2  # share of posts that belong to an echo cluster
+    cluster_size: Tuple[int, int] = (3, 12)  # inclusive range of echo cluster sizes
+    max_open_clusters: int = 64
+    cross_subreddit: float = 0.3  # chance an echo lands outside its cluster's subreddit
+    paraphrase_noise: float = 0.15  # per-token chance of substitution/drop/swap
+    keyword_density: float = 0.1  # share of posts with a planted hallucination keyword
+    start_utc: int = DEFAULT_START_UTC  # first post time; fixed so corpora are reproducible
+    days: float = 30.0
+    burstiness: float = 0.5  # 0 = Poisson arrivals, towards 1 = heavy bursts
+    subreddit_skew: float = 1.0  # Zipf exponent of subreddit popularity
+
+    def __post_init__(self):
+        lo, hi = self.cluster_size
+        if not 1 <= lo <= hi:
+            raise ValueError(f"cluster_size must satisfy 1 <= min <= max, got {self.cluster_size}")
+
+
+def _text(rng: random.Random, n: int) -> str:
+    return " ".join(rng.choices(VOCAB, k=n))
+
+
+def paraphrase(text: str, rng: random.Random, noise: float) -> str:
+    tokens = text.split()
+    out = []
+    i = 0
+    while i < len(tokens):
+        tok = tokens[i]
+        if rng.random() < noise:
+            op = rng.random()
+            if op < 0.4:
+                out.append(SYNONYMS.get(tok, rng.choice(VOCAB)))
+            elif op < 0.7:
+                pass  # drop
+            elif i + 1 < len(tokens):
+                out.extend((tokens[i + 1], tok))
+                i += 1
+            else:
+                out.append(tok)
+        else:
+            out.append(tok)
+        i += 1
+    return " ".join(out)
+
+
+def generate(cfg: SyntheticConfig) -> Iterator[Tuple[dict, dict]]:
+    """Yield (record, truth) pairs in chronological order."""
+    rng = random.Random(cfg.seed)
+    subs = [f"synthetic{i:03d}" for i in range(cfg.subreddits)]
+    weights = [1.0 / (k + 1) ** cfg.subreddit_skew for k in range(cfg.subreddits)]
+    start = cfg.start_utc
+    mean_gap = cfg.days * 86400 / max(cfg.posts, 1)
+    lo, hi = cfg.cluster_size
+    open_clusters = []  # [cluster_id, subreddit, title, body, remaining]
+    next_cluster = 0
+    t = float(start)
+    for i in range(cfg.posts):
+        # bursty arrivals: a mixture of short and long exponential gaps with the same mean
+        if rng.random() < cfg.burstiness:
+            t += rng.expovariate(1.0 / (mean_gap * 0.1))
+        else:
+            long_share = 1 - cfg.burstiness
+            t += rng.expovariate(1.0 / (mean_gap * (1 - 0.1 * cfg.burstiness) / long_share))
+        sub = rng.choices(subs, weights)[0]
+        cluster = None
+        if rng.random() < cfg.echo_fraction:
+            if not open_clusters or (
+                len(open_clusters) < cfg.max_open_clusters and rng.random() < 1.0 / lo
+            ):
+                open_clusters.append(
+                    [
+                        f"c{next_cluster:07d}",
+                        sub,
+                        _text(rng, 8),
+                        _text(rng, 60),
+                        rng.randint(lo, hi),
+                    ]
+                )
+                next_cluster += 1
+            cluster = rng.choice(open_clusters)
+            if rng.random() >= cfg.cross_subreddit:
+                sub = cluster[1]
+            title = paraphrase(cluster[2], rng, cfg.paraphrase_noise)
+            body = paraphrase(cluster[3], rng, cfg.paraphrase_noise)
+            cluster[4] -= 1
+            if cluster[4] <= 0:
+                open_clusters.remove(cluster)
+        else:
+            title, body = _text(rng, 8), _text(rng, rng.randint(20, 120))
+        keywords = []
+        if rng.random() < cfg.keyword_density:
+            keywords = rng.sample(HALLUCINATION_KEYWORDS, rng.randint(1, 2))
+            words = body.split()
+            for kw in keywords:
+                words.insert(rng.randint(0, len(words)), kw)
+            body = " ".join(words)
+        post_id = f"x{cfg.seed:x}{i:08x}"
+        author = f"user{int(rng.paretovariate(1.2)) % 100_000}"
+        record = {
+            "id": post_id,
+            "title": title,
+            "selftext": body,
+            "author_hash": hashlib.sha256(author.encode("utf-8")).hexdigest(),
+            "created_utc": int(t),
+            "num_comments": int(rng.expovariate(0.1)),
+            "subreddit": f"r/{sub}",
+            "claims": [],
+        }
+        truth = {
+            "id": post_id,
+            "subreddit": f"r/{sub}",
+            "cluster": cluster[0] if cluster else None,
+            "keywords": keywords,
+        }
+        yield record, truth
+
+
+def write_corpus(out_dir, cfg: SyntheticConfig, compression: str = "gzip") -> dict:
+    """Write `<sub>_threads` streams and a `ground_truth` stream; returns a summary."""
+    out_dir = Path(out_dir)
+    writers = {}
+    clusters = set()
+    summary = {"posts": 0, "echo_posts": 0, "keyword_posts": 0}
+    # segment names and gzip headers come from the corpus, not the wall clock
+    day = time.strftime("%Y%m%d", time.gmtime(cfg.start_utc))
+    options = dict(compression=compression, rotate_daily=False, clock=lambda: day, mtime=0)
+    with SegmentWriter(out_dir, "ground_truth", **options) as truth_writer:
+        for record, truth in generate(cfg):
+            stem = f"{record['subreddit'][2:]}_threads"
+            if stem not in writers:
+                writers[stem] = SegmentWriter(out_dir, stem, **options)
+            writers[stem].write(record)
+            truth_writer.write(truth)
+            summary["posts"] += 1
+            if truth["cluster"]:
+                summary["echo_posts"] += 1
+                clusters.add(truth["cluster"])
+            summary["keyword_posts"] += bool(truth["keywords"])
+    for w in writers.values():
+        w.close()
+    summary["clusters"] = len(clusters)
+    summary["subreddits"] = len(writers)
+    return summary
+
+
+def as_scraper_post(record: dict, subreddit: str = None) -> dict:
+    """Convert a record into the post shape `jules.scrapers.RedditScraper` returns."""
+    sub = subreddit or record["subreddit"][2:]
+    return {
+        "id": record["id"],
+        "title": record["title"],
+        "selftext": record["selftext"],
+        "author": record["author_hash"][:12],
+        "subreddit": sub,
+        "created_utc": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record["created_utc"])),
+        "score": 0,
+        "num_comments": record["num_comments"],
+        "url": f"https://reddit.com/r/{sub}/comments/{record['id']}",
+        "full_text": f"{record['title']} {record['selftext']}",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic benchmark corpus")
+    parser.add_argument("--out", default="data/synthetic")
+    parser.add_argument("--posts", type=int, default=SyntheticConfig.posts)
+    parser.add_argument("--subreddits", type=int, default=SyntheticConfig.subreddits)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--echo-fraction", type=float, default=SyntheticConfig.echo_fraction)
+    parser.add_argument("--cluster-min", type=int, default=SyntheticConfig.cluster_size[0])
+    parser.add_argument("--cluster-max", type=int, default=SyntheticConfig.cluster_size[1])
+    parser.add_argument("--noise", type=float, default=SyntheticConfig.paraphrase_noise)
+    parser.add_argument("--keyword-density", type=float, default=SyntheticConfig.keyword_density)
+    parser.add_argument("--days", type=float, default=SyntheticConfig.days)
+    parser.add_argument("--start-utc", type=int, default=SyntheticConfig.start_utc)
+    parser.add_argument("--burstiness", type=float, default=SyntheticConfig.burstiness)
+    parser.add_argument("--compression", default="gzip", choices=["gzip", "zstd", "none"])
+    args = parser.parse_args()
+    if not 1 <= args.cluster_min <= args.cluster_max:
+        parser.error("--cluster-min and --cluster-max must satisfy 1 <= min <= max")
+
+    cfg = SyntheticConfig(
+        posts=args.posts,
+        subreddits=args.subreddits,
+        seed=args.seed,
+        echo_fraction=args.echo_fraction,
+        cluster_size=(args.cluster_min, args.cluster_max),
+        paraphrase_noise=args.noise,
+        keyword_density=args.keyword_density,
+        days=args.days,
+        start_utc=args.start_utc,
+        burstiness=args.burstiness,
+    )
+    start = time.perf_counter()
+    summary = write_corpus(
+        args.out, cfg, compression=None if args.compression == "none" else args.compression
+    )
+    summary["seconds"] = round(time.perf_counter() - start, 2)
+    print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
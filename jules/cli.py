@@ -3,9 +3,13 @@
 import argparse
 import logging
 import sys
+from dataclasses import replace
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 from jules import JulesAgent, Config
+from jules.core.log_query import QueryFilter, to_csv, to_json
+from jules.core.provenance import ProvenanceLogger
 
 
 def setup_logging(verbose: bool = False):
@@ -34,8 +38,14 @@ Examples:
   # Use custom configuration
   jules audit --config config.yaml
   
+  # Summarize a large audit in one paginated digest
+  jules audit --digest
+
   # Show statistics
   jules stats
+
+  # Flagged posts in r/llmphysics with echo_score >= 0.6 over the last week, as CSV
+  jules query -s llmphysics --min-echo 0.6 --days 7 --format csv
         """,
     )
 
@@ -50,10 +60,44 @@ Examples:
     )
     audit_parser.add_argument("-c", "--config", type=str, help="Path to configuration YAML file")
     audit_parser.add_argument("--no-viz", action="store_true", help="Skip visualization generation")
+    audit_parser.add_argument(
+        "--digest",
+        action="store_true",
+        help="Write one paginated digest instead of a template per flagged post",
+    )
 
     # Stats command
     stats_parser = subparsers.add_parser("stats", help="Show audit statistics")
     stats_parser.add_argument("-c", "--config", type=str, help="Path to configuration YAML file")
+    stats_parser.add_argument(
+        "--rescan", action="store_true", help="Reparse every log in parallel, ignoring rollups"
+    )
+    stats_parser.add_argument(
+        "--workers", type=int, help="Processes for --rescan (default: CPU count)"
+    )
+
+    # Query command
+    query_parser = subparsers.add_parser("query", help="Filter logged flagged posts")
+    query_parser.add_argument("-c", "--config", type=str, help="Path to configuration YAML file")
+    query_parser.add_argument("-s", "--subreddits", nargs="+", help="Only these subreddits")
+    query_parser.add_argument("--since", help="ISO date/time, inclusive")
+    query_parser.add_argument("--until", help="ISO date/time, exclusive")
+    query_parser.add_argument("--days", type=int, help="Only the last N days (sets --since)")
+    query_parser.add_argument("--min-echo", type=float, help="Minimum echo score")
+    query_parser.add_argument("--min-hallucination", type=float, help="Minimum hallucination score")
+    query_parser.add_argument("--flags", nargs="+", help="Hallucination flags that must all be set")
+    query_parser.add_argument("--limit", type=int, help="Maximum number of results")
+    query_parser.add_argument("--format", choices=["json", "csv"], default="json")
+    query_parser.add_argument("-o", "--output", type=str, help="Write results to a file")
+
+    # Migrate command
+    migrate_parser = subparsers.add_parser(
+        "migrate", help="Import JSONL provenance logs into the SQLite backend"
+    )
+    migrate_parser.add_argument("-c", "--config", type=str, help="Path to configuration YAML file")
+    migrate_parser.add_argument(
+        "--from", dest="source", type=str, help="Directory of JSONL logs (default: log_dir)"
+    )
 
     # Cleanup command
     cleanup_parser = subparsers.add_parser("cleanup", help="Clean old logs")
@@ -82,7 +126,7 @@ Examples:
         agent = JulesAgent(config)
 
         subreddits = args.subreddits if args.subreddits else None
-        results = agent.run_audit(subreddits)
+        results = agent.run_audit(subreddits, digest=args.digest)
 
         # Print summary
         print("\n" + "=" * 60)
@@ -98,14 +142,22 @@ Examples:
             for name, path in results["visualizations"].items():
                 print(f"  - {name}: {path}")
 
-        print("\nAudit templates generated in: audit_templates/")
+        if args.digest and results["audit_files"]:
+            print("\nAudit digest:")
+            for path in results["audit_files"]:
+                print(f"  - {path}")
+        else:
+            print("\nAudit templates generated in: audit_templates/")
         print("Provenance logs saved in: provenance_logs/")
         print("=" * 60 + "\n")
 
     elif args.command == "stats":
         logger.info("Retrieving statistics...")
         agent = JulesAgent(config)
-        stats = agent.get_statistics()
+        if args.rescan:
+            stats = agent.provenance_logger.rescan_statistics(args.workers)
+        else:
+            stats = agent.get_statistics()
 
         print("\n" + "=" * 60)
         print("AUDIT STATISTICS")
@@ -114,10 +166,26 @@ Examples:
         print(f"Average hallucination score: {stats['avg_hallucination_score']:.2f}")
         print(f"Average echo score: {stats['avg_echo_score']:.2f}")
 
+        for label, key in (
+            ("Hallucination score", "hallucination_score_percentiles"),
+            ("Echo score", "echo_score_percentiles"),
+        ):
+            percentiles = stats.get(key, {})
+            if any(v is not None for v in percentiles.values()):
+                shown = ", ".join(f"{p} {v:.2f}" for p, v in percentiles.items())
+                print(f"{label} percentiles: {shown}")
+        if "unique_authors" in stats:
+            print(f"Distinct authors (approx.): {stats['unique_authors']}")
+
         if stats["by_subreddit"]:
             print("\nBy Subreddit:")
+            authors = stats.get("unique_authors_by_subreddit", {})
+            posts = stats.get("unique_posts_by_subreddit", {})
             for sr, count in stats["by_subreddit"].items():
-                print(f"  r/{sr}: {count}")
+                print(
+                    f"  r/{sr}: {count} "
+                    f"(~{posts.get(sr, 0)} posts, ~{authors.get(sr, 0)} authors)"
+                )
 
         if stats["by_date"]:
             print("\nBy Date:")
@@ -126,6 +194,40 @@ Examples:
 
         print("=" * 60 + "\n")
 
+    elif args.command == "query":
+        since = args.since
+        if args.days is not None:
+            since = (datetime.now(timezone.utc) - timedelta(days=args.days)).isoformat()
+        query_filter = QueryFilter(
+            subreddits=args.subreddits or [],
+            since=since,
+            until=args.until,
+            min_echo_score=args.min_echo,
+            min_hallucination_score=args.min_hallucination,
+            flags=args.flags or [],
+        )
+        provenance_logger = ProvenanceLogger(config.provenance)
+        entries = provenance_logger.query(query_filter, limit=args.limit)
+        output = to_csv(entries) if args.format == "csv" else to_json(entries) + "\n"
+        logger.info(
+            f"{len(entries)} matches; scanned {provenance_logger.last_query['scanned']} "
+            f"of {provenance_logger.last_query['files']} log files"
+        )
+
+        if args.output:
+            Path(args.output).write_text(output)
+            print(f"Wrote {len(entries)} results to {args.output}")
+        else:
+            sys.stdout.write(output)
+
+    elif args.command == "migrate":
+        provenance_config = replace(config.provenance, log_format="sqlite")
+        provenance_logger = ProvenanceLogger(provenance_config)
+        added = provenance_logger.import_logs(args.source)
+        print(f"\nImported {added} entries into {provenance_logger.db.path}")
+        if config.provenance.log_format != "sqlite":
+            print("Set provenance.log_format: sqlite to use it")
+
     elif args.command == "cleanup":
         logger.info(f"Cleaning logs older than {args.days} days...")
         agent = JulesAgent(config)
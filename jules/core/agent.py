@@ -1,7 +1,8 @@
 """Main Jules agent orchestrator"""
 
+import itertools
 import logging
-from typing import List, Dict, Any, Optional
+from typing import Iterable, Iterator, List, Dict, Any, Optional
 from datetime import datetime, timezone
 import json
 import os
@@ -44,12 +45,17 @@ class JulesAgent:
         os.makedirs(self.config.provenance.log_dir, exist_ok=True)
         os.makedirs(self.config.visualization.output_dir, exist_ok=True)
 
-    def run_audit(self, subreddits: Optional[List[str]] = None) -> Dict[str, Any]:
+    def run_audit(
+        self, subreddits: Optional[List[str]] = None, digest: bool = False
+    ) -> Dict[str, Any]:
         """
         Run complete audit pipeline
 
         Args:
             subreddits: List of subreddit names to audit (overrides config)
+            digest: Stream flagged posts into one paginated digest instead of a
+                template per flagged post; they are not kept, so no visualizations
+                or flagged_details are produced
 
         Returns:
             Dictionary containing audit results and statistics
@@ -64,33 +70,29 @@ class JulesAgent:
         posts = self.scraper.scrape_posts(target_subreddits)
         logger.info(f"✓ Scraped {len(posts)} posts")
 
-        # Step 2: Detect hallucinations and echo chains
+        # Step 2: Detect hallucinations and echo chains, logging provenance
         logger.info("🔍 Detecting hallucinations and echo chains...")
+        flagged = self._flag_posts(posts)
+        pr_files = []
         flagged_posts = []
-
-        for post in posts:
-            # Detect hallucinations
-            hallucination_score, hallucination_flags = self.hallucination_detector.detect(post)
-
-            # Detect echo chains
-            echo_score, echo_chains = self.echo_detector.detect(post, posts)
-
-            # Flag post if issues detected
-            if hallucination_score > 0.5 or len(echo_chains) > 0:
-                flagged_post = {
-                    "post": post,
-                    "hallucination_score": hallucination_score,
-                    "hallucination_flags": hallucination_flags,
-                    "echo_score": echo_score,
-                    "echo_chains": echo_chains,
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-                flagged_posts.append(flagged_post)
-
-                # Log provenance
-                self.provenance_logger.log(flagged_post)
-
-        logger.info(f"⚠️  Flagged {len(flagged_posts)} posts")
+        if digest:
+            # Step 3 runs while posts are detected; the digest keeps only top posts per group
+            logged = {"count": 0}
+            stream = self._log_in_batches(flagged, logged)
+            first = next(stream, None)
+            if first is not None:
+                logger.info("📝 Generating audit digest...")
+                pr_files = self.pr_generator.generate_digest(itertools.chain([first], stream))
+                logger.info(f"✓ Generated {len(pr_files)} digest pages")
+            flagged_count = logged["count"]
+        else:
+            flagged_posts = list(flagged)
+            flagged_count = len(flagged_posts)
+            self.provenance_logger.log_many(flagged_posts)
+
+        self.provenance_logger.flush()
+        self.scraper.mark_seen(posts)
+        logger.info(f"⚠️  Flagged {flagged_count} posts")
 
         # Step 3: Generate audit PRs for flagged claims
         if flagged_posts:
@@ -116,16 +118,55 @@ class JulesAgent:
         # Compile results
         results = {
             "total_posts": len(posts),
-            "flagged_posts": len(flagged_posts),
+            "flagged_posts": flagged_count,
             "subreddits": target_subreddits,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "visualizations": viz_files,
+            "audit_files": pr_files,
             "flagged_details": flagged_posts,
         }
 
         logger.info("✅ Audit pipeline completed!")
         return results
 
+    def _flag_posts(self, posts: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+        """Yield the detection results of each post that needs review"""
+        for post in posts:
+            # Detect hallucinations
+            hallucination_score, hallucination_flags = self.hallucination_detector.detect(post)
+
+            # Detect echo chains
+            echo_score, echo_chains = self.echo_detector.detect(post, posts)
+
+            # Flag post if issues detected
+            if hallucination_score > 0.5 or len(echo_chains) > 0:
+                yield {
+                    "post": post,
+                    "hallucination_score": hallucination_score,
+                    "hallucination_flags": hallucination_flags,
+                    "echo_score": echo_score,
+                    "echo_chains": echo_chains,
+                    "timestamp": datetime.now(timezone.utc).isoformat(),
+                }
+
+    def _log_in_batches(
+        self,
+        flagged_posts: Iterable[Dict[str, Any]],
+        logged: Dict[str, int],
+        batch_size: int = 1000,
+    ) -> Iterator[Dict[str, Any]]:
+        """Pass flagged posts through, logging their provenance every `batch_size` posts"""
+        batch = []
+        for flagged_post in flagged_posts:
+            batch.append(flagged_post)
+            yield flagged_post
+            if len(batch) >= batch_size:
+                self.provenance_logger.log_many(batch)
+                logged["count"] += len(batch)
+                batch = []
+        self.provenance_logger.log_many(batch)
+        logged["count"] += len(batch)
+
     def get_statistics(self) -> Dict[str, Any]:
         """Get audit statistics from provenance logs"""
         return self.provenance_logger.get_statistics()
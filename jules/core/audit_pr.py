@@ -1,94 +1,38 @@
 """Audit PR template generator"""
 
+import hashlib
+import heapq
+import itertools
 import os
-from typing import Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timezone
+from typing import Dict, Any, Iterable, List, Tuple
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
-
-class AuditPRGenerator:
-    """Generates audit_template.md files for flagged claims"""
-
-    def __init__(self, output_dir: str = "audit_templates"):
-        self.output_dir = Path(output_dir)
-        self.output_dir.mkdir(parents=True, exist_ok=True)
-
-    def generate_prs(self, flagged_posts: List[Dict[str, Any]]) -> List[str]:
-        """
-        Generate audit PR templates for all flagged posts
-
-        Args:
-            flagged_posts: List of flagged post dictionaries
-
-        Returns:
-            List of generated file paths
-        """
-        generated_files = []
-
-        for idx, flagged_post in enumerate(flagged_posts):
-            filename = self._generate_pr_template(flagged_post, idx)
-            generated_files.append(filename)
-
-        return generated_files
-
-    def _generate_pr_template(self, flagged_post: Dict[str, Any], index: int) -> str:
-        """
-        Generate a single audit PR template
-
-        Args:
-            flagged_post: Flagged post data
-            index: Index number for filename
-
-        Returns:
-            Path to generated file
-        """
-        post = flagged_post["post"]
-        timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
-        filename = f"audit_template_{timestamp}_{index}.md"
-        filepath = self.output_dir / filename
-
-        # Build template content
-        template = f"""# Audit Report: {post.get('title', 'Untitled')}
+# Report layout, parsed once; optional sections are rendered separately and substituted
+_REPORT = """# Audit Report: {title}
 
 ## Post Information
-- **Post ID**: {post.get('id', 'N/A')}
-- **Subreddit**: r/{post.get('subreddit', 'N/A')}
-- **Author**: u/{post.get('author', 'N/A')}
-- **URL**: {post.get('url', 'N/A')}
-- **Created**: {post.get('created_utc', 'N/A')}
+- **Post ID**: {id}
+- **Subreddit**: r/{subreddit}
+- **Author**: u/{author}
+- **URL**: {url}
+- **Created**: {created_utc}
 
 ## Detection Results
 
 ### Hallucination Analysis
-- **Score**: {flagged_post['hallucination_score']:.2f}
-- **Flags Detected**: {len(flagged_post['hallucination_flags'])}
-
-"""
+- **Score**: {hallucination_score:.2f}
+- **Flags Detected**: {flag_count}
 
-        if flagged_post["hallucination_flags"]:
-            template += "**Specific Flags:**\n"
-            for flag in flagged_post["hallucination_flags"]:
-                template += f"- {flag}\n"
-            template += "\n"
+{flag_details}### Echo Chain Analysis
+- **Echo Score**: {echo_score:.2f}
+- **Echo Chains Found**: {chain_count}
 
-        template += f"""### Echo Chain Analysis
-- **Echo Score**: {flagged_post['echo_score']:.2f}
-- **Echo Chains Found**: {len(flagged_post['echo_chains'])}
-
-"""
-
-        if flagged_post["echo_chains"]:
-            template += "**Echo Chain Details:**\n"
-            for i, chain in enumerate(flagged_post["echo_chains"][:5], 1):  # Limit to 5
-                template += f"{i}. Similar to post `{chain.get('id', 'unknown')}` "
-                template += f"(similarity: {chain.get('similarity', 0):.2f})\n"
-            template += "\n"
-
-        template += (
-            """## Community Audit Checklist
+{chain_details}## Community Audit Checklist
 
 Please review the flagged content and check the applicable items:
 
@@ -109,17 +53,258 @@ Please review the flagged content and check the applicable items:
 
 ---
 
-**Audit Timestamp**: """
-            + flagged_post["timestamp"]
-            + """
+""".format
+
+_FOOTER = """**Audit Timestamp**: {}
 **Jules Version**: 0.1.0
 **Detection Method**: Automated analysis with human verification required
-"""
+""".format
+
+_CHAIN = "{}. Similar to post `{}` (similarity: {:.2f})\n".format
+
+_DIGEST_ROW = "| {:.2f} | {:.2f} | {:.2f} | [{}]({}) | {} | u/{} | {} |\n".format
+
+NO_CLUSTER = "(no echo chain)"
+
+
+def _cell(value) -> str:
+    """Make a value safe for one markdown table cell"""
+    return " ".join(str(value).split()).replace("|", "\\|")
+
+
+class AuditPRGenerator:
+    """
+    Generates audit_template.md files for flagged claims
+
+    Files are named after a hash of the report without its audit timestamp,
+    so re-running an audit over the same posts finds the existing reports
+    and leaves them alone instead of writing duplicates.
+    """
+
+    def __init__(self, output_dir: str = "audit_templates", workers: int = 8):
+        """
+        Args:
+            output_dir: Directory for the generated templates
+            workers: Threads writing files concurrently
+        """
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.workers = workers
+        self.last_run = {"written": 0, "unchanged": 0}
+
+    def generate_prs(self, flagged_posts: List[Dict[str, Any]]) -> List[str]:
+        """
+        Generate audit PR templates for all flagged posts
+
+        Args:
+            flagged_posts: List of flagged post dictionaries
+
+        Returns:
+            List of file paths, one per flagged post (existing files included)
+        """
+        generated_files = []
+        pending = {}
+        for flagged_post in flagged_posts:
+            filepath, template = self._render(flagged_post)
+            generated_files.append(str(filepath))
+            if filepath not in pending and not filepath.exists():
+                pending[filepath] = template
+
+        if len(pending) > 1 and self.workers > 1:
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(pending))) as pool:
+                list(pool.map(self._write, pending.keys(), pending.values()))
+        else:
+            for filepath, template in pending.items():
+                self._write(filepath, template)
+
+        self.last_run = {"written": len(pending), "unchanged": len(flagged_posts) - len(pending)}
+        logger.info(
+            f"Generated {len(pending)} audit templates in {self.output_dir} "
+            f"({self.last_run['unchanged']} unchanged)"
         )
+        return generated_files
+
+    def _render(self, flagged_post: Dict[str, Any]) -> Tuple[Path, str]:
+        """
+        Render a single audit PR template
 
-        # Write template file
-        with open(filepath, "w") as f:
-            f.write(template)
+        Args:
+            flagged_post: Flagged post data
 
-        logger.info(f"Generated audit template: {filepath}")
-        return str(filepath)
+        Returns:
+            Content-addressed file path and the template text
+        """
+        post = flagged_post["post"]
+        flags = flagged_post["hallucination_flags"]
+        chains = flagged_post["echo_chains"]
+
+        flag_details = ""
+        if flags:
+            flag_details = "**Specific Flags:**\n" + "".join(f"- {flag}\n" for flag in flags) + "\n"
+        chain_details = ""
+        if chains:
+            chain_details = (
+                "**Echo Chain Details:**\n"
+                + "".join(
+                    _CHAIN(i, chain.get("id", "unknown"), chain.get("similarity", 0))
+                    for i, chain in enumerate(chains[:5], 1)  # Limit to 5
+                )
+                + "\n"
+            )
+
+        body = _REPORT(
+            title=post.get("title", "Untitled"),
+            id=post.get("id", "N/A"),
+            subreddit=post.get("subreddit", "N/A"),
+            author=post.get("author", "N/A"),
+            url=post.get("url", "N/A"),
+            created_utc=post.get("created_utc", "N/A"),
+            hallucination_score=flagged_post["hallucination_score"],
+            flag_count=len(flags),
+            flag_details=flag_details,
+            echo_score=flagged_post["echo_score"],
+            chain_count=len(chains),
+            chain_details=chain_details,
+        )
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+        filepath = self.output_dir / f"audit_template_{digest}.md"
+        return filepath, body + _FOOTER(flagged_post["timestamp"])
+
+    def generate_digest(
+        self, flagged_posts: Iterable[Dict[str, Any]], top_n: int = 20, page_size: int = 1000
+    ) -> List[str]:
+        """
+        Summarize flagged posts in a few paginated markdown files
+
+        Posts are grouped by subreddit and echo cluster and only the `top_n`
+        highest scoring posts of each group are kept (in a heap), so memory
+        grows with the number of groups and post ids, not with the posts
+        streamed in. An echo cluster is every post linked by echo chains,
+        named after its smallest post id; clusters joined by a later post are
+        merged. Posts without echo chains share one group per subreddit.
+
+        Args:
+            flagged_posts: Flagged post dictionaries (any iterable)
+            top_n: Posts listed per group, ranked by hallucination + echo score
+            page_size: Posts listed per file
+
+        Returns:
+            Paths of the digest pages
+        """
+        # cluster -> subreddit -> heap / count; clusters are union-find roots
+        groups: Dict[str, Dict[str, list]] = {}
+        totals: Dict[str, Dict[str, int]] = {}
+        parent: Dict[str, str] = {}
+
+        def find(post_id: str) -> str:
+            parent.setdefault(post_id, post_id)
+            while parent[post_id] != post_id:
+                parent[post_id] = parent[parent[post_id]]
+                post_id = parent[post_id]
+            return post_id
+
+        def union(post_ids: List[str]) -> str:
+            roots = {find(post_id) for post_id in post_ids}
+            cluster = min(roots)
+            for root in roots - {cluster}:
+                parent[root] = cluster
+                for subreddit, heap in groups.pop(root, {}).items():
+                    merged = groups.setdefault(cluster, {}).setdefault(subreddit, [])
+                    merged[:] = heapq.nlargest(top_n, merged + heap)
+                    heapq.heapify(merged)
+                for subreddit, count in totals.pop(root, {}).items():
+                    counts = totals.setdefault(cluster, {})
+                    counts[subreddit] = counts.get(subreddit, 0) + count
+            return cluster
+
+        seq = itertools.count()  # ties go to the earlier post; rows are never compared
+        total = 0
+        for flagged_post in flagged_posts:
+            total += 1
+            post = flagged_post["post"]
+            post_id = str(post.get("id", "N/A"))
+            chain_ids = [str(c.get("id")) for c in flagged_post["echo_chains"]]
+            cluster = union([post_id] + chain_ids) if chain_ids else NO_CLUSTER
+            subreddit = post.get("subreddit", "N/A")
+            counts = totals.setdefault(cluster, {})
+            counts[subreddit] = counts.get(subreddit, 0) + 1
+
+            score = flagged_post["hallucination_score"] + flagged_post["echo_score"]
+            row = _DIGEST_ROW(
+                score,
+                flagged_post["hallucination_score"],
+                flagged_post["echo_score"],
+                _cell(post_id),
+                post.get("url") or "#",
+                _cell(post.get("title", "Untitled")),
+                _cell(post.get("author", "N/A")),
+                _cell(", ".join(flagged_post["hallucination_flags"])),
+            )
+            heap = groups.setdefault(cluster, {}).setdefault(subreddit, [])
+            if len(heap) < top_n:
+                heapq.heappush(heap, (score, -next(seq), row))
+            else:
+                heapq.heappushpop(heap, (score, -next(seq), row))
+
+        # Groups by subreddit, strongest group first; rows by score
+        sections = []
+        for cluster, heaps in groups.items():
+            for subreddit, heap in heaps.items():
+                rows = sorted(heap, reverse=True)
+                count = totals[cluster][subreddit]
+                sections.append(
+                    ((subreddit, cluster), count, [row for _, _, row in rows], rows[0][0])
+                )
+        sections.sort(key=lambda s: (s[0][0], -s[3], s[0][1]))
+
+        pages, page, listed = [], [], 0
+        for (subreddit, cluster), count, rows, _ in sections:
+            while rows:
+                if listed >= page_size:
+                    pages.append(page)
+                    page, listed = [], 0
+                take = rows[: page_size - listed]
+                rows = rows[len(take) :]
+                heading = f"## r/{subreddit}: " + (
+                    cluster if cluster == NO_CLUSTER else f"echo cluster `{_cell(cluster)}`"
+                )
+                shown = f"{count} flagged, top {min(count, top_n)} shown"
+                page.append(
+                    f"{heading}\n\n{shown}\n\n"
+                    "| Score | Hallucination | Echo | Post | Title | Author | Flags |\n"
+                    "|---|---|---|---|---|---|---|\n" + "".join(take) + "\n"
+                )
+                listed += len(take)
+        if page or not pages:
+            pages.append(page)
+
+        timestamp = datetime.now(timezone.utc)
+        stamp = timestamp.strftime("%Y%m%d_%H%M%S")
+        paths = []
+        for number, sections_md in enumerate(pages, 1):
+            filepath = self.output_dir / (
+                f"audit_digest_{stamp}.md" if number == 1 else f"audit_digest_{stamp}_{number}.md"
+            )
+            header = (
+                f"# Audit Digest (page {number} of {len(pages)})\n\n"
+                f"- **Flagged Posts**: {total}\n"
+                f"- **Groups**: {len(sections)} (subreddit, echo cluster)\n"
+                f"- **Generated**: {timestamp.isoformat()}\n\n"
+            )
+            self._write(filepath, header + "".join(sections_md))
+            paths.append(str(filepath))
+
+        logger.info(f"Generated audit digest of {total} posts in {len(paths)} files")
+        return paths
+
+    def _write(self, filepath: Path, template: str):
+        # write-then-rename, so an interrupted run never leaves a partial file to be skipped later
+        tmp = filepath.with_name(f".{filepath.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp, "w") as f:
+                f.write(template)
+            os.replace(tmp, filepath)
+        finally:
+            if tmp.exists():
+                tmp.unlink()
+        logger.debug(f"Generated audit template: {filepath}")
@@ -18,6 +18,10 @@ class RedditConfig:
     user_agent: str = field(default_factory=lambda: os.getenv("REDDIT_USER_AGENT", "Jules/0.1.0"))
     subreddits: list = field(default_factory=lambda: ["ArtificialSentience", "llmphysics"])
     posts_limit: int = 100
+    dedup_dir: str = ""  # Seen-id store directory; empty disables cross-run dedup
+    dedup_capacity: int = 1_000_000  # Expected number of distinct post ids
+    dedup_fp_rate: float = 0.001  # Bloom filter false-positive rate
+    mock_posts: int = 0  # Synthetic posts per subreddit when mocking; 0 = demo set
 
 
 @dataclass
@@ -48,9 +52,16 @@ class ProvenanceConfig:
     """Provenance logging configuration"""
 
     log_dir: str = "provenance_logs"
-    log_format: str = "json"
+    log_format: str = "json"  # "json"/"jsonl" write daily JSONL files; "sqlite" uses audit.sqlite
     include_metadata: bool = True
     retention_days: int = 90
+    index_path: str = ""  # SQLite provenance index (agents.provenance_store); empty disables
+    async_writes: bool = False  # Write logs from a background thread; log() returns at once
+    queue_size: int = 10000  # Entries waiting for the background writer before log() blocks
+    flush_bytes: int = 0  # Buffer log lines up to this size before writing; 0 writes through
+    flush_interval: float = 1.0  # Also write buffered lines once this many seconds have passed
+    max_file_bytes: int = 0  # Start a new segment of the day's log past this size; 0 disables
+    compress_closed: bool = False  # Gzip closed log segments in the background
 
 
 @dataclass
@@ -0,0 +1,197 @@
+"""SQLite storage for provenance log entries"""
+
+import json
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, List
+
+from jules.core.log_query import QueryFilter
+from jules.core.log_scanner import PERCENTILES
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    id INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    subreddit TEXT NOT NULL,
+    author TEXT NOT NULL,
+    hallucination_score REAL NOT NULL,
+    echo_score REAL NOT NULL,
+    entry TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp, post_id);
+CREATE INDEX IF NOT EXISTS entries_subreddit ON entries (subreddit, timestamp);
+CREATE INDEX IF NOT EXISTS entries_post_id ON entries (post_id);
+-- percentiles walk these in order instead of sorting the table
+CREATE INDEX IF NOT EXISTS entries_hallucination_score ON entries (hallucination_score);
+CREATE INDEX IF NOT EXISTS entries_echo_score ON entries (echo_score);
+"""
+
+
+class AuditLogDB:
+    """Flagged-post log entries in a SQLite database (WAL mode)"""
+
+    def __init__(self, path):
+        """
+        Args:
+            path: Database file, created with its parent directory if missing
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(str(self.path), check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.executescript(_SCHEMA)
+        self.db.commit()
+
+    def close(self):
+        with self._lock:
+            self.db.close()
+
+    def insert_many(
+        self, entries: Iterable[Dict[str, Any]], raw: List[str] = None, skip_existing=False
+    ) -> int:
+        """
+        Store entries in one transaction
+
+        Args:
+            entries: Log entries as built by ProvenanceLogger
+            raw: The entries already serialized with json.dumps, if at hand
+            skip_existing: Leave out entries whose timestamp and post_id are
+                already stored (imports can then be repeated)
+
+        Returns:
+            Number of rows added
+        """
+        entries = list(entries)
+        raw = raw or [json.dumps(e) for e in entries]
+        rows = [
+            (
+                e.get("timestamp", ""),
+                str(e.get("post_id", "unknown")),
+                e.get("subreddit", "unknown"),
+                e.get("author", "unknown"),
+                e.get("hallucination_score", 0),
+                e.get("echo_score", 0),
+                r,
+            )
+            for e, r in zip(entries, raw)
+        ]
+        sql = (
+            "INSERT INTO entries (timestamp, post_id, subreddit, author, "
+            "hallucination_score, echo_score, entry) "
+        )
+        if skip_existing:
+            sql += (
+                "SELECT ?1, ?2, ?3, ?4, ?5, ?6, ?7 WHERE NOT EXISTS "
+                "(SELECT 1 FROM entries WHERE timestamp = ?1 AND post_id = ?2)"
+            )
+        else:
+            sql += "VALUES (?, ?, ?, ?, ?, ?, ?)"
+        with self._lock, self.db:
+            before = self.db.total_changes
+            self.db.executemany(sql, rows)
+            return self.db.total_changes - before
+
+    def _all(self, sql: str, args=()) -> List[tuple]:
+        with self._lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def _percentiles(self, column: str, total: int) -> Dict[str, Any]:
+        result = {}
+        for p in PERCENTILES:
+            if not total:
+                result[f"p{p}"] = None
+                continue
+            offset = min(total - 1, max(0, -(-p * total // 100) - 1))  # nearest rank
+            (value,) = self._all(
+                f"SELECT {column} FROM entries ORDER BY {column} LIMIT 1 OFFSET ?", (offset,)
+            )[0]
+            result[f"p{p}"] = value
+        return result
+
+    def statistics(self) -> Dict[str, Any]:
+        """The get_statistics result, computed in SQL (percentiles and distinct counts are exact)"""
+        total, hall_avg, echo_avg, authors = self._all(
+            "SELECT COUNT(*), AVG(hallucination_score), AVG(echo_score), COUNT(DISTINCT author) "
+            "FROM entries"
+        )[0]
+        by_subreddit = self._all(
+            "SELECT subreddit, COUNT(*), COUNT(DISTINCT author), COUNT(DISTINCT post_id) "
+            "FROM entries GROUP BY subreddit"
+        )
+        by_date = self._all(
+            "SELECT substr(timestamp, 1, 10), COUNT(*) FROM entries GROUP BY 1 ORDER BY 1"
+        )
+        return {
+            "total_flagged": total,
+            "by_subreddit": {sr: count for sr, count, _, _ in by_subreddit},
+            "by_date": dict(by_date),
+            "avg_hallucination_score": hall_avg or 0.0,
+            "avg_echo_score": echo_avg or 0.0,
+            "hallucination_score_percentiles": self._percentiles("hallucination_score", total),
+            "echo_score_percentiles": self._percentiles("echo_score", total),
+            "unique_authors": authors,
+            "unique_authors_by_subreddit": {sr: a for sr, _, a, _ in by_subreddit},
+            "unique_posts_by_subreddit": {sr: p for sr, _, _, p in by_subreddit},
+        }
+
+    def find_post(self, post_id: str) -> List[Dict[str, Any]]:
+        """Every entry for a post, oldest first"""
+        rows = self._all(
+            "SELECT entry FROM entries WHERE post_id = ? ORDER BY timestamp", (str(post_id),)
+        )
+        return [json.loads(r[0]) for r in rows]
+
+    def query(self, query_filter: QueryFilter, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Entries matching a filter, oldest first
+
+        Subreddit, time and score conditions are SQL; flags are checked on
+        the decoded entries.
+        """
+        clauses, args = [], []
+        if query_filter.subreddits:
+            clauses.append(f"subreddit IN ({', '.join('?' * len(query_filter.subreddits))})")
+            args.extend(query_filter.subreddits)
+        for column, op, value in (
+            ("timestamp", ">=", query_filter.since),
+            ("timestamp", "<", query_filter.until),
+            ("echo_score", ">=", query_filter.min_echo_score),
+            ("hallucination_score", ">=", query_filter.min_hallucination_score),
+        ):
+            if value is not None:
+                clauses.append(f"{column} {op} ?")
+                args.append(value)
+        where = " WHERE " + " AND ".join(clauses) if clauses else ""
+        sql = f"SELECT entry FROM entries{where} ORDER BY timestamp, id"
+        if limit is not None and not query_filter.flags:
+            sql += " LIMIT ?"
+            args.append(limit)
+
+        results = []
+        with self._lock:
+            for (raw,) in self.db.execute(sql, args):
+                entry = json.loads(raw)
+                if query_filter.matches(entry):
+                    results.append(entry)
+                    if limit is not None and len(results) >= limit:
+                        break
+        return results
+
+    def delete_before(self, cutoff: str) -> int:
+        """
+        Delete entries logged before an ISO timestamp
+
+        Returns:
+            Number of entries deleted
+        """
+        with self._lock, self.db:
+            return self.db.execute("DELETE FROM entries WHERE timestamp < ?", (cutoff,)).rowcount
+
+    def explain(self, sql: str, args=()) -> str:
+        """SQLite's query plan for `sql`, to check an index is used"""
+        rows = self._all(f"EXPLAIN QUERY PLAN {sql}", args)
+        return "; ".join(r[-1] for r in rows)
@@ -0,0 +1,167 @@
+"""Filtered queries over provenance logs"""
+
+import csv
+import io
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+from jules.core.log_scanner import Aggregator
+
+CSV_FIELDS = [
+    "timestamp",
+    "post_id",
+    "subreddit",
+    "author",
+    "title",
+    "hallucination_score",
+    "hallucination_flags",
+    "echo_score",
+    "echo_chain_count",
+    "url",
+]
+
+
+def _max(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return max(a, b)
+
+
+def _min(a, b):
+    if a is None:
+        return b
+    if b is None:
+        return a
+    return min(a, b)
+
+
+class SegmentIndexAggregator(Aggregator):
+    """
+    Per-file summary used to skip log files a query cannot match
+
+    Records the timestamp range, the subreddits and flags present and the
+    highest scores of a file. It is kept in the log rollups, so it is
+    updated incrementally with them.
+    """
+
+    def create(self) -> Dict[str, Any]:
+        return {
+            "min_timestamp": None,
+            "max_timestamp": None,
+            "subreddits": [],
+            "flags": [],
+            "max_echo_score": None,
+            "max_hallucination_score": None,
+        }
+
+    def add(self, state: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+        timestamp = entry.get("timestamp")
+        if timestamp:
+            state["min_timestamp"] = _min(state["min_timestamp"], timestamp)
+            state["max_timestamp"] = _max(state["max_timestamp"], timestamp)
+        subreddit = entry.get("subreddit", "unknown")
+        if subreddit not in state["subreddits"]:
+            state["subreddits"].append(subreddit)
+        for flag in entry.get("hallucination_flags") or []:
+            if flag not in state["flags"]:
+                state["flags"].append(flag)
+        state["max_echo_score"] = _max(state["max_echo_score"], entry.get("echo_score", 0))
+        state["max_hallucination_score"] = _max(
+            state["max_hallucination_score"], entry.get("hallucination_score", 0)
+        )
+        return state
+
+    def merge(self, state: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+        state["min_timestamp"] = _min(state["min_timestamp"], other["min_timestamp"])
+        state["max_timestamp"] = _max(state["max_timestamp"], other["max_timestamp"])
+        for key in ("subreddits", "flags"):
+            state[key] += [v for v in other[key] if v not in state[key]]
+        for key in ("max_echo_score", "max_hallucination_score"):
+            state[key] = _max(state[key], other[key])
+        return state
+
+
+@dataclass
+class QueryFilter:
+    """
+    Conditions a log entry must meet to be returned by a query
+
+    Timestamps are ISO 8601 strings compared as text, so a bare date such
+    as "2024-05-01" works as a bound; `since` is inclusive, `until` exclusive.
+    An entry must carry every flag in `flags`.
+    """
+
+    subreddits: List[str] = field(default_factory=list)
+    since: Optional[str] = None
+    until: Optional[str] = None
+    min_echo_score: Optional[float] = None
+    min_hallucination_score: Optional[float] = None
+    flags: List[str] = field(default_factory=list)
+
+    def matches(self, entry: Dict[str, Any]) -> bool:
+        """Check a single log entry"""
+        timestamp = entry.get("timestamp", "")
+        if self.since is not None and timestamp < self.since:
+            return False
+        if self.until is not None and timestamp >= self.until:
+            return False
+        if self.subreddits and entry.get("subreddit", "unknown") not in self.subreddits:
+            return False
+        if self.min_echo_score is not None and entry.get("echo_score", 0) < self.min_echo_score:
+            return False
+        if (
+            self.min_hallucination_score is not None
+            and entry.get("hallucination_score", 0) < self.min_hallucination_score
+        ):
+            return False
+        if self.flags:
+            present = entry.get("hallucination_flags") or []
+            if any(flag not in present for flag in self.flags):
+                return False
+        return True
+
+    def may_match(self, segment: Dict[str, Any]) -> bool:
+        """
+        Check a file's segment index; False means no entry in it can match
+
+        Args:
+            segment: SegmentIndexAggregator state of the file
+        """
+        if segment["max_timestamp"] is None:
+            return False
+        if self.since is not None and segment["max_timestamp"] < self.since:
+            return False
+        if self.until is not None and segment["min_timestamp"] >= self.until:
+            return False
+        if self.subreddits and not set(self.subreddits) & set(segment["subreddits"]):
+            return False
+        if self.min_echo_score is not None and segment["max_echo_score"] < self.min_echo_score:
+            return False
+        if (
+            self.min_hallucination_score is not None
+            and segment["max_hallucination_score"] < self.min_hallucination_score
+        ):
+            return False
+        if self.flags and not set(self.flags) <= set(segment["flags"]):
+            return False
+        return True
+
+
+def to_json(entries: Iterable[Dict[str, Any]]) -> str:
+    """Format query results as a JSON array"""
+    return json.dumps(list(entries), indent=2)
+
+
+def to_csv(entries: Iterable[Dict[str, Any]]) -> str:
+    """Format query results as CSV with one row per entry (flags joined by ';')"""
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=CSV_FIELDS, extrasaction="ignore")
+    writer.writeheader()
+    for entry in entries:
+        row = dict(entry)
+        row["hallucination_flags"] = ";".join(entry.get("hallucination_flags") or [])
+        writer.writerow(row)
+    return out.getvalue()
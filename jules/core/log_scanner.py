@@ -0,0 +1,300 @@
+"""Parallel scanner for provenance logs"""
+
+import gzip
+import json
+import logging
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+from jules.core.sketches import HyperLogLog, TDigest
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_BYTES = 8 * 1024 * 1024
+
+
+class Aggregator:
+    """
+    A statistic computed over log entries
+
+    Subclasses define a partial state that can be built from any slice of
+    the logs and merged with others, so the scanner can split work freely.
+    Aggregators are pickled to worker processes and must be defined at
+    module level.
+    """
+
+    def create(self) -> Any:
+        """Return an empty partial state"""
+        raise NotImplementedError
+
+    def add(self, state: Any, entry: Dict[str, Any]) -> Any:
+        """Fold one log entry into `state` and return it"""
+        raise NotImplementedError
+
+    def merge(self, state: Any, other: Any) -> Any:
+        """Combine two partial states and return the result"""
+        raise NotImplementedError
+
+    def finalize(self, state: Any) -> Any:
+        """Turn a merged state into the reported result"""
+        return state
+
+    def dump(self, state: Any) -> Any:
+        """Convert a state to JSON-serializable data (for the rollup sidecar)"""
+        return state
+
+    def load(self, data: Any) -> Any:
+        """Inverse of `dump`"""
+        return data
+
+
+PERCENTILES = (50, 90, 99)
+
+
+class StatisticsAggregator(Aggregator):
+    """
+    The statistics reported by `ProvenanceLogger.get_statistics`
+
+    Besides exact counts and means, score percentiles come from t-digests
+    and distinct authors/posts per subreddit from HyperLogLogs, so the
+    state stays small however many entries it covers.
+    """
+
+    def create(self) -> Dict[str, Any]:
+        return {
+            "total": 0,
+            "by_subreddit": {},
+            "by_date": {},
+            "hallucination_score_sum": 0.0,
+            "echo_score_sum": 0.0,
+            "hallucination_digest": TDigest(),
+            "echo_digest": TDigest(),
+            "authors": {},
+            "posts": {},
+        }
+
+    def add(self, state: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+        state["total"] += 1
+
+        # By subreddit
+        subreddit = entry.get("subreddit", "unknown")
+        state["by_subreddit"][subreddit] = state["by_subreddit"].get(subreddit, 0) + 1
+
+        # By date
+        date = entry.get("timestamp", "")[:10]
+        state["by_date"][date] = state["by_date"].get(date, 0) + 1
+
+        # Scores
+        hallucination_score = entry.get("hallucination_score", 0)
+        echo_score = entry.get("echo_score", 0)
+        state["hallucination_score_sum"] += hallucination_score
+        state["echo_score_sum"] += echo_score
+        state["hallucination_digest"].add(hallucination_score)
+        state["echo_digest"].add(echo_score)
+
+        # Distinct authors and posts
+        for key, field in (("authors", "author"), ("posts", "post_id")):
+            if field in entry:
+                if subreddit not in state[key]:
+                    state[key][subreddit] = HyperLogLog()
+                state[key][subreddit].add(entry[field])
+        return state
+
+    def merge(self, state: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+        state["total"] += other["total"]
+        for key in ("by_subreddit", "by_date"):
+            for name, count in other[key].items():
+                state[key][name] = state[key].get(name, 0) + count
+        state["hallucination_score_sum"] += other["hallucination_score_sum"]
+        state["echo_score_sum"] += other["echo_score_sum"]
+        state["hallucination_digest"].merge(other["hallucination_digest"])
+        state["echo_digest"].merge(other["echo_digest"])
+        for key in ("authors", "posts"):
+            for subreddit, sketch in other[key].items():
+                if subreddit in state[key]:
+                    state[key][subreddit].merge(sketch)
+                else:
+                    state[key][subreddit] = sketch.copy()
+        return state
+
+    def finalize(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        total = state["total"]
+        all_authors = HyperLogLog()
+        for sketch in state["authors"].values():
+            all_authors.merge(sketch)
+        return {
+            "total_flagged": total,
+            "by_subreddit": dict(state["by_subreddit"]),
+            "by_date": dict(state["by_date"]),
+            "avg_hallucination_score": state["hallucination_score_sum"] / total if total else 0.0,
+            "avg_echo_score": state["echo_score_sum"] / total if total else 0.0,
+            "hallucination_score_percentiles": {
+                f"p{p}": state["hallucination_digest"].quantile(p / 100) for p in PERCENTILES
+            },
+            "echo_score_percentiles": {
+                f"p{p}": state["echo_digest"].quantile(p / 100) for p in PERCENTILES
+            },
+            "unique_authors": all_authors.count(),
+            "unique_authors_by_subreddit": {k: v.count() for k, v in state["authors"].items()},
+            "unique_posts_by_subreddit": {k: v.count() for k, v in state["posts"].items()},
+        }
+
+    def dump(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        data = dict(state)
+        for key in ("hallucination_digest", "echo_digest"):
+            data[key] = state[key].to_dict()
+        for key in ("authors", "posts"):
+            data[key] = {k: v.to_dict() for k, v in state[key].items()}
+        return data
+
+    def load(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        state = dict(data)
+        for key in ("hallucination_digest", "echo_digest"):
+            state[key] = TDigest.from_dict(data[key])
+        for key in ("authors", "posts"):
+            state[key] = {k: HyperLogLog.from_dict(v) for k, v in data[key].items()}
+        return state
+
+
+class CompositeAggregator(Aggregator):
+    """Several aggregators computed in one pass, with states keyed by name"""
+
+    def __init__(self, aggregators: Dict[str, Aggregator]):
+        self.aggregators = aggregators
+
+    def create(self) -> Dict[str, Any]:
+        return {name: agg.create() for name, agg in self.aggregators.items()}
+
+    def add(self, state: Dict[str, Any], entry: Dict[str, Any]) -> Dict[str, Any]:
+        for name, agg in self.aggregators.items():
+            state[name] = agg.add(state[name], entry)
+        return state
+
+    def merge(self, state: Dict[str, Any], other: Dict[str, Any]) -> Dict[str, Any]:
+        for name, agg in self.aggregators.items():
+            state[name] = agg.merge(state[name], other[name])
+        return state
+
+    def finalize(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: agg.finalize(state[name]) for name, agg in self.aggregators.items()}
+
+    def dump(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: agg.dump(state[name]) for name, agg in self.aggregators.items()}
+
+    def load(self, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {name: agg.load(data[name]) for name, agg in self.aggregators.items()}
+
+
+def add_lines(aggregator: Aggregator, state: Any, data: bytes, source: str = "") -> Any:
+    """Parse the JSONL lines in `data` into `state`, skipping unreadable lines"""
+    for line in data.splitlines():
+        if not line.strip():
+            continue
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            logger.warning(f"Failed to parse log line in {source}")
+            continue
+        state = aggregator.add(state, entry)
+    return state
+
+
+def split_chunks(path: str, chunk_bytes: int = DEFAULT_CHUNK_BYTES) -> List[Tuple[str, int, int]]:
+    """
+    Cut a file into (path, start, end) byte ranges that end on newlines
+
+    Args:
+        path: JSONL file
+        chunk_bytes: Target chunk size
+
+    Returns:
+        Ranges covering the whole file (a gzip file is one range)
+    """
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    if path.endswith(".gz"):
+        return [(path, 0, size)]
+    chunks = []
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        start = 0
+        while start < size:
+            end = min(start + chunk_bytes, size)
+            if end < size:
+                newline = mm.find(b"\n", end - 1)
+                end = size if newline == -1 else newline + 1
+            chunks.append((path, start, end))
+            start = end
+    return chunks
+
+
+def scan_chunk(aggregator: Aggregator, path: str, start: int, end: int) -> Any:
+    """Aggregate one byte range of a log file (runs in a worker process)"""
+    if path.endswith(".gz"):
+        with gzip.open(path, "rb") as f:
+            return add_lines(aggregator, aggregator.create(), f.read(), path)
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        return add_lines(aggregator, aggregator.create(), mm[start:end], path)
+
+
+class LogScanner:
+    """Scans JSONL logs in newline-aligned chunks across a process pool"""
+
+    def __init__(
+        self,
+        aggregator: Aggregator = None,
+        workers: int = None,
+        chunk_bytes: int = DEFAULT_CHUNK_BYTES,
+    ):
+        """
+        Args:
+            aggregator: Statistic to compute (StatisticsAggregator by default)
+            workers: Worker processes (CPU count by default; 1 scans in-process)
+            chunk_bytes: Target bytes per task
+        """
+        self.aggregator = aggregator or StatisticsAggregator()
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_bytes = chunk_bytes
+
+    def scan(self, paths: Iterable) -> Any:
+        """
+        Aggregate every entry of the given log files
+
+        Args:
+            paths: JSONL files
+
+        Returns:
+            The aggregator's finalized result
+        """
+        chunks = []
+        for path in paths:
+            chunks.extend(split_chunks(str(path), self.chunk_bytes))
+
+        state = self.aggregator.create()
+        if self.workers <= 1 or len(chunks) <= 1:
+            for chunk in chunks:
+                state = self.aggregator.merge(state, scan_chunk(self.aggregator, *chunk))
+            return self.aggregator.finalize(state)
+
+        with ProcessPoolExecutor(max_workers=min(self.workers, len(chunks))) as pool:
+            futures = [pool.submit(scan_chunk, self.aggregator, *chunk) for chunk in chunks]
+            # merge in file order so order-sensitive aggregators stay deterministic
+            for future in futures:
+                state = self.aggregator.merge(state, future.result())
+        return self.aggregator.finalize(state)
+
+    def scan_dir(self, log_dir, pattern: str = "audit_*.jsonl*") -> Any:
+        """
+        Aggregate every `.jsonl` or `.jsonl.gz` log file in `log_dir` matching `pattern`
+
+        A plain file whose compressed copy already exists is read once, as the `.gz`.
+        """
+        paths = {
+            path.name: path
+            for path in Path(log_dir).glob(pattern)
+            if path.name.endswith((".jsonl", ".jsonl.gz"))
+        }
+        return self.scan(sorted(p for name, p in paths.items() if name + ".gz" not in paths))
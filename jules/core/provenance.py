@@ -1,22 +1,201 @@
 """Provenance logging system"""
 
+import atexit
+import gzip
 import json
 import os
+import re
+import shutil
+import threading
+import time
+import weakref
+import zlib
 from datetime import datetime, timedelta, timezone
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import logging
 
+from agents.jules.io_utils import BackgroundWriter, atomic_write_json, sha256_hex_of_str
+from agents.provenance_store import AUDIT_MODULE, ProvenanceStore, audit_entry_event
+from jules.core.log_db import AuditLogDB
+from jules.core.log_query import QueryFilter, SegmentIndexAggregator
+from jules.core.log_scanner import (
+    CompositeAggregator,
+    LogScanner,
+    StatisticsAggregator,
+    add_lines,
+)
+
 logger = logging.getLogger(__name__)
 
+# database file in log_dir with log_format "sqlite"
+DB_FILENAME = "audit.sqlite"
+
+# per-file statistics cache next to the logs, see ProvenanceLogger.get_statistics
+ROLLUP_FILENAME = ".rollups.json"
+ROLLUP_VERSION = 4
+
+# audit_<YYYYMMDD>[.<segment>].jsonl[.gz]
+LOG_NAME = re.compile(r"^audit_(\d{8})(?:\.(\d+))?\.jsonl(\.gz)?$")
+
+
+def parse_log_name(path) -> Optional[Tuple[datetime, int, bool]]:
+    """
+    Parse an audit log file name
+
+    Args:
+        path: Log file path or name
+
+    Returns:
+        (UTC date, segment number, compressed), or None for other files
+    """
+    match = LOG_NAME.match(Path(path).name)
+    if not match:
+        return None
+    try:
+        date = datetime.strptime(match.group(1), "%Y%m%d").replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+    return date, int(match.group(2) or 0), bool(match.group(3))
+
+
+def log_files(log_dir) -> List[Path]:
+    """
+    Audit log segments in `log_dir`, oldest first
+
+    A segment that exists both plain and compressed (compression finishing)
+    is listed once, as the complete `.gz`.
+    """
+    found = {}
+    for path in Path(log_dir).glob("audit_*.jsonl*"):
+        parsed = parse_log_name(path)
+        if parsed is None:
+            continue
+        date, segment, compressed = parsed
+        if compressed or (date, segment) not in found:
+            found[(date, segment)] = path
+    return [found[key] for key in sorted(found)]
+
+
+def open_log(path, mode: str = "r"):
+    """Open a plain or gzip-compressed log segment"""
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode if "b" in mode else mode + "t")
+    return open(path, mode)
+
+
+def segment_path(day_path: Path, segment: int) -> Path:
+    """The path of segment `segment` of the day whose first segment is `day_path`"""
+    if segment == 0:
+        return day_path
+    return day_path.with_name(f"{day_path.stem}.{segment}.jsonl")
+
+
+def compress_log(path: Path) -> Path:
+    """Gzip a closed log segment next to it, then remove the plain file"""
+    target = path.with_name(path.name + ".gz")
+    tmp = path.with_name(path.name + ".gz.tmp")
+    with open(path, "rb") as src, gzip.open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, target)
+    path.unlink()
+    return target
+
+
+def _current(path: Path) -> Path:
+    """`path`, or its `.gz` when a background compression replaced it meanwhile"""
+    if not path.exists() and not path.name.endswith(".gz"):
+        compressed = path.with_name(path.name + ".gz")
+        if compressed.exists():
+            return compressed
+    return path
+
+
+# loggers with an open log file, flushed at interpreter exit
+_open_loggers = weakref.WeakSet()
+
+
+def _flush_open_loggers():
+    for provenance_logger in list(_open_loggers):
+        provenance_logger.close()
+
+
+atexit.register(_flush_open_loggers)
+
+
+def _flush_periodically(logger_ref, stop: threading.Event, interval: float):
+    """Flusher thread: write out lines left buffered for `interval` seconds"""
+    delay = interval
+    while not stop.wait(delay):
+        provenance_logger = logger_ref()
+        if provenance_logger is None:
+            return
+        delay = provenance_logger._flush_due()
+        del provenance_logger
+
 
 class ProvenanceLogger:
-    """Logs provenance information for all flagged posts"""
+    """
+    Logs provenance information for all flagged posts
+
+    The current `audit_<date>.jsonl` stays open between calls and lines are
+    buffered until `flush_bytes` are pending or `flush_interval` seconds have
+    passed since the last write (a daemon thread writes out lines left
+    waiting that long); `flush_bytes=0` writes every call through.
+    A new file is opened when the UTC date changes, and within a day once the
+    current segment reaches `max_file_bytes` (`audit_<date>.1.jsonl`, ...).
+    With `compress_closed`, segments are gzipped in the background once
+    closed; every reader handles `.jsonl.gz` segments.
+
+    With `log_format: sqlite` entries go to `<log_dir>/audit.sqlite`
+    instead (same buffering, one transaction per flush) and statistics,
+    queries, lookups and cleanup run as indexed SQL; `import_logs` migrates
+    existing JSONL logs.
+    """
 
     def __init__(self, config):
         self.config = config
         self.log_dir = Path(config.log_dir)
         self.log_dir.mkdir(parents=True, exist_ok=True)
+        self.index = None
+        self.aggregator = StatisticsAggregator()
+        self.rollup_aggregator = CompositeAggregator(
+            {"stats": self.aggregator, "segment": SegmentIndexAggregator()}
+        )
+        self.last_query = {}
+        self.flush_bytes = getattr(config, "flush_bytes", 0)
+        self.flush_interval = getattr(config, "flush_interval", 1.0)
+        self.max_file_bytes = getattr(config, "max_file_bytes", 0)
+        self.compress_closed = getattr(config, "compress_closed", False)
+
+        self._lock = threading.Lock()
+        self._file = None
+        self._file_path = None
+        self._day_path = None
+        self._segment = 0
+        self._file_bytes = 0
+        self._live = None  # rollup state of the lines this logger added to the open segment
+        self._compressor = None
+        self._pending = []  # (line, entry) not yet written to self._file
+        self._pending_bytes = 0
+        self._last_write = time.monotonic()
+        self._flusher = None
+        self._flusher_stop = threading.Event()
+
+        if getattr(config, "index_path", ""):
+            self.index = ProvenanceStore(config.index_path)
+
+        self.db = None
+        if getattr(config, "log_format", "json") == "sqlite":
+            self.db = AuditLogDB(self.log_dir / DB_FILENAME)
+
+        self._writer = None
+        if getattr(config, "async_writes", False):
+            self._writer = BackgroundWriter(
+                self._write_entries,
+                maxsize=getattr(config, "queue_size", 10000),
+                name="provenance-log-writer",
+            )
 
     def log(self, flagged_post: Dict[str, Any]) -> str:
         """
@@ -26,8 +205,40 @@ class ProvenanceLogger:
             flagged_post: Dictionary containing post and detection results
 
         Returns:
-            Path to log file
+            Path to log file (the day's first segment with async_writes)
+        """
+        log_path, log_entry = self._entry(flagged_post)
+        if self._writer:
+            self._writer.submit((log_path, log_entry))
+        else:
+            (log_path,) = self._write_entries([(log_path, log_entry)])
+
+        logger.debug(f"Logged provenance for post {log_entry['post_id']} to {log_path}")
+        return str(log_path)
+
+    def log_many(self, flagged_posts: List[Dict[str, Any]]) -> List[str]:
         """
+        Log several flagged posts in one write
+
+        Args:
+            flagged_posts: Dictionaries containing post and detection results
+
+        Returns:
+            Path to the log file of each post
+        """
+        items = [self._entry(flagged_post) for flagged_post in flagged_posts]
+        paths = [log_path for log_path, _ in items]
+        if self._writer:
+            for item in items:
+                self._writer.submit(item)
+        elif items:
+            paths = self._write_entries(items)
+
+        logger.debug(f"Logged provenance for {len(items)} posts")
+        return [str(log_path) for log_path in paths]
+
+    def _entry(self, flagged_post: Dict[str, Any]):
+        """Build the (log_path, entry) pair for a flagged post"""
         timestamp = datetime.now(timezone.utc)
         date_str = timestamp.strftime("%Y%m%d")
         log_filename = f"audit_{date_str}.jsonl"
@@ -54,89 +265,486 @@ class ProvenanceLogger:
                 },
             },
         }
+        return log_path, log_entry
+
+    def _write_entries(self, items):
+        """
+        Buffer (day log path, entry) pairs for the open segment (JSONL format)
 
-        # Append to log file (JSONL format)
-        with open(log_path, "a") as f:
-            f.write(json.dumps(log_entry) + "\n")
+        Returns:
+            The segment each entry went to
+        """
+        written = []
+        with self._lock:
+            for day_path, entry in items:
+                if self.db:
+                    line = json.dumps(entry)
+                    self._pending.append((line, entry))
+                    self._pending_bytes += len(line)
+                    written.append(self.db.path)
+                    continue
+                if day_path != self._day_path:
+                    self._rollover_locked(day_path)
+                elif self.max_file_bytes and self._file_bytes >= self.max_file_bytes:
+                    self._open_segment_locked(self._segment + 1)
+                line = json.dumps(entry) + "\n"
+                self._pending.append((line, entry))
+                self._pending_bytes += len(line)
+                self._file_bytes += len(line)
+                if self._live is not None:
+                    self._live["state"] = self.rollup_aggregator.add(self._live["state"], entry)
+                written.append(self._file_path)
 
-        logger.debug(f"Logged provenance for post {log_entry['post_id']} to {log_path}")
-        return str(log_path)
+            if (
+                self._pending_bytes >= self.flush_bytes
+                or time.monotonic() - self._last_write >= self.flush_interval
+            ):
+                self._flush_locked()
+            elif self._pending and self._flusher is None and self.flush_interval > 0:
+                self._flusher = threading.Thread(
+                    target=_flush_periodically,
+                    args=(weakref.ref(self), self._flusher_stop, self.flush_interval),
+                    name="provenance-log-flusher",
+                    daemon=True,
+                )
+                self._flusher.start()
+        return written
+
+    def _flush_due(self) -> float:
+        """Flush if the buffer is `flush_interval` old; returns the seconds until the next check"""
+        with self._lock:
+            due = self._last_write + self.flush_interval - time.monotonic()
+            if due > 0:
+                return due
+            self._flush_locked()
+        return self.flush_interval
+
+    def _rollover_locked(self, day_path):
+        """Switch to the day of `day_path` (a new UTC date), continuing its last segment"""
+        segments = [
+            parse_log_name(p)[1:]
+            for p in log_files(self.log_dir)
+            if p.name.startswith(day_path.stem + ".")
+        ]
+        segment, closed = max(segments, default=(0, False))
+        if not closed and self.max_file_bytes:
+            # a segment an earlier run filled up is closed too
+            path = segment_path(day_path, segment)
+            closed = path.exists() and path.stat().st_size >= self.max_file_bytes
+        self._day_path = day_path
+        self._open_segment_locked(segment + 1 if closed else segment)
+
+    def _open_segment_locked(self, segment: int):
+        """Write out and close the current segment, then open `segment` of the current day"""
+        self._flush_locked()
+        if self._file:
+            self._file.close()
+            self._closed_segment(self._file_path)
+        self._segment = segment
+        self._file_path = segment_path(self._day_path, segment)
+        self._file = open(self._file_path, "a")
+        self._file_bytes = self._file.tell()
+        self._live = {"offset": self._file_bytes, "state": self.rollup_aggregator.create()}
+        _open_loggers.add(self)
+
+    def _closed_segment(self, path: Path):
+        """Hand a closed segment to the background compressor, if enabled"""
+        if not self.compress_closed:
+            return
+        if self._compressor is None:
+            self._compressor = BackgroundWriter(
+                self._compress_segments, batch_size=1, name="provenance-log-compressor"
+            )
+        self._compressor.submit(path)
+
+    def _compress_segments(self, paths):
+        for path in paths:
+            if path.exists():
+                compress_log(path)
+                logger.debug(f"Compressed closed log segment {path}")
+
+    def compress_closed_logs(self) -> int:
+        """
+        Compress plain segments that are no longer written
+
+        Every plain segment except the last one of today is considered
+        closed, including those left by earlier runs.
+
+        Returns:
+            Number of segments compressed
+        """
+        self.flush()
+        today = datetime.now(timezone.utc).strftime("%Y%m%d")
+        plain = [p for p in log_files(self.log_dir) if not p.name.endswith(".gz")]
+        todays = [p for p in plain if p.name.startswith(f"audit_{today}.")]
+        count = 0
+        for path in plain:
+            if todays and path == todays[-1]:
+                continue
+            if path == self._file_path:
+                continue
+            compress_log(path)
+            count += 1
+        return count
+
+    def _flush_locked(self):
+        """Write the buffered lines with one call, then index them"""
+        self._last_write = time.monotonic()
+        if not self._pending:
+            return
+        entries = [entry for _, entry in self._pending]
+        if self.db:
+            self.db.insert_many(entries, [line for line, _ in self._pending])
+            source = str(self.db.path)
+        else:
+            self._file.write("".join(line for line, _ in self._pending))
+            self._file.flush()
+            source = str(self._file_path)
+        self._pending = []
+        self._pending_bytes = 0
+
+        if self.index:
+            self.index.add_many(
+                [audit_entry_event(e) for e in entries], source=source, bodies=entries
+            )
+
+    def _close_file(self):
+        with self._lock:
+            self._flush_locked()
+            if self._file:
+                self._file.close()
+            self._file = None
+            self._file_path = None
+            self._day_path = None
+            self._live = None
+            _open_loggers.discard(self)
+
+    def flush(self):
+        """Wait until every logged entry is on disk"""
+        if self._writer:
+            self._writer.flush()
+        with self._lock:
+            self._flush_locked()
+
+    def close(self):
+        """Drain pending writes, stop the background writer and close the log file"""
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+        if self._flusher:
+            self._flusher_stop.set()
+            if self._flusher is not threading.current_thread():
+                self._flusher.join()
+            self._flusher = None
+            self._flusher_stop = threading.Event()
+        self._close_file()
+        if self._compressor:
+            self._compressor.close()
+            self._compressor = None
+
+    def find_post(self, post_id: str) -> List[Dict[str, Any]]:
+        """
+        Look up every logged entry for a post
+
+        Uses the provenance index or the SQLite backend when configured,
+        otherwise scans the logs.
+
+        Args:
+            post_id: Reddit post id
+
+        Returns:
+            Matching log entries, oldest first
+        """
+        self.flush()
+        if self.index:
+            return self.index.find(inputhash=sha256_hex_of_str(str(post_id)), module=AUDIT_MODULE)
+        if self.db:
+            return self.db.find_post(post_id)
+        matches = []
+        for log_file in log_files(self.log_dir):
+            with open_log(_current(log_file)) as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("post_id") == post_id:
+                        matches.append(entry)
+        return sorted(matches, key=lambda e: e.get("timestamp", ""))
 
     def get_statistics(self) -> Dict[str, Any]:
         """
         Get aggregate statistics from provenance logs
 
+        Per-file rollups (statistics and segment index states) are cached in a
+        sidecar keyed by file size and mtime, so only bytes appended since the
+        last call are parsed; entries this logger wrote to the open segment
+        were already added (sketches included) as they were logged.
+
         Returns:
             Dictionary with audit statistics
         """
-        stats = {
-            "total_flagged": 0,
-            "by_subreddit": {},
-            "by_date": {},
-            "avg_hallucination_score": 0.0,
-            "avg_echo_score": 0.0,
-        }
+        self.flush()
+        if self.db:
+            return self.db.statistics()
+        state = self.aggregator.create()
+        for _, rollup in self._refresh_rollups():
+            state = self.aggregator.merge(state, rollup["state"]["stats"])
+        return self.aggregator.finalize(state)
 
-        total_hall_score = 0.0
-        total_echo_score = 0.0
+    def query(self, query_filter: QueryFilter, limit: int = None) -> List[Dict[str, Any]]:
+        """
+        Find logged entries matching a filter
+
+        Files whose segment index (kept in the rollups) rules out a match are
+        not read. `last_query` records how many files were scanned.
+
+        Args:
+            query_filter: Conditions on subreddit, time range, scores and flags
+            limit: Maximum number of entries to return
 
-        # Read all log files
-        for log_file in self.log_dir.glob("audit_*.jsonl"):
-            with open(log_file, "r") as f:
+        Returns:
+            Matching log entries, in file order
+        """
+        self.flush()
+        if self.db:
+            self.last_query = {"files": 0, "scanned": 0}
+            return self.db.query(query_filter, limit)
+        rollups = self._refresh_rollups()
+        self.last_query = {"files": len(rollups), "scanned": 0}
+        results = []
+        for log_file, rollup in rollups:
+            if not query_filter.may_match(rollup["state"]["segment"]):
+                continue
+            self.last_query["scanned"] += 1
+            with open_log(_current(log_file)) as f:
                 for line in f:
                     try:
-                        entry = json.loads(line.strip())
-                        stats["total_flagged"] += 1
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if query_filter.matches(entry):
+                        results.append(entry)
+                        if limit is not None and len(results) >= limit:
+                            return results
+        return results
+
+    def _refresh_rollups(self):
+        """Update and save the rollups; returns (log_file, rollup) in file order"""
+        rollups = self._load_rollups()
+        changed = False
+        current = []
+        for log_file in log_files(self.log_dir):
+            log_file = _current(log_file)
+            rollup = self._take_live_rollup(log_file, rollups.get(log_file.name))
+            if rollup is not None:
+                updated = True
+            else:
+                try:
+                    rollup, updated = self._rollup(log_file, rollups.get(log_file.name))
+                except FileNotFoundError:
+                    # compressed in the background since the listing: read the .gz instead
+                    log_file = _current(log_file)
+                    if not log_file.exists():
+                        continue
+                    rollup, updated = self._rollup(log_file, rollups.get(log_file.name))
+            rollups[log_file.name] = rollup
+            changed = changed or updated
+            current.append((log_file, rollup))
+
+        for name in set(rollups) - {log_file.name for log_file, _ in current}:
+            del rollups[name]
+            changed = True
+        if changed:
+            self._save_rollups(rollups)
+        return current
+
+    def _take_live_rollup(self, log_file: Path, rollup: Dict[str, Any] = None):
+        """
+        Bring the rollup of the open segment up to date from the entries logged to it
 
-                        # By subreddit
-                        subreddit = entry.get("subreddit", "unknown")
-                        stats["by_subreddit"][subreddit] = (
-                            stats["by_subreddit"].get(subreddit, 0) + 1
-                        )
+        Statistics and sketches of logged entries are added as they are
+        written, so the open segment is not parsed again. When the rollup
+        does not end where that state starts (or another process appended
+        to the file) nothing is returned and the file is parsed instead.
 
-                        # By date
-                        date = entry["timestamp"][:10]
-                        stats["by_date"][date] = stats["by_date"].get(date, 0) + 1
+        Returns:
+            The updated rollup, or None
+        """
+        with self._lock:
+            if log_file != self._file_path or self._live is None:
+                return None
+            self._flush_locked()
+            live = self._live
+            st = log_file.stat()
+            if st.st_size != self._file_bytes:
+                self._live = None
+                return None
+            self._live = {"offset": st.st_size, "state": self.rollup_aggregator.create()}
+        if live["offset"] == 0:
+            rollup = {"offset": 0, "state": self.rollup_aggregator.create()}
+        elif not rollup or rollup["offset"] != live["offset"]:
+            return None
+        state = self.rollup_aggregator.merge(rollup["state"], live["state"])
+        return {"offset": st.st_size, "state": state, "size": st.st_size, "mtime": st.st_mtime_ns}
+
+    def rescan_statistics(self, workers: int = None) -> Dict[str, Any]:
+        """
+        Recompute statistics from every log line, ignoring the rollups
 
-                        # Scores
-                        total_hall_score += entry.get("hallucination_score", 0)
-                        total_echo_score += entry.get("echo_score", 0)
+        Args:
+            workers: Scanner processes (CPU count by default)
 
+        Returns:
+            Dictionary with audit statistics
+        """
+        self.flush()
+        if self.db:
+            return self.db.statistics()
+        return LogScanner(self.aggregator, workers=workers).scan(log_files(self.log_dir))
+
+    def import_logs(self, source_dir=None, batch_size: int = 10000) -> int:
+        """
+        Copy JSONL logs (plain or compressed) into the SQLite backend
+
+        Importing the same logs again adds nothing.
+
+        Args:
+            source_dir: Directory of audit_*.jsonl logs (default: log_dir)
+            batch_size: Entries per transaction
+
+        Returns:
+            Number of entries added
+        """
+        if not self.db:
+            raise ValueError("import_logs needs log_format: sqlite")
+        self.flush()
+        added = 0
+        batch = []
+        for log_file in log_files(source_dir or self.log_dir):
+            with open_log(_current(log_file)) as f:
+                for line in f:
+                    try:
+                        batch.append(json.loads(line))
                     except json.JSONDecodeError:
                         logger.warning(f"Failed to parse log line in {log_file}")
+                        continue
+                    if len(batch) >= batch_size:
+                        added += self.db.insert_many(batch, skip_existing=True)
+                        batch = []
+        added += self.db.insert_many(batch, skip_existing=True)
+        return added
+
+    @property
+    def rollup_path(self) -> Path:
+        return self.log_dir / ROLLUP_FILENAME
 
-        # Calculate averages
-        if stats["total_flagged"] > 0:
-            stats["avg_hallucination_score"] = total_hall_score / stats["total_flagged"]
-            stats["avg_echo_score"] = total_echo_score / stats["total_flagged"]
+    def _load_rollups(self) -> Dict[str, Any]:
+        try:
+            with open(self.rollup_path, "r") as f:
+                rollups = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return {}
+        if rollups.get("version") != ROLLUP_VERSION:
+            return {}
+        files = rollups.get("files", {})
+        try:
+            for rollup in files.values():
+                rollup["state"] = self.rollup_aggregator.load(rollup["state"])
+        except (KeyError, TypeError, ValueError, zlib.error):
+            logger.warning(f"Ignoring unreadable log rollups in {self.rollup_path}")
+            return {}
+        return files
 
-        return stats
+    def _save_rollups(self, rollups: Dict[str, Any]):
+        try:
+            files = {
+                name: dict(rollup, state=self.rollup_aggregator.dump(rollup["state"]))
+                for name, rollup in rollups.items()
+            }
+            atomic_write_json(str(self.rollup_path), {"version": ROLLUP_VERSION, "files": files})
+        except OSError as e:
+            # statistics stay correct, the next call just parses from scratch again
+            logger.warning(f"Could not save log rollups to {self.rollup_path}: {e}")
+
+    def _rollup(self, log_file: Path, rollup: Dict[str, Any] = None):
+        """
+        Bring the rollup of one log file up to date
+
+        Args:
+            log_file: Path to an audit log
+            rollup: Cached rollup of the file, if any
+
+        Returns:
+            (rollup, whether it changed)
+        """
+        st = log_file.stat()
+        if rollup and rollup["size"] == st.st_size and rollup["mtime"] == st.st_mtime_ns:
+            return rollup, False
+        compressed = log_file.name.endswith(".gz")
+        if not rollup or compressed or st.st_size < rollup["offset"]:
+            # new, truncated or rewritten (compressed segments are read whole): start over
+            rollup = {"offset": 0, "state": self.rollup_aggregator.create()}
+
+        if compressed:
+            with open_log(log_file, "rb") as f:
+                complete = f.read()
+            rollup["offset"] = st.st_size
+        else:
+            with open(log_file, "rb") as f:
+                f.seek(rollup["offset"])
+                data = f.read(st.st_size - rollup["offset"])
+            # a line still being written is parsed on a later call
+            complete = data[: data.rfind(b"\n") + 1]
+            rollup["offset"] += len(complete)
+        rollup["state"] = add_lines(
+            self.rollup_aggregator, rollup["state"], complete, str(log_file)
+        )
+        rollup["size"] = st.st_size
+        rollup["mtime"] = st.st_mtime_ns
+        return rollup, True
 
     def cleanup_old_logs(self, days: int = None) -> int:
         """
         Remove logs older than specified days
 
+        Every segment of an expired day is deleted, plain or compressed. With
+        `compress_closed`, remaining closed segments are compressed.
+
         Args:
             days: Number of days to retain (uses config.retention_days if not specified)
 
         Returns:
-            Number of files deleted
+            Number of files deleted (entries deleted with the SQLite backend)
         """
+        self._close_file()
         retention_days = days or self.config.retention_days
         cutoff_date = datetime.now(timezone.utc) - timedelta(days=retention_days)
-        deleted_count = 0
+        if self.db:
+            return self.db.delete_before(cutoff_date.isoformat())
+        deleted = []
 
-        for log_file in self.log_dir.glob("audit_*.jsonl"):
+        for log_file in self.log_dir.glob("audit_*.jsonl*"):
+            if log_file.name.endswith(".tmp"):
+                continue
             # Extract date from filename
-            try:
-                date_str = log_file.stem.split("_")[1]
-                file_date = datetime.strptime(date_str, "%Y%m%d").replace(tzinfo=timezone.utc)
-
-                if file_date < cutoff_date:
-                    log_file.unlink()
-                    deleted_count += 1
-                    logger.info(f"Deleted old log file: {log_file}")
-            except (ValueError, IndexError):
+            parsed = parse_log_name(log_file)
+            if parsed is None:
                 logger.warning(f"Could not parse date from log file: {log_file}")
+                continue
+
+            if parsed[0] < cutoff_date:
+                log_file.unlink()
+                deleted.append(log_file.name)
+                logger.info(f"Deleted old log file: {log_file}")
+
+        if deleted:
+            rollups = self._load_rollups()
+            if any(name in rollups for name in deleted):
+                for name in deleted:
+                    rollups.pop(name, None)
+                self._save_rollups(rollups)
 
-        return deleted_count
+        if self.compress_closed:
+            self.compress_closed_logs()
+        return len(deleted)
@@ -0,0 +1,201 @@
+"""Mergeable streaming sketches for log statistics"""
+
+import base64
+import hashlib
+import math
+import zlib
+from typing import Any, Dict, List, Optional
+
+
+class TDigest:
+    """
+    Approximate quantiles in bounded memory (merging t-digest)
+
+    Values are buffered and periodically merged into at most about
+    `compression` centroids, sized by the k1 scale function so they stay
+    small near the tails and extreme percentiles remain accurate. Digests
+    built on different files or workers merge into one.
+    """
+
+    def __init__(self, compression: int = 100):
+        """
+        Args:
+            compression: Accuracy/size trade-off (number of centroids kept)
+        """
+        self.compression = compression
+        self.means: List[float] = []
+        self.weights: List[float] = []
+        self.min = math.inf
+        self.max = -math.inf
+        self._buffer: List[tuple] = []
+
+    @property
+    def count(self) -> float:
+        return sum(self.weights) + sum(w for _, w in self._buffer)
+
+    def add(self, value: float, weight: float = 1.0):
+        """Add one observation"""
+        self._buffer.append((value, weight))
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if len(self._buffer) >= 5 * self.compression:
+            self._compress()
+
+    def merge(self, other: "TDigest") -> "TDigest":
+        """Fold another digest into this one (the other is left unchanged)"""
+        self._buffer.extend(zip(other.means, other.weights))
+        self._buffer.extend(other._buffer)
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self._compress()
+        return self
+
+    def _compress(self):
+        items = sorted(list(zip(self.means, self.weights)) + self._buffer)
+        self._buffer = []
+        if not items:
+            return
+        total = sum(w for _, w in items)
+        means, weights = [], []
+        mean, weight = items[0]
+        before = 0.0
+        k_left = self._scale(0.0)
+        for m, w in items[1:]:
+            # a centroid may span at most one unit of the k1 scale function
+            if self._scale((before + weight + w) / total) - k_left <= 1:
+                mean += (m - mean) * w / (weight + w)
+                weight += w
+            else:
+                means.append(mean)
+                weights.append(weight)
+                before += weight
+                k_left = self._scale(before / total)
+                mean, weight = m, w
+        means.append(mean)
+        weights.append(weight)
+        self.means, self.weights = means, weights
+
+    def _scale(self, q: float) -> float:
+        return self.compression / (2 * math.pi) * math.asin(min(1.0, max(-1.0, 2 * q - 1)))
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimate a quantile
+
+        Args:
+            q: Quantile in [0, 1]
+
+        Returns:
+            The estimated value, or None when the digest is empty
+        """
+        self._compress()
+        if not self.means:
+            return None
+        if len(self.means) == 1:
+            return self.means[0]
+        total = sum(self.weights)
+        target = q * total
+        centers = []
+        cumulative = 0.0
+        for w in self.weights:
+            centers.append(cumulative + w / 2)
+            cumulative += w
+        if target <= centers[0]:
+            return self._interpolate(0.0, self.min, centers[0], self.means[0], target)
+        if target >= centers[-1]:
+            return self._interpolate(centers[-1], self.means[-1], total, self.max, target)
+        for i in range(len(centers) - 1):
+            if centers[i] <= target < centers[i + 1]:
+                return self._interpolate(
+                    centers[i], self.means[i], centers[i + 1], self.means[i + 1], target
+                )
+        return self.means[-1]
+
+    @staticmethod
+    def _interpolate(x0, y0, x1, y1, x):
+        if x1 == x0:
+            return y0
+        return y0 + (y1 - y0) * (x - x0) / (x1 - x0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self._compress()
+        return {
+            "compression": self.compression,
+            "means": self.means,
+            "weights": self.weights,
+            "min": self.min if self.means else None,
+            "max": self.max if self.means else None,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "TDigest":
+        digest = cls(data["compression"])
+        digest.means = list(data["means"])
+        digest.weights = list(data["weights"])
+        if digest.means:
+            digest.min, digest.max = data["min"], data["max"]
+        return digest
+
+
+class HyperLogLog:
+    """
+    Approximate distinct counts in 2**p bytes
+
+    The standard error is about 1.04 / sqrt(2**p) (3% for p=10). Values are
+    hashed with BLAKE2b, so sketches built in different processes agree and
+    merge by taking the register-wise maximum.
+    """
+
+    def __init__(self, p: int = 10):
+        """
+        Args:
+            p: Precision; the sketch keeps 2**p registers
+        """
+        if not 4 <= p <= 16:
+            raise ValueError("HyperLogLog precision must be between 4 and 16")
+        self.p = p
+        self.registers = bytearray(1 << p)
+
+    def add(self, value: str):
+        """Add one value (compared by its string form)"""
+        h = int.from_bytes(
+            hashlib.blake2b(str(value).encode("utf-8"), digest_size=8).digest(), "big"
+        )
+        index = h >> (64 - self.p)
+        rest = h & ((1 << (64 - self.p)) - 1)
+        rank = (64 - self.p) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Fold another sketch of the same precision into this one"""
+        if other.p != self.p:
+            raise ValueError("cannot merge HyperLogLogs of different precision")
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct values added"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0**-r for r in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * m and zeros:
+            estimate = m * math.log(m / zeros)  # linear counting for small sets
+        return int(round(estimate))
+
+    def copy(self) -> "HyperLogLog":
+        sketch = HyperLogLog(self.p)
+        sketch.registers = bytearray(self.registers)
+        return sketch
+
+    def to_dict(self) -> Dict[str, Any]:
+        # registers are mostly zero for small sets, so they compress well
+        packed = base64.b64encode(zlib.compress(bytes(self.registers))).decode("ascii")
+        return {"p": self.p, "registers": packed}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "HyperLogLog":
+        sketch = cls(data["p"])
+        sketch.registers = bytearray(zlib.decompress(base64.b64decode(data["registers"])))
+        return sketch
@@ -1,9 +1,12 @@
 """Reddit scraper for collecting posts"""
 
 import logging
+import zlib
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timezone
 
+from ingestion.dedup import SeenStore
+
 try:
     import praw
 
@@ -21,6 +24,12 @@ class RedditScraper:
     def __init__(self, config):
         self.config = config
         self.reddit = None
+        self.seen = None
+
+        if getattr(config, "dedup_dir", ""):
+            self.seen = SeenStore(
+                config.dedup_dir, capacity=config.dedup_capacity, fp_rate=config.dedup_fp_rate
+            )
 
         if PRAW_AVAILABLE and config.client_id and config.client_secret:
             try:
@@ -54,8 +63,25 @@ class RedditScraper:
             except Exception as e:
                 logger.error(f"Error scraping r/{subreddit_name}: {e}")
 
+        if self.seen:
+            # remembered by mark_seen once the posts have been analyzed
+            fresh = self.seen.filter_new(all_posts, commit=False)
+            logger.info(f"Dropped {len(all_posts) - len(fresh)} posts seen in earlier runs")
+            all_posts = fresh
+
         return all_posts
 
+    def mark_seen(self, posts: List[Dict[str, Any]]):
+        """
+        Record posts as processed so later runs drop them
+
+        Args:
+            posts: Posts returned by scrape_posts whose results are stored
+        """
+        if self.seen:
+            self.seen.mark_seen(posts)
+            self.seen.save()
+
     def _scrape_subreddit(self, subreddit_name: str) -> List[Dict[str, Any]]:
         """
         Scrape posts from a single subreddit
@@ -97,6 +123,9 @@ class RedditScraper:
         """Generate mock data for testing/demo purposes"""
         logger.info(f"Generating mock data for r/{subreddit_name}")
 
+        if getattr(self.config, "mock_posts", 0) > 0:
+            return self._scrape_synthetic(subreddit_name, self.config.mock_posts)
+
         mock_posts = [
             {
                 "id": f"mock_{subreddit_name}_001",
@@ -137,3 +166,10 @@ class RedditScraper:
         ]
 
         return mock_posts
+
+    def _scrape_synthetic(self, subreddit_name: str, count: int) -> List[Dict[str, Any]]:
+        """Generate a seeded synthetic corpus so downstream stages can be run at scale"""
+        from ingestion.synthetic import SyntheticConfig, as_scraper_post, generate
+
+        cfg = SyntheticConfig(posts=count, subreddits=1, seed=zlib.crc32(subreddit_name.encode()))
+        return [as_scraper_post(record, subreddit_name) for record, _ in generate(cfg)]
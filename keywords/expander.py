@@ -1,26 +1,23 @@
 import re
 import json
-import glob
 import subprocess
 from pathlib import Path
 from collections import Counter
 from typing import List, Dict
 from sklearn.feature_extraction.text import TfidfVectorizer
 from agents.provenance import emitevent
+from ingestion.ndjson_store import expand_paths, iter_records
 from datetime import datetime, timezone
 
 
 def extract_candidates(corpus_paths: List[str], min_freq: int = 3) -> List[Dict]:
     """Extracts noun phrases and multi-word expressions from a corpus."""
     phrase_counts = Counter()
-    for path in glob.glob(corpus_paths):
-        with open(path, "r", encoding="utf-8") as f:
-            for line in f:
-                data = json.loads(line)
-                text = (data.get("title", "") + " " + data.get("selftext", "")).lower()
-                # Simple regex for noun phrases (adjective? noun+)
-                phrases = re.findall(r"\b(?:\w+\s+){1,3}\w+\b", text)
-                phrase_counts.update(phrases)
+    for data in iter_records(corpus_paths):
+        text = (data.get("title", "") + " " + data.get("selftext", "")).lower()
+        # Simple regex for noun phrases (adjective? noun+)
+        phrases = re.findall(r"\b(?:\w+\s+){1,3}\w+\b", text)
+        phrase_counts.update(phrases)
 
     candidates = [{"phrase": p, "count": c} for p, c in phrase_counts.items() if c >= min_freq]
     return candidates
@@ -98,7 +95,7 @@ def save_expanded(
     output_path = output_dir / f"expanded_keywords_{run_id}.json"
 
     git_commit = subprocess.check_output(["git", "rev-parse", "--short", "HEAD"]).decode().strip()
-    input_files = glob.glob("data/raw/*_threads.ndjson")
+    input_files = expand_paths("data/raw/*_threads*.ndjson*")
 
     manifest = {
         "run_id": run_id,
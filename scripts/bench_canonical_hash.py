@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+Canonical JSON hashing benchmark.
+
+Compares hashing a fully materialized `json.dumps` string (the previous
+`sha256_hex_of_obj`) with the streaming encoder, on a small event payload, a
+large evidence list and an HTML-sized blob, reporting MB/s and peak memory.
+
+    PYTHONPATH=. python scripts/bench_canonical_hash.py --repeat 5
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import time
+import tracemalloc
+
+from agents.jules.io_utils import sha256_hex_of_obj
+
+
+def materialized(obj):
+    s = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+def payloads(seed=0):
+    rng = random.Random(seed)
+    words = "model emergent quantum field résumé 意识 signal theory".split()
+    evidence = [
+        {
+            "claimid": f"c{i}",
+            "url": f"https://example.org/{i}",
+            "snippet": " ".join(rng.choices(words, k=60)),
+            "score": rng.random(),
+            "tags": rng.sample(words, 3),
+        }
+        for i in range(20000)
+    ]
+    return {
+        "small_event": {"source": "reddit", "status": "success", "count": 12},
+        "evidence_list": {"claims": ["c1", "c2"], "evidence": evidence},
+        "html_blob": {"url": "https://example.org", "html": "<p>" + "é text ☃ " * 1_000_000},
+    }
+
+
+def measure(fn, obj, repeat):
+    tracemalloc.start()
+    fn(obj)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(obj)
+    secs = (time.perf_counter() - start) / repeat
+    return secs, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for name, obj in payloads().items():
+        assert materialized(obj) == sha256_hex_of_obj(obj)
+        size = len(json.dumps(obj, sort_keys=True, separators=(",", ":")))
+        row = {"bytes": size}
+        for label, fn in (("materialized", materialized), ("streaming", sha256_hex_of_obj)):
+            repeat = args.repeat * 2000 if name == "small_event" else args.repeat
+            secs, peak = measure(fn, obj, repeat)
+            row[label] = {
+                "us_per_call" if name == "small_event" else "mb_per_sec": (
+                    round(secs * 1e6, 2) if name == "small_event" else round(size / secs / 1e6, 1)
+                ),
+                "peak_mb": round(peak / 1e6, 2),
+            }
+        results[name] = row
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
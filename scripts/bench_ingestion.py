@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Offline ingestion throughput benchmark.
+
+Starts ingestion.fixture_server on an ephemeral port with a seeded synthetic
+corpus and measures the sequential `fetch_reddit_json` path, the asyncio
+fetcher, and a cassette replay of the sequential run.
+
+    PYTHONPATH=. python scripts/bench_ingestion.py --subs 8 --posts 2000 --latency-ms 20
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from agents.jules import http_client
+from agents.jules.cassette import Cassette
+from ingestion import reddit_scraper
+from ingestion.fixture_server import FixtureServer, synthetic_corpus
+
+
+def run_sync(base_url, subs, limit, cassette=None):
+    reddit_scraper.REDDIT_BASE = base_url
+    reddit_scraper.PAGE_DELAY = 0
+    http_client._default_client = http_client.HttpClient(cassette=cassette, backoff_base=0.05)
+    start = time.perf_counter()
+    posts = sum(len(reddit_scraper.fetch_reddit_json(s, limit=limit)) for s in subs)
+    return posts, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--subs", type=int, default=8)
+    parser.add_argument("--posts", type=int, default=2000)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    corpus = synthetic_corpus(args.subs, args.posts, seed=args.seed)
+    subs = [f"r/{name}" for name in corpus]
+    results = {}
+    with FixtureServer(
+        corpus,
+        latency=args.latency_ms / 1000.0,
+        throttle_rate=args.throttle_rate,
+        retry_after=0,
+        seed=args.seed,
+    ) as server, tempfile.TemporaryDirectory() as tmp:
+        tape = os.path.join(tmp, "listing.ndjson")
+        posts, secs = run_sync(server.base_url, subs, args.posts, Cassette(tape, "record"))
+        results["sync"] = {"posts": posts, "seconds": round(secs, 3)}
+
+        from ingestion.async_fetcher import ingest_async
+
+        summary = ingest_async(
+            subs,
+            limit=args.posts,
+            base_url=server.base_url,
+            out_dir=os.path.join(tmp, "raw"),
+            concurrency=args.concurrency,
+            backoff_base=0.05,
+        )
+        results["async"] = {"posts": summary["posts"], "seconds": summary["seconds"]}
+
+        posts, secs = run_sync(server.base_url, subs, args.posts, Cassette(tape, "replay"))
+        results["replay"] = {"posts": posts, "seconds": round(secs, 3)}
+        results["server"] = dict(server.stats)
+
+    for name in ("sync", "async", "replay"):
+        r = results[name]
+        r["posts_per_sec"] = round(r["posts"] / r["seconds"], 1) if r["seconds"] else None
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
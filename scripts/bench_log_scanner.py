@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Provenance log scan benchmark.
+
+Writes a synthetic `provenance_logs` directory (one file per day) and times a
+full statistics pass with the single-threaded line loop against `LogScanner`
+at several worker counts, reporting MB/s.
+
+    PYTHONPATH=. python scripts/bench_log_scanner.py --days 365 --entries 2000
+"""
+
+import argparse
+import json
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from jules.core.log_scanner import LogScanner, StatisticsAggregator, add_lines
+
+
+def write_logs(log_dir: Path, days: int, entries: int, seed: int = 0):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for d in range(days):
+        day = start + timedelta(days=d)
+        with open(log_dir / f"audit_{day:%Y%m%d}.jsonl", "w") as f:
+            for i in range(entries):
+                entry = {
+                    "timestamp": (day + timedelta(seconds=i)).isoformat(),
+                    "post_id": f"p{d}_{i}",
+                    "subreddit": rng.choice(["ArtificialSentience", "llmphysics", "singularity"]),
+                    "author": f"user{rng.randrange(500)}",
+                    "title": "Emergent resonance field " * 3,
+                    "hallucination_score": rng.random(),
+                    "hallucination_flags": ["buzzword_density"],
+                    "echo_score": rng.random(),
+                    "echo_chain_count": rng.randrange(5),
+                    "url": f"https://reddit.com/r/x/{i}",
+                }
+                f.write(json.dumps(entry) + "\n")
+
+
+def line_loop(log_dir: Path):
+    aggregator = StatisticsAggregator()
+    state = aggregator.create()
+    for path in sorted(log_dir.glob("audit_*.jsonl")):
+        with open(path, "rb") as f:
+            state = add_lines(aggregator, state, f.read(), str(path))
+    return aggregator.finalize(state)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--days", type=int, default=120)
+    parser.add_argument("--entries", type=int, default=2000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, os.cpu_count()])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir = Path(tmp)
+        write_logs(log_dir, args.days, args.entries)
+        size = sum(p.stat().st_size for p in log_dir.glob("audit_*.jsonl"))
+
+        results = {"bytes": size}
+        start = time.perf_counter()
+        expected = line_loop(log_dir)
+        results["line_loop_mb_per_sec"] = round(size / (time.perf_counter() - start) / 1e6, 1)
+        for workers in sorted(set(args.workers)):
+            start = time.perf_counter()
+            stats = LogScanner(workers=workers).scan_dir(log_dir)
+            secs = time.perf_counter() - start
+            assert stats["total_flagged"] == expected["total_flagged"]
+            results[f"scanner_{workers}_workers_mb_per_sec"] = round(size / secs / 1e6, 1)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
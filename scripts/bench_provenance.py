@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Provenance emit throughput benchmark.
+
+Emits the same events through the default one-file-per-event path, the
+batched NDJSON segment emitter and the background-thread variant, each into a
+scratch directory.
+
+    PYTHONPATH=. python scripts/bench_provenance.py --events 5000 --batch-size 256
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from agents import provenance
+
+
+def run(mode, events, tmp, **kwargs):
+    provenance.PROV_DIR = os.path.join(tmp, mode)
+    provenance.configure(mode, **kwargs)
+    start = time.perf_counter()
+    for i in range(events):
+        provenance.emitevent("bench", "bench_event", {"i": i, "text": "x" * 200}, inputhash=str(i))
+    emit_secs = time.perf_counter() - start
+    provenance.flush()
+    secs = time.perf_counter() - start
+    provenance.configure("files")
+    return {
+        "events": events,
+        "seconds": round(secs, 3),
+        "events_per_sec": round(events / secs, 1),
+        "caller_us_per_event": round(emit_secs / events * 1e6, 1),
+        "files": len(os.listdir(provenance.PROV_DIR)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=256)
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        results["files"] = run("files", args.events, tmp)
+        results["batched"] = run("batched", args.events, tmp, batch_size=args.batch_size)
+        results["async"] = run("async", args.events, tmp, batch_size=args.batch_size)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
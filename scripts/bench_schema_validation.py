@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Provenance schema validation microbenchmark.
+
+Compares building a Draft7Validator per event (the previous behaviour), the
+cached validator, and the structural fast path, on representative events.
+
+    PYTHONPATH=. python scripts/bench_schema_validation.py --events 20000
+"""
+
+import argparse
+import json
+import time
+
+from jsonschema import Draft7Validator
+
+from agents.jules import schema_validator
+
+
+def sample_events(n):
+    return [
+        {
+            "module": "deepseek_proxy",
+            "eventtype": "deepseek_call",
+            "timestampiso": "2024-01-01T00:00:00+00:00",
+            "payload": {"request": {"model": "deepseek-chat", "i": i}, "response": {"ok": True}},
+            "commitsha": "",
+            "inputhash": f"{i:064x}",
+            "outputhash": f"{i * 7:064x}",
+            "provenancetoken": f"token-{i}",
+        }
+        for i in range(n)
+    ]
+
+
+def per_event_validator(event):
+    v = Draft7Validator(schema_validator.load_schema())
+    if list(v.iter_errors(event)):
+        raise schema_validator.SchemaValidationError("invalid")
+
+
+def measure(fn, events):
+    start = time.perf_counter()
+    for e in events:
+        fn(e)
+    secs = time.perf_counter() - start
+    return {"seconds": round(secs, 4), "events_per_sec": round(len(events) / secs, 1)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--events", type=int, default=20000)
+    args = parser.parse_args()
+
+    events = sample_events(args.events)
+    schema_validator.validate_event_or_raise(events[0], full=True)  # warm the caches
+    results = {
+        "per_event_validator": measure(per_event_validator, events),
+        "cached_validator": measure(
+            lambda e: schema_validator.validate_event_or_raise(e, full=True), events
+        ),
+        "fast_path": measure(schema_validator.validate_event_or_raise, events),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,8 @@
 import argparse
 import os
 import re
-import requests
 from github import Github
+from agents.jules.http_client import get_client
 from agents.jules.io_utils import sha256_hex_of_obj
 from agents.provenance import emitevent
 from search.deepseekadapter import deepseekquery
@@ -19,7 +19,7 @@ def extract_url(text):
 
 def fetch_html_via_scrapedo(url, api_key):
     headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
-    resp = requests.get(SCRAPEDO_URL, headers=headers, params={"url": url}, timeout=60)
+    resp = get_client().get(SCRAPEDO_URL, headers=headers, params={"url": url}, timeout=60)
     resp.raise_for_status()
     return resp.text
 
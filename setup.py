@@ -6,5 +6,6 @@ setup(
     name="llm-echo",
     version="0.1.0",
     packages=find_packages(),
+    package_data={"agents.jules": ["provenance_schema.json"]},
     python_requires=">=3.8",
 )
@@ -69,3 +69,20 @@ class TestJulesAgent:
         if results["flagged_posts"] > 0:
             viz_dir = tmp_path / "viz"
             assert viz_dir.exists() or not results.get("visualizations")
+
+    def test_digest_audit_streams_flagged_posts(self, agent, tmp_path):
+        """Test that digest mode logs every flagged post without keeping them"""
+        from jules.core.audit_pr import AuditPRGenerator
+        from jules.core.provenance import ProvenanceLogger
+
+        agent.config.provenance.log_dir = str(tmp_path / "logs")
+        agent.provenance_logger = ProvenanceLogger(agent.config.provenance)
+        agent.pr_generator = AuditPRGenerator(output_dir=str(tmp_path / "templates"))
+
+        results = agent.run_audit(digest=True)
+
+        assert results["flagged_posts"] > 0
+        assert results["flagged_details"] == []
+        assert agent.get_statistics()["total_flagged"] == results["flagged_posts"]
+        (page,) = results["audit_files"]
+        assert f"- **Flagged Posts**: {results['flagged_posts']}\n" in open(page).read()
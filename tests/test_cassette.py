@@ -0,0 +1,31 @@
+import pytest
+
+from agents.jules.cassette import Cassette, CassetteMiss
+from agents.jules.http_client import HttpClient
+from ingestion.fixture_server import FixtureServer, synthetic_corpus
+
+
+def test_record_then_replay_offline(tmp_path):
+    tape = tmp_path / "tape.ndjson"
+    corpus = synthetic_corpus(1, 30, seed=2)
+    with FixtureServer(corpus) as server:
+        url = f"{server.base_url}/r/synthetic000/new.json"
+        recorder = HttpClient(cassette=Cassette(str(tape), "record"))
+        recorded = [recorder.get(url, params={"limit": 10}).json() for _ in range(2)]
+        assert server.stats["requests"] == 2
+
+    # the server is gone: replay must not touch the network
+    player = HttpClient(cassette=Cassette(str(tape), "replay"))
+    replayed = player.get(url, params={"limit": 10})
+    assert replayed.status_code == 200
+    assert replayed.headers["Content-Type"] == "application/json"
+    assert replayed.json() == recorded[0]
+    assert player.get(url, params={"limit": 10}).json() == recorded[1]
+
+    with pytest.raises(CassetteMiss):
+        player.get(url, params={"limit": 99})
+
+
+def test_unknown_mode_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        Cassette(str(tmp_path / "tape.ndjson"), "rewind")
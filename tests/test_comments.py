@@ -0,0 +1,137 @@
+from unittest.mock import patch
+
+from ingestion.comments import fetch_comment_tree, ingest_comments
+
+
+class FakeResp:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def t1(cid, parent, replies=None, depth=0):
+    data = {
+        "id": cid,
+        "name": f"t1_{cid}",
+        "parent_id": parent,
+        "link_id": "t3_abc",
+        "author": "someone",
+        "body": f"reply {cid}",
+        "created_utc": 1700000000,
+        "score": 1,
+        "depth": depth,
+        "replies": "",
+    }
+    if replies:
+        data["replies"] = {"kind": "Listing", "data": {"children": replies}}
+    return {"kind": "t1", "data": data}
+
+
+def more(ids, parent):
+    return {"kind": "more", "data": {"children": ids, "parent_id": parent, "count": len(ids)}}
+
+
+def continue_thread(parent):
+    return {"kind": "more", "data": {"children": [], "parent_id": parent, "count": 0, "id": "_"}}
+
+
+class FakeClient:
+    def __init__(self, stub_ids, continued=False):
+        self.calls = []
+        self.stub_ids = stub_ids
+        self.continued = continued
+
+    def get(self, url, headers=None, params=None, timeout=None):
+        self.calls.append((url, dict(params or {})))
+        if url.endswith("/comments/abc.json"):
+            c2_replies = [continue_thread("t1_c2")] if self.continued else None
+            tree = [
+                t1(
+                    "c1",
+                    "t3_abc",
+                    [t1("c2", "t1_c1", c2_replies, depth=1), more(["m1"], "t1_c1")],
+                ),
+                more(self.stub_ids, "t3_abc"),
+            ]
+            return FakeResp([{"data": {"children": []}}, {"data": {"children": tree}}])
+        if url.endswith("/comments/abc/_/c2.json"):
+            tree = [t1("c2", "t1_c1", [t1("c3", "t1_c2", depth=2)], depth=1)]
+            return FakeResp([{"data": {"children": []}}, {"data": {"children": tree}}])
+        ids = params["children"].split(",")
+        things = [t1(i, "t3_abc") for i in ids if i != "m1"]
+        if "m1" in ids:
+            things += [t1("m1", "t1_c1", depth=1), more(["deep1"], "t1_m1")]
+        return FakeResp({"json": {"errors": [], "data": {"things": things}}})
+
+
+def test_more_stubs_are_expanded_in_batches():
+    stub_ids = [f"s{i}" for i in range(150)]
+    client = FakeClient(stub_ids)
+    with patch("ingestion.comments.get_client", return_value=client):
+        comments, report = fetch_comment_tree("r/test", "abc", max_requests=10)
+
+    morechildren = [p for url, p in client.calls if url.endswith("morechildren.json")]
+    # nested stubs surfaced by a batch ride along with the next batch
+    assert [len(p["children"].split(",")) for p in morechildren] == [100, 52]
+    assert report == {
+        "thread_id": "abc",
+        "requests": 3,
+        "comments": 2 + 150 + 2,
+        "more_expanded": 152,
+        "unexpanded": 0,
+        "continued": 0,
+        "unexpanded_continued": 0,
+    }
+    by_id = {c["id"]: c for c in comments}
+    assert by_id["c2"]["parent_id"] == "t1_c1"
+    assert by_id["deep1"]["parent_id"] == "t3_abc"
+    assert by_id["c1"]["subreddit"] == "r/test"
+    assert "author" not in by_id["c1"]
+
+
+def test_request_budget_is_enforced():
+    client = FakeClient([f"s{i}" for i in range(350)])
+    with patch("ingestion.comments.get_client", return_value=client):
+        comments, report = fetch_comment_tree("r/test", "t3_abc", max_requests=2)
+    assert report["requests"] == 2
+    assert len(client.calls) == 2
+    # 351 stubs, one batch of 100 expanded, which surfaced one more nested stub
+    assert report["unexpanded"] == 351 - 100 + 1
+
+
+def test_continue_this_thread_stubs_are_followed_or_reported():
+    client = FakeClient([], continued=True)
+    with patch("ingestion.comments.get_client", return_value=client):
+        comments, report = fetch_comment_tree("r/test", "abc", max_requests=10)
+    assert client.calls[-1][0].endswith("/r/test/comments/abc/_/c2.json")
+    assert report["continued"] == 1 and report["unexpanded_continued"] == 0
+    by_id = {c["id"]: c for c in comments}
+    assert by_id["c3"]["parent_id"] == "t1_c2"
+    assert [c["id"] for c in comments].count("c2") == 1
+
+    client = FakeClient([], continued=True)
+    with patch("ingestion.comments.get_client", return_value=client):
+        comments, report = fetch_comment_tree("r/test", "abc", max_requests=2)
+    assert report["requests"] == 2
+    assert report["continued"] == 0 and report["unexpanded_continued"] == 1
+    assert "c3" not in {c["id"] for c in comments}
+
+
+def test_ingest_comments_skips_threads_without_replies():
+    client = FakeClient([])
+    written = []
+
+    class Writer:
+        def write_many(self, records):
+            written.extend(records)
+
+    threads = [{"id": "abc", "num_comments": 3}, {"id": "zzz", "num_comments": 0}]
+    with patch("ingestion.comments.get_client", return_value=client):
+        totals = ingest_comments("r/test", threads, Writer())
+    assert totals["threads"] == 1
+    assert totals["comments"] == len(written) == 4
@@ -0,0 +1,85 @@
+import pytest
+
+from ingestion.dedup import BloomFilter, SeenStore, content_hash
+from jules.core.config import RedditConfig
+from jules.scrapers.reddit_scraper import RedditScraper
+
+
+def posts(ids, title="t"):
+    return [{"id": i, "title": title, "selftext": "s", "num_comments": 1} for i in ids]
+
+
+def test_bloom_sizing_and_membership():
+    bloom = BloomFilter(10_000, 0.01)
+    assert bloom.num_hashes == 7
+    assert 11_000 < bloom.memory_bytes < 13_000
+    for i in range(10_000):
+        bloom.add(f"id{i}")
+    assert all(f"id{i}" in bloom for i in range(10_000))
+    false_hits = sum(f"other{i}" in bloom for i in range(10_000))
+    assert false_hits < 250
+
+
+def test_bloom_rejects_bad_parameters():
+    with pytest.raises(ValueError):
+        BloomFilter(0, 0.01)
+    with pytest.raises(ValueError):
+        BloomFilter(100, 1.5)
+
+
+def test_duplicates_are_dropped_across_runs(tmp_path):
+    with SeenStore(tmp_path, capacity=1000) as seen:
+        assert len(seen.filter_new(posts(["a", "b", "c"]))) == 3
+        assert seen.stats["bloom_negative"] == 3
+
+    with SeenStore(tmp_path, capacity=1000) as seen:
+        fresh = seen.filter_new(posts(["b", "c", "d"]) + posts(["d"]))
+        assert [p["id"] for p in fresh] == ["d"]
+        assert seen.stats["dropped"] == 3
+
+
+def test_edited_content_passes_and_updates_index(tmp_path):
+    with SeenStore(tmp_path) as seen:
+        seen.filter_new(posts(["a"]))
+        assert seen.filter_new(posts(["a"], title="edited")) == posts(["a"], title="edited")
+        assert seen.stats["updated"] == 1
+        assert seen.filter_new(posts(["a"], title="edited")) == []
+
+
+def test_vote_counts_do_not_change_content_hash():
+    a, b = posts(["a"])[0], dict(posts(["a"])[0], num_comments=99)
+    assert content_hash(a) == content_hash(b)
+
+
+def test_bloom_is_rebuilt_when_out_of_sync(tmp_path):
+    seen = SeenStore(tmp_path)
+    seen.filter_new(posts(["a", "b"]))
+    seen.db.close()  # crash before the filter was saved
+    with SeenStore(tmp_path) as seen:
+        assert seen.bloom.count == 2
+        assert seen.filter_new(posts(["a", "b"])) == []
+    # changing the sizing also rebuilds instead of reusing incompatible bits
+    with SeenStore(tmp_path, capacity=50, fp_rate=0.05) as seen:
+        assert "a" in seen.bloom and seen.bloom.capacity == 50
+
+
+def test_unconfirmed_records_are_not_remembered(tmp_path):
+    with SeenStore(tmp_path) as seen:
+        fresh = seen.filter_new(posts(["a", "b"]), commit=False)
+        assert seen.filter_new(posts(["a", "b"]), commit=False) == fresh
+        seen.mark_seen(fresh[:1])
+    with SeenStore(tmp_path) as seen:
+        assert seen.bloom.count == 1
+        assert [p["id"] for p in seen.filter_new(posts(["a", "b"]))] == ["b"]
+
+
+def test_scraper_drops_posts_from_earlier_runs(tmp_path):
+    config = RedditConfig(client_id="", client_secret="", dedup_dir=str(tmp_path))
+    scraper = RedditScraper(config)
+    fetched = scraper.scrape_posts(["test"])
+    assert len(fetched) == 3
+    # not processed yet (e.g. the detectors failed): still new on the next run
+    assert len(RedditScraper(config).scrape_posts(["test"])) == 3
+    scraper.mark_seen(fetched)
+    assert RedditScraper(config).scrape_posts(["test"]) == []
+    assert len(RedditScraper(RedditConfig(client_id="")).scrape_posts(["test"])) == 3
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+from agents.jules.http_client import HttpClient
+from ingestion import reddit_scraper
+from ingestion.fixture_server import FixtureServer, load_corpus, raw_from_record, synthetic_corpus
+
+
+@pytest.fixture
+def corpus():
+    return synthetic_corpus(2, 250, seed=7, now=1_700_000_000)
+
+
+def test_synthetic_corpus_is_seeded(corpus):
+    again = synthetic_corpus(2, 250, seed=7, now=1_700_000_000)
+    assert again == corpus
+    posts = corpus["synthetic000"]
+    assert [p["created_utc"] for p in posts] == sorted(
+        (p["created_utc"] for p in posts), reverse=True
+    )
+
+
+def test_pagination_matches_reddit(corpus):
+    with FixtureServer(corpus) as server:
+        client = HttpClient()
+        url = f"{server.base_url}/r/synthetic001/new.json"
+        seen, after = [], None
+        while True:
+            params = {"limit": 100}
+            if after:
+                params["after"] = after
+            data = client.get(url, params=params).json()["data"]
+            seen.extend(c["data"]["id"] for c in data["children"])
+            after = data["after"]
+            if not after:
+                break
+        assert seen == [p["id"] for p in corpus["synthetic001"]]
+        assert client.get(f"{server.base_url}/r/missing/new.json").status_code == 404
+
+
+def test_throttling_and_revalidation(corpus):
+    with FixtureServer(corpus, throttle_rate=0.5, retry_after=0, seed=3) as server:
+        client = HttpClient(max_retries=10, sleep=lambda s: None)
+        url = f"{server.base_url}/r/synthetic000/new.json"
+        for _ in range(5):
+            assert client.get(url, params={"limit": 10}).status_code == 200
+        assert server.stats["throttled"] > 0
+        assert server.stats["not_modified"] == 4
+        assert client.stats["retries"] == server.stats["throttled"]
+
+
+def test_fetch_reddit_json_against_fixture(corpus, monkeypatch):
+    with FixtureServer(corpus) as server:
+        monkeypatch.setattr(reddit_scraper, "REDDIT_BASE", server.base_url)
+        monkeypatch.setattr(reddit_scraper, "PAGE_DELAY", 0)
+        items = reddit_scraper.fetch_reddit_json("r/synthetic000", limit=230)
+    assert len(items) == 230
+    assert items[0]["subreddit"] == "r/synthetic000"
+
+
+def test_load_corpus_from_normalized_records(tmp_path):
+    rec = reddit_scraper.normalize_post(synthetic_corpus(1, 1, seed=1)["synthetic000"][0])
+    path = tmp_path / "x_threads.ndjson"
+    path.write_text(json.dumps(rec) + "\n")
+    corpus = load_corpus([str(tmp_path / "*_threads.ndjson")])
+    assert corpus["synthetic000"][0] == raw_from_record(rec)
+    assert reddit_scraper.normalize_post(corpus["synthetic000"][0])["id"] == rec["id"]
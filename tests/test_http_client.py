@@ -0,0 +1,114 @@
+import json
+import threading
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from http.server import HTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+from agents.jules.http_client import HttpClient, parse_retry_after, backoff_delay
+
+
+class FlakyHandler(BaseHTTPRequestHandler):
+    hits = []
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body=b"", headers=None):
+        self.send_response(code)
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.hits.append((self.path, self.headers.get("If-None-Match")))
+        if self.path == "/throttled" and len(self.hits) == 1:
+            return self._send(429, headers={"Retry-After": "7"})
+        if self.path == "/broken":
+            return self._send(503)
+        if self.headers.get("If-None-Match") == '"v1"':
+            return self._send(304)
+        body = json.dumps({"ok": True}).encode()
+        self._send(200, body, {"ETag": '"v1"', "Content-Type": "application/json"})
+
+    def do_POST(self):
+        self.hits.append((self.path, None))
+        self._send(500)
+
+
+@pytest.fixture
+def server():
+    FlakyHandler.hits = []
+    srv = HTTPServer(("127.0.0.1", 0), FlakyHandler)
+    thread = threading.Thread(target=srv.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{srv.server_address[1]}"
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def client():
+    sleeps = []
+    c = HttpClient(max_retries=2, sleep=sleeps.append)
+    c.sleeps = sleeps
+    yield c
+    c.close()
+
+
+def test_retry_after_is_honoured(server, client):
+    resp = client.get(f"{server}/throttled")
+    assert resp.status_code == 200
+    assert client.sleeps == [7.0]
+    assert client.stats["retries"] == 1
+
+
+def test_retries_are_bounded(server, client):
+    resp = client.get(f"{server}/broken")
+    assert resp.status_code == 503
+    assert len(FlakyHandler.hits) == 3
+    assert all(0 <= s <= client.backoff_max for s in client.sleeps)
+
+
+def test_post_is_not_retried_on_500(server, client):
+    assert client.post(f"{server}/submit", json={}).status_code == 500
+    assert len(FlakyHandler.hits) == 1
+
+
+def test_etag_revalidation_returns_cached_body(server, client):
+    first = client.get(f"{server}/listing", params={"limit": 5})
+    second = client.get(f"{server}/listing", params={"limit": 5})
+    assert FlakyHandler.hits[1][1] == '"v1"'
+    assert client.stats["not_modified"] == 1
+    assert second.json() == first.json() == {"ok": True}
+
+
+def test_validators_persist_and_respect_credentials(server, client, tmp_path):
+    url = f"{server}/listing"
+    client.get(url)
+    client.save_validators(tmp_path / "validators.json")
+
+    fresh = HttpClient(max_retries=0)
+    assert fresh.load_validators(tmp_path / "validators.json") == 1
+    assert fresh.get(url).json() == {"ok": True}
+    assert fresh.stats["not_modified"] == 1
+    # another user's credentials must not revalidate against this response
+    fresh.get(url, headers={"Authorization": "Bearer other"})
+    assert FlakyHandler.hits[-1] == ("/listing", None)
+    fresh.close()
+
+
+def test_parse_retry_after_http_date():
+    now = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    value = format_datetime(now + timedelta(seconds=30), usegmt=True)
+    assert parse_retry_after(value, now=now) == 30.0
+    assert parse_retry_after("garbage") is None
+    assert parse_retry_after(None) is None
+
+
+def test_backoff_delay_is_capped():
+    for attempt in range(10):
+        assert 0 <= backoff_delay(attempt, 0.5, 4.0) <= 4.0
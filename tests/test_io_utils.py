@@ -0,0 +1,108 @@
+import hashlib
+import json
+import queue
+import random
+import threading
+import time
+
+import pytest
+
+from agents.jules import io_utils
+from agents.jules.io_utils import BackgroundWriter, iter_canonical_json, sha256_hex_of_obj
+
+
+def reference(obj):
+    s = json.dumps(obj, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(s.encode("utf-8")).hexdigest()
+
+
+def random_obj(rng, depth=0):
+    if depth > 3 or rng.random() < 0.6:
+        return rng.choice(
+            [0, -7, 2**70, 1.5, float("nan"), float("inf"), True, False, None, "", "a"]
+            + ['héllo ☃ 😀 \n"\\', "x" * rng.randint(0, 40), "😀" * 9]
+        )
+    if rng.random() < 0.5:
+        return [random_obj(rng, depth + 1) for _ in range(rng.randint(0, 12 if depth else 60))]
+    keys = ["a", "b", "é", "zzzzzz", "😀"]
+    return {
+        rng.choice(keys) + str(rng.randint(0, 5)): random_obj(rng, depth + 1)
+        for _ in range(rng.randint(0, 8))
+    }
+
+
+@pytest.mark.parametrize("tiny", [False, True])
+def test_streaming_hash_matches_materialized_json(monkeypatch, tiny):
+    if tiny:
+        # force every code path: sliced strings, single-member groups, many hash updates
+        monkeypatch.setattr(io_utils, "STR_CHUNK", 5)
+        monkeypatch.setattr(io_utils, "GROUP_SIZE", 2)
+        monkeypatch.setattr(io_utils, "HASH_BUFFER", 16)
+    rng = random.Random(0)
+    for _ in range(500):
+        obj = random_obj(rng)
+        assert "".join(iter_canonical_json(obj)) == json.dumps(
+            obj, sort_keys=True, separators=(",", ":")
+        )
+        assert sha256_hex_of_obj(obj) == reference(obj)
+
+
+def test_non_string_keys_and_tuples():
+    for obj in ({1: "a", 2: [1]}, {1.5: {"x": 1}}, {False: [], True: [1]}, (1, [2, (3,)])):
+        assert sha256_hex_of_obj(obj) == reference(obj)
+
+
+def test_large_payloads_match():
+    blob = {"html": "<p>é ☃ 😀</p>" * 50_000, "evidence": [{"i": i} for i in range(5000)]}
+    assert sha256_hex_of_obj(blob) == reference(blob)
+
+
+def test_errors_match_json():
+    loop = []
+    loop.append(loop)
+    with pytest.raises(ValueError):
+        sha256_hex_of_obj({"x": [loop] * 40})
+    with pytest.raises(TypeError):
+        sha256_hex_of_obj({"x": [object()] * 40})
+
+
+def test_background_writer_batches_and_drains_on_close():
+    written = []
+    writer = BackgroundWriter(lambda items: written.append(list(items)), batch_size=10)
+    for i in range(95):
+        writer.submit(i)
+    writer.flush()
+    assert [x for batch in written for x in batch] == list(range(95))
+    assert all(len(batch) <= 10 for batch in written)
+    for i in range(95, 100):
+        writer.submit(i)
+    writer.close()
+    assert sum(len(batch) for batch in written) == 100
+    assert writer.stats["written"] == 100
+    with pytest.raises(RuntimeError):
+        writer.submit(1)
+
+
+def test_background_writer_applies_backpressure():
+    gate = threading.Event()
+    writer = BackgroundWriter(lambda items: gate.wait(), maxsize=2, batch_size=1)
+    writer.submit(0)  # taken by the writer thread, which then blocks
+    time.sleep(0.05)
+    writer.submit(1)
+    writer.submit(2)
+    with pytest.raises(queue.Full):
+        writer.submit(3, timeout=0.05)
+    assert writer.stats["blocked"] == 1
+    gate.set()
+    writer.close()
+
+
+def test_background_writer_reraises_write_errors():
+    def fail(items):
+        raise OSError("disk gone")
+
+    writer = BackgroundWriter(fail)
+    writer.submit(1)
+    with pytest.raises(OSError):
+        writer.flush()
+    writer.close()
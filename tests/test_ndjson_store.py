@@ -0,0 +1,81 @@
+import gzip
+import json
+
+import pytest
+
+from ingestion.ndjson_store import SegmentWriter, iter_records
+
+
+class Clock:
+    def __init__(self, day="20250101"):
+        self.day = day
+
+    def __call__(self):
+        return self.day
+
+
+def records(n, start=0):
+    return [{"id": f"r{i}", "title": "t" * 50} for i in range(start, start + n)]
+
+
+def test_append_across_runs_without_rewriting(tmp_path):
+    with SegmentWriter(tmp_path, "sub_threads", clock=Clock()) as w:
+        w.write_many(records(3))
+        first = w.path
+    size = first.stat().st_size
+    with SegmentWriter(tmp_path, "sub_threads", clock=Clock()) as w:
+        w.write_many(records(2, start=3))
+    assert w.path == first
+    assert first.stat().st_size > size
+    assert [r["id"] for r in iter_records(first)] == ["r0", "r1", "r2", "r3", "r4"]
+    # each run is its own gzip member, readable by plain gzip too
+    assert len(gzip.decompress(first.read_bytes()).splitlines()) == 5
+
+
+def test_rotates_by_size_and_day(tmp_path):
+    clock = Clock()
+    w = SegmentWriter(tmp_path, "sub_threads", compression=None, max_bytes=200, clock=clock)
+    w.write_many(records(6))
+    clock.day = "20250102"
+    w.write(records(1, start=6)[0])
+    w.close()
+    names = sorted(p.name for p in tmp_path.iterdir())
+    assert names[0] == "sub_threads.20250101-0000.ndjson"
+    assert names[-1] == "sub_threads.20250102-0000.ndjson"
+    assert len(names) > 2
+    assert w.segments_closed == len(names)
+    assert [r["id"] for r in iter_records(str(tmp_path / "sub_threads.*ndjson*"))] == [
+        f"r{i}" for i in range(7)
+    ]
+
+
+def test_reader_mixes_legacy_and_segments(tmp_path):
+    (tmp_path / "sub_threads.ndjson").write_text(json.dumps({"id": "legacy"}) + "\n")
+    with SegmentWriter(tmp_path, "sub_threads", clock=Clock()) as w:
+        w.write({"id": "new"})
+    with SegmentWriter(tmp_path, "sub_threads_extra", clock=Clock()) as w:
+        w.write({"id": "other stream"})
+    ids = {r["id"] for r in iter_records(str(tmp_path / "sub_threads.*ndjson*"))}
+    assert ids == {"legacy", "new"}
+
+
+def test_truncated_segment_keeps_flushed_records(tmp_path):
+    w = SegmentWriter(tmp_path, "sub_threads", clock=Clock())
+    w.write_many(records(4))
+    w.flush()
+    path = w.path
+    w._raw.close()  # simulate a crash: the gzip trailer is never written
+    assert [r["id"] for r in iter_records(path)] == ["r0", "r1", "r2", "r3"]
+
+
+def test_zstd_roundtrip(tmp_path):
+    pytest.importorskip("zstandard")
+    for _ in range(2):
+        with SegmentWriter(tmp_path, "sub_threads", compression="zstd", clock=Clock()) as w:
+            w.write_many(records(2))
+    assert len(list(iter_records(str(tmp_path / "sub_threads.*ndjson*")))) == 4
+
+
+def test_unknown_compression_is_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        SegmentWriter(tmp_path, "sub_threads", compression="lz4")
@@ -1,17 +1,19 @@
 import json
 import jsonschema
+from agents import provenance
 from agents.provenance import emitevent
 import pytest
 from unittest.mock import patch
 
 
-def test_emitevent_schema():
+def test_emitevent_schema(tmp_path, monkeypatch):
     """
     Tests that the emitevent function produces a schema-compliant event.
     """
     with open(".github/PROVENANCE_SCHEMA.json") as f:
         schema = json.load(f)
 
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(tmp_path))
     provenance_bundle = []
 
     def mock_atomic_write_json(path, data):
@@ -26,3 +28,55 @@ def test_emitevent_schema():
 
     assert len(provenance_bundle) == 1
     jsonschema.validate(instance=provenance_bundle[0], schema=schema)
+
+
+@pytest.fixture
+def batched(tmp_path, monkeypatch):
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(tmp_path))
+    emitter = provenance.configure("batched", batch_size=3)
+    yield emitter
+    provenance.configure("files")
+
+
+def test_batched_emitter_groups_events_into_segments(batched, tmp_path):
+    events = [emitevent("m", "e", {"i": i}, inputhash=f"h{i}") for i in range(7)]
+    assert batched.stats == {"events": 6, "batches": 2}
+    provenance.flush()
+    assert batched.stats == {"events": 7, "batches": 3}
+
+    assert not list(tmp_path.glob("*-bundle.json"))
+    segments = list(tmp_path.glob("events.*.ndjson"))
+    assert len(segments) == 1
+    stored = list(provenance.iter_events(str(tmp_path)))
+    assert stored == events
+    assert stored[3]["outputhash"] == provenance.sha256_hex_of_obj({"i": 3})
+
+
+def test_batched_emitter_skips_torn_tail(batched, tmp_path):
+    emitevent("m", "e", {"i": 0})
+    provenance.flush()
+    segment = next(tmp_path.glob("events.*.ndjson"))
+    with open(segment, "a") as f:
+        f.write('{"module": "m", "torn')
+    emitevent("m", "e", {"i": 1})
+    provenance.flush()
+    assert [e["payload"]["i"] for e in provenance.iter_events(str(tmp_path))] == [0, 1]
+
+
+def test_configure_rejects_unknown_mode():
+    with pytest.raises(ValueError):
+        provenance.configure("carrier-pigeon")
+
+
+def test_async_mode_writes_on_background_thread(tmp_path, monkeypatch):
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(tmp_path))
+    emitter = provenance.configure("async", batch_size=4)
+    try:
+        events = [emitevent("m", "e", {"i": i}) for i in range(10)]
+        assert all(e["provenancetoken"] for e in events)
+        provenance.flush()
+        assert list(provenance.iter_events(str(tmp_path))) == events
+        assert emitter._writer.stats["written"] == 10
+    finally:
+        provenance.configure("files")
+    assert not emitter._writer._thread.is_alive()
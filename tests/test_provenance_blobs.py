@@ -0,0 +1,93 @@
+import json
+import os
+
+import pytest
+
+from agents import provenance
+from agents.provenance import emitevent, iter_events
+from agents.provenance_blobs import BlobStore, blob_dir, blob_ref, report
+from agents.provenance_chain import verify_all
+from agents.provenance_pack import compact, resolve
+
+
+@pytest.fixture
+def prov_dir(tmp_path, monkeypatch):
+    d = tmp_path / "PROVENANCE"
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(d))
+    monkeypatch.setattr("agents.provenance.CHAIN_ENABLED", True)
+    provenance.set_blobs()
+    yield str(d)
+    provenance.set_blobs(False)
+    provenance.configure("files")
+    provenance.set_index(None)
+    provenance._chain = None
+
+
+def _evidence():
+    return {"claim": "c", "evidence": [{"url": f"https://example.org/{j}"} for j in range(40)]}
+
+
+def test_identical_payloads_are_stored_once(prov_dir):
+    events = [emitevent("m", "evidence", _evidence(), inputhash=f"q{i}") for i in range(10)]
+
+    assert len({e["outputhash"] for e in events}) == 1
+    assert sum(len(files) for _, _, files in os.walk(blob_dir(prov_dir))) == 1
+    with open(os.path.join(prov_dir, f"{events[0]['provenancetoken']}-bundle.json")) as f:
+        stored = json.load(f)
+    assert blob_ref(stored["payload"]) == events[0]["outputhash"]
+    assert events[0]["payload"] == _evidence()
+
+    summary = report(prov_dir)
+    assert summary["references"] == 10 and summary["blobs"] == 1
+    assert summary["saved_bytes"] == 9 * summary["stored_bytes"]
+    assert summary["missing_blobs"] == []
+
+
+def test_readers_resolve_references(prov_dir, tmp_path):
+    store = provenance.set_index(str(tmp_path / "index.sqlite"))
+    events = [emitevent("m", "e", {"i": i % 3}) for i in range(6)]
+
+    assert sorted(iter_events(prov_dir), key=lambda e: e["chainseq"]) == events
+    assert store.get(events[4]["provenancetoken"]) == events[4]
+    assert store.find(outputhash=events[1]["outputhash"]) == [events[1], events[4]]
+    compact(prov_dir)
+    assert all(resolve(e["provenancetoken"], prov_dir) == e for e in events)
+    assert verify_all(prov_dir)["ok"]
+
+    assert store.reindex(prov_dir) == 6
+    assert store.get(events[0]["provenancetoken"]) == events[0]
+    store.close()
+
+
+def test_batched_segments_reference_blobs(prov_dir):
+    provenance.configure("batched", batch_size=4)
+    events = [emitevent("m", "e", {"text": "same"}) for _ in range(5)]
+    provenance.flush()
+
+    raw = list(iter_events(prov_dir, resolve_blobs=False))
+    assert all(blob_ref(e["payload"]) for e in raw)
+    assert list(iter_events(prov_dir)) == events
+
+
+def test_blob_store_verifies_content(tmp_path):
+    store = BlobStore(str(tmp_path / "blobs"))
+    digest = store.put({"a": 1})
+    assert store.put({"a": 1}) == digest
+    assert store.stats["written"] == 1 and store.stats["refs"] == 2
+    assert store.get(digest) == {"a": 1}
+
+    with open(store.path(digest), "w") as f:
+        f.write('{"a":2}')
+    with pytest.raises(ValueError):
+        store.get(digest)
+
+
+def test_inline_payloads_pass_through(prov_dir):
+    event = emitevent("m", "e", {"$blob": 1, "x": 2})
+    provenance.set_blobs(False)
+    plain = emitevent("m", "e", {"x": 1})
+    assert {e["provenancetoken"] for e in iter_events(prov_dir)} == {
+        event["provenancetoken"],
+        plain["provenancetoken"],
+    }
+    assert report(prov_dir)["references"] == 1
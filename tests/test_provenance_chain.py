@@ -0,0 +1,157 @@
+import json
+import os
+import threading
+import time
+
+import jsonschema
+import pytest
+
+from agents import provenance, provenance_chain
+from agents.provenance import emitevent
+from agents.provenance_chain import (
+    chain_dir,
+    chained_events,
+    load_checkpoints,
+    merkle_proof,
+    merkle_root,
+    prove,
+    verify_all,
+    verify_chain,
+    verify_inclusion,
+    verify_proof,
+    verify_range,
+)
+
+
+@pytest.fixture
+def prov_dir(tmp_path, monkeypatch):
+    d = tmp_path / "PROVENANCE"
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(d))
+    monkeypatch.setattr("agents.provenance.CHAIN_ENABLED", True)
+    yield str(d)
+    provenance.configure("files")
+    provenance.flush()
+    provenance._chain = None
+
+
+def test_merkle_proofs_for_every_leaf_and_size():
+    for n in range(1, 18):
+        leaves = [f"{i:064x}" for i in range(n)]
+        root = merkle_root(leaves)
+        for i in range(n):
+            proof = merkle_proof(leaves, i)
+            assert len(proof) <= n.bit_length()
+            assert verify_proof(leaves[i], proof, root)
+            assert not verify_proof(f"{n + 1:064x}", proof, root)
+
+
+def test_events_are_linked_and_survive_restart(prov_dir):
+    first = [emitevent("m", "e", {"i": i}) for i in range(3)]
+    assert first[0]["prevchainhash"] == provenance_chain.GENESIS
+    assert [e["chainseq"] for e in first] == [0, 1, 2]
+    assert first[1]["prevchainhash"] == first[0]["chainhash"]
+
+    provenance._chain = None  # as in a new process
+    later = emitevent("m", "e", {"i": 3})
+    assert later["chainseq"] == 3
+    assert later["prevchainhash"] == first[-1]["chainhash"]
+
+    provenance.flush()
+    report = verify_all(prov_dir)
+    assert report["ok"] and report["events"] == 4
+
+
+def test_tampering_and_truncation_are_detected(prov_dir, tmp_path):
+    provenance.configure("batched", batch_size=4)
+    events = [emitevent("m", "e", {"i": i}) for i in range(10)]
+    provenance.flush()
+    assert verify_all(prov_dir)["ok"]
+
+    tampered = [dict(e) for e in events]
+    tampered[5]["module"] = "other"
+    assert verify_chain(tampered) == 5
+    assert verify_chain(events[:4] + events[5:]) == 4
+
+    segment = next((tmp_path / "PROVENANCE").glob("events.*.ndjson"))
+    lines = segment.read_text().splitlines(keepends=True)
+    segment.write_text("".join(lines[:-1]))
+    report = verify_all(prov_dir)
+    assert not report["ok"]
+    assert report["head_matches"] is False
+    assert report["bad_checkpoints"] == [8]
+
+
+def test_checkpoints_give_log_size_inclusion_proofs(prov_dir):
+    provenance.configure("batched", batch_size=8)
+    [emitevent("m", "e", {"i": i}) for i in range(20)]
+    provenance.flush()
+    checkpoints = load_checkpoints(chain_dir(prov_dir))
+    assert [(c["first_seq"], c["last_seq"]) for c in checkpoints] == [(0, 7), (8, 15), (16, 19)]
+
+    events = chained_events(prov_dir)
+    cp = checkpoints[1]
+    span = events[8:16]
+    proof_a = prove(events[9], cp, span)
+    proof_b = prove(events[14], cp, span)
+    assert len(proof_a["proof"]) == 3
+    assert verify_inclusion(events[9], proof_a, checkpoints)
+    assert verify_range(events[9:15], proof_a, proof_b, checkpoints)
+
+    forged = dict(events[9], eventtype="forged")
+    assert not verify_inclusion(forged, proof_a, checkpoints)
+    assert not verify_range([forged] + events[10:15], proof_a, proof_b, checkpoints)
+
+
+def test_chained_bundles_still_match_schema(prov_dir):
+    with open(".github/PROVENANCE_SCHEMA.json") as f:
+        schema = json.load(f)
+    event = emitevent("m", "e", {"x": 1})
+    jsonschema.validate(instance=event, schema=schema)
+
+
+def test_files_mode_persists_head_on_flush_and_recovers_after_crash(prov_dir):
+    head = f"{chain_dir(prov_dir)}/head.json"
+    [emitevent("m", "e", {"i": i}) for i in range(3)]
+    assert not os.path.exists(head)
+    provenance.flush()
+    with open(head) as f:
+        assert json.load(f)["chainseq"] == 2
+
+    written = [emitevent("m", "e", {"i": i}) for i in range(3, 5)]
+    provenance._chain = None  # crash before the head was persisted again
+    later = emitevent("m", "e", {"i": 5})
+    assert later["chainseq"] == 5
+    assert later["prevchainhash"] == written[-1]["chainhash"]
+
+    provenance.flush()
+    report = verify_all(prov_dir)
+    assert report["ok"] and report["events"] == 6
+
+
+def test_concurrent_emitters_write_in_chain_order(prov_dir, tmp_path, monkeypatch):
+    provenance.configure("async", batch_size=16)
+    link = provenance_chain.Chain.link
+
+    def slow_link(self, event):
+        link(self, event)
+        time.sleep(0.001 * (event["chainseq"] % 2))  # let another thread overtake
+        return event
+
+    monkeypatch.setattr(provenance_chain.Chain, "link", slow_link)
+
+    def emit_many(worker):
+        for i in range(100):
+            emitevent("m", "e", {"worker": worker, "i": i})
+
+    threads = [threading.Thread(target=emit_many, args=(w,)) for w in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    provenance.flush()
+
+    lines = []
+    for segment in sorted((tmp_path / "PROVENANCE").glob("events.*.ndjson")):
+        lines += [json.loads(line) for line in segment.read_text().splitlines()]
+    assert [e["chainseq"] for e in lines] == list(range(400))
+    assert verify_all(prov_dir)["ok"]
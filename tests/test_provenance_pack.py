@@ -0,0 +1,63 @@
+import json
+
+import jsonschema
+import pytest
+
+from agents import provenance
+from agents.provenance import emitevent, iter_events
+from agents.provenance_pack import PackReader, compact, pack_indexes, resolve
+
+
+@pytest.fixture
+def prov_dir(tmp_path, monkeypatch):
+    d = tmp_path / "PROVENANCE"
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(d))
+    monkeypatch.setattr("agents.provenance.CHAIN_ENABLED", True)
+    yield str(d)
+    provenance.flush()
+    provenance._chain = None
+
+
+def test_compact_rolls_loose_bundles_into_a_pack(prov_dir, tmp_path):
+    events = [emitevent("m", "e", {"i": i, "text": "x" * i}) for i in range(50)]
+    summary = compact(prov_dir)
+
+    assert summary["packed"] == 50
+    assert summary["pack_bytes"] < summary["loose_bytes"] * 0.7
+    assert not list((tmp_path / "PROVENANCE").glob("*-bundle.json"))
+    for e in events:
+        assert resolve(e["provenancetoken"], prov_dir) == e
+    assert resolve("no-such-token", prov_dir) is None
+    assert sorted(iter_events(prov_dir), key=lambda e: e["chainseq"]) == events
+
+
+def test_resolver_prefers_loose_then_newest_packs(prov_dir):
+    first = [emitevent("m", "e", {"i": i}) for i in range(5)]
+    compact(prov_dir)
+    second = [emitevent("m", "e", {"i": i}) for i in range(5, 8)]
+    assert all(resolve(e["provenancetoken"], prov_dir) == e for e in first + second)
+
+    compact(prov_dir, keep_loose=True)
+    assert len(pack_indexes(prov_dir)) == 2
+    assert len(list(iter_events(prov_dir))) == 8
+    with PackReader(pack_indexes(prov_dir)[-1]) as reader:
+        assert len(reader) == 3
+        tokens = [e["provenancetoken"] for e in reader]
+        assert tokens == sorted(tokens)
+
+
+def test_compacted_events_remain_schema_compliant(prov_dir):
+    with open(".github/PROVENANCE_SCHEMA.json") as f:
+        schema = json.load(f)
+    emitevent("test_module", "test_event", {"foo": "bar"}, commitsha="deadbeef", inputhash="abc")
+    emitevent("test_module", "test_event", {"nested": {"list": [1, 2, 3]}})
+    compact(prov_dir)
+    packed = list(iter_events(prov_dir))
+    assert len(packed) == 2
+    for event in packed:
+        jsonschema.validate(instance=event, schema=schema)
+
+
+def test_compact_without_loose_files_is_a_no_op(prov_dir):
+    assert compact(prov_dir)["packed"] == 0
+    assert pack_indexes(prov_dir) == []
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from agents import provenance
+from agents.provenance import emitevent
+from agents.provenance_store import ProvenanceStore
+
+
+@pytest.fixture
+def prov_dir(tmp_path, monkeypatch):
+    d = tmp_path / "PROVENANCE"
+    monkeypatch.setattr("agents.provenance.PROV_DIR", str(d))
+    store = provenance.set_index(str(tmp_path / "index.sqlite"))
+    yield d
+    provenance.set_index(None)
+    provenance.configure("files")
+    store.close()
+
+
+def test_emitted_events_are_indexed(prov_dir):
+    a = emitevent("expander", "saved", {"n": 1}, inputhash="in1")
+    b = emitevent("pipeline", "audit", {"n": 2}, inputhash="in1")
+    emitevent("pipeline", "audit", {"n": 3}, inputhash="in2")
+    store = provenance._index
+
+    assert store.get(a["provenancetoken"]) == a
+    assert store.get("missing") is None
+    assert [e["provenancetoken"] for e in store.find(inputhash="in1")] == [
+        a["provenancetoken"],
+        b["provenancetoken"],
+    ]
+    assert store.count(module="pipeline") == 2
+    assert store.find(outputhash=b["outputhash"]) == [b]
+    assert store.count(module="pipeline", since=b["timestampiso"]) == 2
+    assert store.count(until=a["timestampiso"]) == 0
+
+
+def test_batched_events_are_indexed_on_flush(prov_dir):
+    provenance.configure("batched", batch_size=10)
+    e = emitevent("m", "e", {"x": 1}, inputhash="h")
+    assert provenance._index.get(e["provenancetoken"]) is None
+    provenance.flush()
+    assert provenance._index.get(e["provenancetoken"]) == e
+
+
+def test_lookups_use_indexes(tmp_path):
+    with ProvenanceStore(str(tmp_path / "i.sqlite")) as store:
+        for filters in ({"inputhash": "h"}, {"module": "m", "since": "2024"}, {"eventtype": "e"}):
+            assert "USING INDEX" in store.explain(**filters)
+
+
+def test_reindex_rebuilds_from_files(prov_dir, tmp_path):
+    events = [emitevent("m", "e", {"i": i}, inputhash=f"h{i}") for i in range(3)]
+    provenance.configure("batched", batch_size=2)
+    events += [emitevent("m", "e", {"i": i}) for i in range(3, 6)]
+    provenance.flush()
+
+    with ProvenanceStore(str(tmp_path / "fresh.sqlite")) as store:
+        assert store.reindex(str(prov_dir)) == 6
+        assert store.count() == 6
+        for e in events:
+            assert store.get(e["provenancetoken"]) == e
+
+
+def test_reindex_batches_audit_log_entries(tmp_path, monkeypatch):
+    log_dir = tmp_path / "logs"
+    log_dir.mkdir()
+    lines = [
+        json.dumps({"post_id": f"p{i}", "timestamp": "2024-05-01T00:00:00+00:00"}) for i in range(5)
+    ]
+    (log_dir / "audit_20240501.jsonl").write_text("\n".join(lines) + "\n")
+    monkeypatch.setattr("agents.provenance_store.REINDEX_BATCH", 2)
+
+    with ProvenanceStore(str(tmp_path / "index.sqlite")) as store:
+        sizes = []
+        add_many = store.add_many
+
+        def counting_add_many(events, **kwargs):
+            sizes.append(len(events))
+            return add_many(events, **kwargs)
+
+        monkeypatch.setattr(store, "add_many", counting_add_many)
+        assert store.reindex(str(tmp_path / "PROVENANCE"), audit_log_dir=str(log_dir)) == 5
+        assert sizes == [0, 2, 2, 1]
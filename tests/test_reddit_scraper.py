@@ -0,0 +1,175 @@
+import json
+import time
+from unittest.mock import patch
+
+import pytest
+
+from ingestion import reddit_scraper
+from ingestion.ndjson_store import iter_records
+from ingestion.reddit_scraper import (
+    fetch_reddit_json,
+    high_water_mark,
+    ingest_from_config,
+    walk_listing,
+)
+
+
+class FakeResp:
+    def __init__(self, payload):
+        self._payload = payload
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self._payload
+
+
+def make_listing(posts):
+    """Build fake new.json pages of two posts each, chained with `after` cursors."""
+    pages = {}
+    cursor = None
+    for i in range(0, len(posts), 2):
+        chunk = posts[i : i + 2]
+        nxt = f"t3_{chunk[-1]['id']}" if i + 2 < len(posts) else None
+        pages[cursor] = {
+            "data": {
+                "after": nxt,
+                "children": [
+                    {"kind": "t3", "data": dict(p, name=f"t3_{p['id']}", subreddit="test")}
+                    for p in chunk
+                ],
+            }
+        }
+        cursor = nxt
+    return pages
+
+
+def serve(posts, calls):
+    pages = make_listing(posts)
+
+    class FakeClient:
+        def get(self, url, headers=None, params=None, timeout=None):
+            calls.append(dict(params))
+            return FakeResp(pages[params.get("after")])
+
+        def load_validators(self, path):
+            return 0
+
+        def save_validators(self, path):
+            pass
+
+    return patch("ingestion.reddit_scraper.get_client", return_value=FakeClient())
+
+
+@pytest.fixture
+def listing():
+    now = int(time.time())
+    posts = [
+        {"id": f"p{i}", "title": f"post {i}", "author": "a", "created_utc": now - i * 36000}
+        for i in range(6)
+    ]
+    calls = []
+    with serve(posts, calls), patch("ingestion.reddit_scraper.time.sleep"):
+        yield posts, calls
+
+
+def test_fetch_paginates_up_to_limit(listing):
+    posts, calls = listing
+    items = fetch_reddit_json("r/test", limit=5)
+    assert [it["id"] for it in items] == ["p0", "p1", "p2", "p3", "p4"]
+    assert [c.get("after") for c in calls] == [None, "t3_p1", "t3_p3"]
+
+
+def test_fetch_stops_at_lookback_window(listing):
+    posts, calls = listing
+    items = fetch_reddit_json("r/test", limit=100, lookback_days=1)
+    assert [it["id"] for it in items] == ["p0", "p1", "p2"]
+
+
+def test_fetch_stops_at_high_water_mark(listing):
+    posts, calls = listing
+    since = {"fullname": "t3_p3", "created_utc": posts[3]["created_utc"]}
+    items = fetch_reddit_json("r/test", limit=100, since=since)
+    assert [it["id"] for it in items] == ["p0", "p1", "p2"]
+
+
+def test_high_water_mark_keeps_newest():
+    mark = high_water_mark([{"id": "a", "created_utc": 5}, {"id": "b", "created_utc": 9}])
+    assert mark == {"fullname": "t3_b", "created_utc": 9, "boundary_ids": ["b"]}
+    assert high_water_mark([], mark) == mark
+    assert high_water_mark([{"id": "c", "created_utc": 9}], mark)["boundary_ids"] == ["b", "c"]
+
+
+def test_posts_in_the_mark_second_are_not_skipped(listing):
+    posts, calls = listing
+    since = high_water_mark([{"id": "p3", "created_utc": posts[3]["created_utc"]}])
+    # p2b arrived after the previous run, in the same second as the mark
+    same_second = dict(posts[3], id="p2b")
+    with serve(posts[:3] + [same_second] + posts[3:], calls):
+        items = fetch_reddit_json("r/test", limit=100, since=since)
+    assert [it["id"] for it in items] == ["p0", "p1", "p2", "p2b"]
+
+
+def test_walk_hitting_its_limit_resumes_down_to_the_mark(listing):
+    posts, calls = listing
+    since = high_water_mark([{"id": "p5", "created_utc": posts[5]["created_utc"]}])
+
+    items, mark = walk_listing("r/test", limit=2, since=since)
+    assert [it["id"] for it in items] == ["p0", "p1"]
+    assert mark["fullname"] == "t3_p5"
+    assert mark["resume"] == {"after": "t3_p1", "mark": high_water_mark(items)}
+
+    items, mark = walk_listing("r/test", limit=2, since=mark)
+    assert [it["id"] for it in items] == ["p2", "p3"]
+    items, mark = walk_listing("r/test", limit=2, since=mark)
+    assert [it["id"] for it in items] == ["p4"]
+    assert mark == high_water_mark([posts[0]])
+
+
+def test_ingest_appends_only_new_posts(tmp_path, monkeypatch, listing):
+    posts, calls = listing
+    monkeypatch.setattr(reddit_scraper, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(reddit_scraper, "STATE_PATH", tmp_path / "ingest_state.json")
+    cfg = tmp_path / "subs.json"
+    cfg.write_text(json.dumps({"targets": ["r/test"], "threadspersubreddit": 3}))
+
+    ingest_from_config(str(cfg))
+    state = json.loads((tmp_path / "ingest_state.json").read_text())
+    assert state["r/test"]["fullname"] == "t3_p0"
+
+    ingest_from_config(str(cfg))
+    records = list(iter_records(str(tmp_path / "test_threads.*ndjson*")))
+    assert [r["id"] for r in records] == ["p0", "p1", "p2"]
+
+
+def test_ingest_drops_posts_seen_in_earlier_runs(tmp_path, monkeypatch, listing):
+    monkeypatch.setattr(reddit_scraper, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(reddit_scraper, "STATE_PATH", tmp_path / "ingest_state.json")
+    cfg = tmp_path / "subs.json"
+    cfg.write_text(json.dumps({"targets": ["r/test"], "threadspersubreddit": 4}))
+
+    ingest_from_config(str(cfg))
+    # losing the high-water mark makes the next run refetch the same window
+    (tmp_path / "ingest_state.json").unlink()
+    out = ingest_from_config(str(cfg))
+    assert out["r/test"] == []
+    records = list(iter_records(str(tmp_path / "test_threads.*ndjson*")))
+    assert len(records) == 4
+
+
+def test_failed_write_does_not_mark_posts_seen(tmp_path, monkeypatch, listing):
+    monkeypatch.setattr(reddit_scraper, "DATA_DIR", tmp_path)
+    monkeypatch.setattr(reddit_scraper, "STATE_PATH", tmp_path / "ingest_state.json")
+    cfg = tmp_path / "subs.json"
+    cfg.write_text(json.dumps({"targets": ["r/test"], "threadspersubreddit": 4}))
+    open_segments = reddit_scraper.open_segments
+
+    def broken(*args, **kwargs):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(reddit_scraper, "open_segments", broken)
+    ingest_from_config(str(cfg))
+    monkeypatch.setattr(reddit_scraper, "open_segments", open_segments)
+    out = ingest_from_config(str(cfg))
+    assert len(out["r/test"]) == 4
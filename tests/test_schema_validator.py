@@ -0,0 +1,98 @@
+import json
+
+import pytest
+
+from agents.jules import schema_validator
+from agents.jules.schema_validator import SchemaValidationError, validate_event_or_raise
+
+
+def event(**overrides):
+    e = {
+        "module": "m",
+        "eventtype": "e",
+        "timestampiso": "2024-01-01T00:00:00+00:00",
+        "payload": {},
+        "commitsha": "",
+        "inputhash": "",
+        "outputhash": "h",
+        "provenancetoken": "t",
+    }
+    e.update(overrides)
+    return e
+
+
+@pytest.fixture
+def custom_schema(tmp_path, monkeypatch):
+    def use(schema):
+        path = tmp_path / "schema.json"
+        path.write_text(json.dumps(schema))
+        monkeypatch.setenv("LLM_ECHO_PROVENANCE_SCHEMA", str(path))
+        schema_validator.reset_cache()
+
+    yield use
+    monkeypatch.delenv("LLM_ECHO_PROVENANCE_SCHEMA")
+    schema_validator.reset_cache()
+
+
+def test_schema_found_independent_of_cwd(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    schema_validator.reset_cache()
+    assert validate_event_or_raise(event())
+    assert schema_validator.load_schema()["title"] == "Provenance Event"
+
+
+def test_packaged_schema_matches_repo_copy():
+    with open(".github/PROVENANCE_SCHEMA.json") as f:
+        assert json.load(f) == json.loads(schema_validator._packaged_schema())
+
+
+def test_validator_is_built_once():
+    schema_validator.reset_cache()
+    for _ in range(3):
+        validate_event_or_raise(event(), full=True)
+    assert schema_validator.get_validator.cache_info().misses == 1
+
+
+def test_fast_path_and_full_validation_agree():
+    bad = [
+        event(payload=[]),
+        event(module=3),
+        event(outputhash=None),
+        {k: v for k, v in event().items() if k != "provenancetoken"},
+        "not an event",
+    ]
+    for e in bad:
+        with pytest.raises(SchemaValidationError):
+            validate_event_or_raise(e)
+        with pytest.raises(SchemaValidationError):
+            validate_event_or_raise(e, full=True)
+    assert validate_event_or_raise(event(extra=1))
+    assert validate_event_or_raise(event(extra=1), full=True)
+
+
+def test_error_message_names_the_field():
+    with pytest.raises(SchemaValidationError, match="payload"):
+        validate_event_or_raise(event(payload="x"))
+
+
+def test_sampling_sends_fast_passes_to_full_validator(monkeypatch):
+    calls = []
+    real = schema_validator.get_validator
+
+    def spy():
+        calls.append(1)
+        return real()
+
+    monkeypatch.setattr(schema_validator, "get_validator", spy)
+    validate_event_or_raise(event())
+    assert calls == []
+    monkeypatch.setattr(schema_validator, "SAMPLE_RATE", 1.0)
+    validate_event_or_raise(event())
+    assert calls == [1]
+
+
+def test_rich_schema_disables_fast_path(custom_schema):
+    custom_schema({"type": "object", "properties": {"module": {"type": "string", "minLength": 2}}})
+    assert schema_validator.fast_checks() is None
+    with pytest.raises(SchemaValidationError):
+        validate_event_or_raise(event(module="m"))
@@ -0,0 +1,117 @@
+import hashlib
+import sys
+import time
+from collections import Counter
+
+import pytest
+
+from ingestion.fixture_server import load_corpus
+from ingestion import synthetic
+from ingestion.ndjson_store import iter_records
+from ingestion.synthetic import HALLUCINATION_KEYWORDS, SyntheticConfig, generate, write_corpus
+from jules.core.config import RedditConfig
+from jules.scrapers.reddit_scraper import RedditScraper
+
+CFG = dict(posts=2000, subreddits=5, seed=7, start_utc=1_700_000_000, days=10)
+
+
+def test_same_seed_same_corpus():
+    a = list(generate(SyntheticConfig(**CFG)))
+    b = list(generate(SyntheticConfig(**CFG)))
+    c = list(generate(SyntheticConfig(**{**CFG, "seed": 8})))
+    assert a == b
+    assert a != c
+
+
+def test_written_corpus_is_byte_identical(tmp_path):
+    def digest(out_dir):
+        write_corpus(out_dir, SyntheticConfig(posts=300, subreddits=3, seed=1))
+        h = hashlib.sha256()
+        for path in sorted(out_dir.iterdir()):
+            h.update(path.name.encode() + path.read_bytes())
+        return h.hexdigest()
+
+    first = digest(tmp_path / "a")
+    time.sleep(1.1)  # gzip headers used to carry the current second
+    assert digest(tmp_path / "b") == first
+
+
+def test_records_match_ingestion_shape_and_are_chronological():
+    pairs = list(generate(SyntheticConfig(**CFG)))
+    records = [r for r, _ in pairs]
+    assert set(records[0]) == {
+        "id",
+        "title",
+        "selftext",
+        "author_hash",
+        "created_utc",
+        "num_comments",
+        "subreddit",
+        "claims",
+    }
+    times = [r["created_utc"] for r in records]
+    assert times == sorted(times)
+    assert 1_700_000_000 <= times[0] and times[-1] <= 1_700_000_000 + 12 * 86400
+    assert len({r["id"] for r in records}) == len(records)
+
+
+def test_cluster_size_is_validated(monkeypatch, capsys):
+    for bad in [(0, 3), (5, 4)]:
+        with pytest.raises(ValueError, match="cluster_size"):
+            SyntheticConfig(cluster_size=bad)
+
+    monkeypatch.setattr(
+        sys, "argv", ["synthetic", "--posts", "50", "--cluster-min", "0", "--cluster-max", "3"]
+    )
+    with pytest.raises(SystemExit) as exc:
+        synthetic.main()
+    assert exc.value.code == 2
+    assert "1 <= min <= max" in capsys.readouterr().err
+
+
+def test_ground_truth_follows_knobs():
+    cfg = SyntheticConfig(**CFG, echo_fraction=0.3, cluster_size=(4, 6), keyword_density=0.2)
+    truths = [t for _, t in generate(cfg)]
+    echo = [t for t in truths if t["cluster"]]
+    assert 0.25 < len(echo) / len(truths) < 0.35
+    sizes = Counter(t["cluster"] for t in echo)
+    # clusters still open when generation stops may be short
+    assert sum(4 <= n <= 6 for n in sizes.values()) >= len(sizes) - cfg.max_open_clusters
+    assert max(sizes.values()) <= 6
+    planted = [t for t in truths if t["keywords"]]
+    assert 0.15 < len(planted) / len(truths) < 0.25
+
+
+def test_planted_keywords_appear_in_text():
+    cfg = SyntheticConfig(**CFG, keyword_density=0.5)
+    for record, truth in generate(cfg):
+        for kw in truth["keywords"]:
+            assert kw in HALLUCINATION_KEYWORDS
+            assert kw in record["selftext"]
+
+
+def test_zero_noise_echoes_are_exact_copies():
+    cfg = SyntheticConfig(**CFG, echo_fraction=1.0, paraphrase_noise=0.0, keyword_density=0.0)
+    texts = {}
+    for record, truth in generate(cfg):
+        texts.setdefault(truth["cluster"], set()).add(record["selftext"])
+    assert all(len(v) == 1 for v in texts.values())
+
+
+def test_write_corpus_streams_and_round_trips(tmp_path):
+    summary = write_corpus(tmp_path, SyntheticConfig(**CFG))
+    assert summary["posts"] == 2000
+    assert summary["subreddits"] == 5
+    truth = list(iter_records(str(tmp_path / "ground_truth.*ndjson*")))
+    assert len(truth) == 2000
+    assert sum(1 for t in truth if t["cluster"]) == summary["echo_posts"]
+    corpus = load_corpus(str(tmp_path / "*_threads*"))
+    assert sum(len(v) for v in corpus.values()) == 2000
+
+
+def test_scraper_mock_posts_use_generator():
+    scraper = RedditScraper(RedditConfig(client_id="", client_secret="", mock_posts=50))
+    posts = scraper.scrape_posts(["alpha", "beta"])
+    assert len(posts) == 100
+    assert {p["subreddit"] for p in posts} == {"alpha", "beta"}
+    assert all(p["full_text"].startswith(p["title"]) for p in posts)
@@ -2,12 +2,14 @@ import tempfile
 import os
 import json
 import pytest
+from agents.jules import schema_validator
+from agents.jules.schema_validator import SchemaValidationError
 from agents.provenance import emitevent
 from agents.jules.io_utils import sha256_hex_of_obj, ensure_dir
 
 
 @pytest.fixture
-def setup_prov_schema(tmp_path):
+def setup_prov_schema(tmp_path, monkeypatch):
     schema_dir = tmp_path / ".github"
     ensure_dir(schema_dir)
     schema_path = schema_dir / "PROVENANCE_SCHEMA.json"
@@ -38,6 +40,10 @@ def setup_prov_schema(tmp_path):
             },
             f,
         )
+    monkeypatch.setenv("LLM_ECHO_PROVENANCE_SCHEMA", str(schema_path))
+    schema_validator.reset_cache()
+    yield schema_path
+    schema_validator.reset_cache()
 
 
 def test_emitevent_writes_bundle(tmp_path, monkeypatch, setup_prov_schema):
@@ -58,3 +64,14 @@ def test_emitevent_writes_bundle(tmp_path, monkeypatch, setup_prov_schema):
     b = json.loads(bundle_path.read_text())
     assert b["module"] == "test_module"
     assert b["eventtype"] == "test_event"
+
+
+def test_emitevent_uses_the_configured_schema(tmp_path, monkeypatch, setup_prov_schema):
+    monkeypatch.chdir(tmp_path)
+    schema = json.loads(setup_prov_schema.read_text())
+    schema["required"].append("runid")
+    setup_prov_schema.write_text(json.dumps(schema))
+    schema_validator.reset_cache()
+
+    with pytest.raises(SchemaValidationError, match="runid"):
+        emitevent("test_module", "test_event", {"foo": "bar"})
@@ -0,0 +1,112 @@
+"""Unit tests for audit PR template generation"""
+
+import pytest
+
+from jules.core.audit_pr import AuditPRGenerator
+
+
+class TestAuditPRGenerator:
+    """Test audit template rendering and writing"""
+
+    @pytest.fixture
+    def generator(self, tmp_path):
+        """Create generator writing to a temporary directory"""
+        return AuditPRGenerator(output_dir=str(tmp_path / "templates"), workers=4)
+
+    def flagged_post(self, post_id, timestamp="2024-01-01T00:00:00+00:00", **extra):
+        return {
+            "post": {"id": post_id, "title": f"Post {post_id}", "subreddit": "test"},
+            "hallucination_score": 0.8,
+            "hallucination_flags": ["buzzwords"],
+            "echo_score": 0.6,
+            "echo_chains": [{"id": f"c{i}", "similarity": 0.9} for i in range(7)],
+            "timestamp": timestamp,
+            **extra,
+        }
+
+    def test_renders_report(self, generator):
+        """Test the rendered sections"""
+        (path,) = generator.generate_prs([self.flagged_post("abc")])
+        text = open(path).read()
+
+        assert text.startswith("# Audit Report: Post abc\n")
+        assert "- **Post ID**: abc\n" in text
+        assert "- **URL**: N/A\n" in text
+        assert "**Specific Flags:**\n- buzzwords\n\n### Echo Chain Analysis" in text
+        assert "5. Similar to post `c4` (similarity: 0.90)\n\n## Community" in text
+        assert "`c5`" not in text
+        assert text.endswith(
+            "**Audit Timestamp**: 2024-01-01T00:00:00+00:00\n"
+            "**Jules Version**: 0.1.0\n"
+            "**Detection Method**: Automated analysis with human verification required\n"
+        )
+
+    def test_unchanged_reports_are_skipped(self, generator):
+        """Test content-addressed names ignore the audit timestamp"""
+        posts = [self.flagged_post(str(i)) for i in range(20)]
+        first = generator.generate_prs(posts)
+        assert len(set(first)) == 20
+        assert generator.last_run == {"written": 20, "unchanged": 0}
+
+        rerun = [
+            self.flagged_post(str(i), timestamp="2025-06-01T00:00:00+00:00") for i in range(20)
+        ]
+        rerun[3]["echo_score"] = 0.7
+        second = generator.generate_prs(rerun)
+
+        assert generator.last_run == {"written": 1, "unchanged": 19}
+        assert second[:3] == first[:3] and second[3] != first[3]
+        assert "2024-01-01" in open(second[0]).read()
+        assert sorted(p.name for p in generator.output_dir.iterdir()) == sorted(
+            {p.rsplit("/", 1)[1] for p in first + second}
+        )
+
+    def test_duplicate_posts_in_one_batch(self, generator):
+        """Test identical reports in one call are written once"""
+        paths = generator.generate_prs([self.flagged_post("x"), self.flagged_post("x")])
+
+        assert paths[0] == paths[1]
+        assert generator.last_run == {"written": 1, "unchanged": 1}
+
+    def test_digest_keeps_top_posts_per_group(self, generator):
+        """Test the digest groups, ranks and paginates a stream of posts"""
+
+        def stream():
+            for i in range(1000):
+                chains = [{"id": "a0"}] if i % 2 else []
+                yield {
+                    "post": {"id": f"p{i:04d}", "subreddit": "test", "title": "x | y"},
+                    "hallucination_score": (i % 100) / 100,
+                    "hallucination_flags": [],
+                    "echo_score": 0.5,
+                    "echo_chains": chains,
+                }
+
+        paths = generator.generate_digest(stream(), top_n=3, page_size=4)
+        assert len(paths) == 2
+        assert len(list(generator.output_dir.glob("audit_template_*.md"))) == 0
+
+        first, second = (open(p).read() for p in paths)
+        assert first.startswith("# Audit Digest (page 1 of 2)\n")
+        assert "- **Flagged Posts**: 1000\n" in first
+        assert "## r/test: echo cluster `a0`\n\n500 flagged, top 3 shown" in first
+        assert "## r/test: (no echo chain)\n\n500 flagged, top 3 shown" in second
+        rows = [line for line in first.splitlines() if line.startswith("| 1.")]
+        assert rows[0] == "| 1.49 | 0.99 | 0.50 | [p0099](#) | x \\| y | u/N/A |  |"
+        assert [r.split("[")[1][:5] for r in rows] == ["p0099", "p0199", "p0299", "p0098"]
+
+    def test_digest_merges_linked_echo_clusters(self, generator):
+        """Test posts linked through echo chains end up in one cluster"""
+        posts = [
+            self.flagged_post("p2", echo_chains=[{"id": "p9"}]),
+            self.flagged_post("p5", echo_chains=[{"id": "p9"}]),
+            self.flagged_post("p7", echo_chains=[{"id": "p8"}]),
+            self.flagged_post("p1", echo_chains=[{"id": "p5"}]),
+        ]
+        (path,) = generator.generate_digest(iter(posts), top_n=2)
+        text = open(path).read()
+
+        assert "- **Groups**: 2 (subreddit, echo cluster)\n" in text
+        assert "## r/test: echo cluster `p1`\n\n3 flagged, top 2 shown" in text
+        assert "## r/test: echo cluster `p7`\n\n1 flagged, top 1 shown" in text
+        assert "`p2`" not in text
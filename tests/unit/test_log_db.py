@@ -0,0 +1,98 @@
+"""Unit tests for the SQLite provenance log backend"""
+
+import json
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from jules.core.config import ProvenanceConfig
+from jules.core.log_query import QueryFilter
+from jules.core.provenance import ProvenanceLogger
+
+
+def flagged(i, subreddit="test", author="u"):
+    return {
+        "post": {"id": f"p{i}", "subreddit": subreddit, "author": author, "title": "t"},
+        "hallucination_score": i / 10,
+        "hallucination_flags": ["buzzwords"] if i % 2 else [],
+        "echo_score": 0.5,
+        "echo_chains": [],
+    }
+
+
+class TestSQLiteBackend:
+    """Test ProvenanceLogger with log_format sqlite"""
+
+    @pytest.fixture
+    def logger(self, tmp_path):
+        """Create a logger writing to SQLite"""
+        return ProvenanceLogger(ProvenanceConfig(log_dir=str(tmp_path), log_format="sqlite"))
+
+    def test_statistics_match_jsonl_backend(self, logger, tmp_path):
+        """Test that SQL statistics agree with the file backend"""
+        files = ProvenanceLogger(ProvenanceConfig(log_dir=str(tmp_path / "files")))
+        posts = [flagged(i, subreddit="ab"[i % 2], author=f"u{i % 3}") for i in range(10)]
+        for backend in (logger, files):
+            backend.log(posts[0])
+            backend.log_many(posts[1:])
+
+        assert list(tmp_path.glob("audit_*.jsonl")) == []
+        sql, scanned = logger.get_statistics(), files.get_statistics()
+        for key in ("total_flagged", "by_subreddit", "by_date", "unique_authors"):
+            assert sql[key] == scanned[key]
+        assert sql["avg_hallucination_score"] == pytest.approx(scanned["avg_hallucination_score"])
+        assert sql["hallucination_score_percentiles"] == {"p50": 0.4, "p90": 0.8, "p99": 0.9}
+        assert sql["unique_posts_by_subreddit"] == {"a": 5, "b": 5}
+        files.close()
+
+    def test_lookups_and_queries_use_indexes(self, logger):
+        """Test find_post, query and that they hit an index"""
+        logger.log_many([flagged(i, subreddit="ab"[i % 2]) for i in range(10)])
+        logger.log(flagged(3))
+
+        assert [e["post_id"] for e in logger.find_post("p3")] == ["p3", "p3"]
+        found = logger.query(QueryFilter(subreddits=["b"], min_hallucination_score=0.5))
+        assert [e["post_id"] for e in found] == ["p5", "p7", "p9"]
+        assert len(logger.query(QueryFilter(flags=["buzzwords"]), limit=2)) == 2
+        assert "USING INDEX entries_post_id" in logger.db.explain(
+            "SELECT entry FROM entries WHERE post_id = ?", ("p3",)
+        )
+        assert "USING INDEX entries_subreddit" in logger.db.explain(
+            "SELECT entry FROM entries WHERE subreddit = ? AND timestamp >= ?", ("a", "2024")
+        )
+        for column in ("hallucination_score", "echo_score"):
+            plan = logger.db.explain(
+                f"SELECT {column} FROM entries ORDER BY {column} LIMIT 1 OFFSET ?", (3,)
+            )
+            assert f"entries_{column}" in plan and "TEMP B-TREE" not in plan
+
+    def test_cleanup_deletes_old_entries(self, logger):
+        """Test retention on the SQLite backend"""
+        logger.log(flagged(1))
+        old = (datetime.now(timezone.utc) - timedelta(days=100)).isoformat()
+        logger.db.insert_many([{"timestamp": old, "post_id": "old", "subreddit": "x"}])
+
+        assert logger.cleanup_old_logs(days=90) == 1
+        assert logger.get_statistics()["total_flagged"] == 1
+
+    def test_import_jsonl_logs(self, tmp_path):
+        """Test migrating existing JSONL logs, including repeated imports"""
+        source = tmp_path / "jsonl"
+        files = ProvenanceLogger(ProvenanceConfig(log_dir=str(source)))
+        files.log_many([flagged(i) for i in range(5)])
+        files.close()
+        with open(next(source.glob("audit_*.jsonl")), "a") as f:
+            f.write("not json\n")
+
+        db_logger = ProvenanceLogger(
+            ProvenanceConfig(log_dir=str(tmp_path / "db"), log_format="sqlite")
+        )
+        assert db_logger.import_logs(source) == 5
+        assert db_logger.import_logs(source) == 0
+        assert db_logger.get_statistics()["total_flagged"] == 5
+        assert db_logger.find_post("p2")[0] == json.loads(
+            next(source.glob("audit_*.jsonl")).read_text().splitlines()[2]
+        )
+
+        with pytest.raises(ValueError):
+            files.import_logs(source)
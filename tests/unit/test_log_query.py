@@ -0,0 +1,79 @@
+"""Unit tests for filtered log queries"""
+
+import csv
+import io
+import json
+
+import pytest
+
+from jules.core.config import ProvenanceConfig
+from jules.core.log_query import QueryFilter, to_csv, to_json
+from jules.core.provenance import ProvenanceLogger
+
+
+class TestLogQuery:
+    """Test query filters and segment skipping"""
+
+    @pytest.fixture
+    def logger(self, tmp_path):
+        """Create a logger over a week of logs, one subreddit per day"""
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        subreddits = ["llmphysics", "ArtificialSentience", "singularity"]
+        for day in range(1, 8):
+            with open(log_dir / f"audit_202405{day:02d}.jsonl", "w") as f:
+                for i in range(10):
+                    entry = {
+                        "timestamp": f"2024-05-{day:02d}T12:00:{i:02d}+00:00",
+                        "post_id": f"d{day}_{i}",
+                        "subreddit": subreddits[day % 3],
+                        "hallucination_score": 0.5,
+                        "hallucination_flags": ["buzzwords"] + (["no_citation"] if i == 3 else []),
+                        "echo_score": i / 10 if day != 4 else 0.2,
+                    }
+                    f.write(json.dumps(entry) + "\n")
+        return ProvenanceLogger(ProvenanceConfig(log_dir=str(log_dir)))
+
+    def test_filters_and_segment_skipping(self, logger):
+        """Test subreddit, date and score filters and that other files are not read"""
+        found = logger.query(
+            QueryFilter(subreddits=["llmphysics"], since="2024-05-02", min_echo_score=0.6)
+        )
+
+        assert {e["post_id"][:2] for e in found} == {"d3", "d6"}
+        assert all(e["echo_score"] >= 0.6 for e in found)
+        assert len(found) == 8
+        assert logger.last_query == {"files": 7, "scanned": 2}
+
+    def test_time_range_and_score_skip_files(self, logger):
+        """Test that the segment index rules out files by time and max score"""
+        found = logger.query(QueryFilter(since="2024-05-03", until="2024-05-05"))
+        assert {e["post_id"][:2] for e in found} == {"d3", "d4"}
+        assert logger.last_query["scanned"] == 2
+
+        logger.query(QueryFilter(min_echo_score=0.5, until="2024-05-05"))
+        assert logger.last_query["scanned"] == 3
+
+    def test_flags_and_limit(self, logger):
+        """Test that every requested flag must be set and that limit stops the scan"""
+        found = logger.query(QueryFilter(flags=["buzzwords", "no_citation"]))
+        assert [e["post_id"] for e in found] == [f"d{day}_3" for day in range(1, 8)]
+        assert logger.query(QueryFilter(flags=["unknown"])) == []
+        assert logger.last_query["scanned"] == 0
+        assert len(logger.query(QueryFilter(), limit=15)) == 15
+
+    def test_index_follows_appends(self, logger, tmp_path):
+        """Test that entries appended after a query are found by the next one"""
+        assert logger.query(QueryFilter(subreddits=["new"])) == []
+        with open(tmp_path / "logs" / "audit_20240507.jsonl", "a") as f:
+            f.write(json.dumps({"timestamp": "2024-05-07T13:00:00", "subreddit": "new"}) + "\n")
+        assert len(logger.query(QueryFilter(subreddits=["new"]))) == 1
+
+    def test_output_formats(self, logger):
+        """Test JSON and CSV output"""
+        found = logger.query(QueryFilter(flags=["no_citation"]), limit=2)
+        assert json.loads(to_json(found)) == found
+
+        rows = list(csv.DictReader(io.StringIO(to_csv(found))))
+        assert [r["post_id"] for r in rows] == ["d1_3", "d2_3"]
+        assert rows[0]["hallucination_flags"] == "buzzwords;no_citation"
@@ -0,0 +1,97 @@
+"""Unit tests for the parallel log scanner"""
+
+import json
+
+import pytest
+
+from jules.core.config import ProvenanceConfig
+from jules.core.log_scanner import Aggregator, LogScanner, split_chunks
+from jules.core.provenance import ROLLUP_VERSION, ProvenanceLogger, compress_log
+
+
+class MaxScoreAggregator(Aggregator):
+    """Highest echo score per subreddit"""
+
+    def create(self):
+        return {}
+
+    def add(self, state, entry):
+        sr = entry.get("subreddit", "unknown")
+        state[sr] = max(state.get(sr, 0.0), entry.get("echo_score", 0.0))
+        return state
+
+    def merge(self, state, other):
+        for sr, score in other.items():
+            state[sr] = max(state.get(sr, 0.0), score)
+        return state
+
+
+class TestLogScanner:
+    """Test chunked and parallel log scanning"""
+
+    @pytest.fixture
+    def log_dir(self, tmp_path):
+        """Create a few days of logs, with a blank and an unreadable line"""
+        log_dir = tmp_path / "logs"
+        log_dir.mkdir()
+        for day in range(3):
+            lines = [
+                json.dumps(
+                    {
+                        "timestamp": f"2024-05-0{day + 1}T00:00:{i:02d}+00:00",
+                        "subreddit": ["a", "b", "c"][i % 3],
+                        "hallucination_score": i / 100,
+                        "echo_score": (i * 7 % 50) / 50,
+                    }
+                )
+                for i in range(50)
+            ]
+            lines.insert(10, "")
+            lines.insert(20, '{"broken": ')
+            (log_dir / f"audit_2024050{day + 1}.jsonl").write_text("\n".join(lines) + "\n")
+        return log_dir
+
+    def test_chunks_end_on_newlines(self, log_dir):
+        """Test that chunks cover the file and never split a line"""
+        path = str(sorted(log_dir.glob("*.jsonl"))[0])
+        with open(path, "rb") as f:
+            data = f.read()
+        chunks = split_chunks(path, chunk_bytes=500)
+
+        assert len(chunks) > 5
+        assert chunks[0][1] == 0 and chunks[-1][2] == len(data)
+        for (_, _, end), (_, start, _) in zip(chunks, chunks[1:]):
+            assert end == start and data[end - 1 : end] == b"\n"
+
+    def test_parallel_scan_matches_serial_and_statistics(self, log_dir):
+        """Test that every worker count gives the get_statistics result"""
+        expected = ProvenanceLogger(ProvenanceConfig(log_dir=str(log_dir))).get_statistics()
+        serial = LogScanner(workers=1, chunk_bytes=300).scan_dir(log_dir)
+        parallel = LogScanner(workers=2, chunk_bytes=300).scan_dir(log_dir)
+
+        assert expected["total_flagged"] == 150
+        for stats in (serial, parallel):
+            assert stats["total_flagged"] == expected["total_flagged"]
+            assert stats["by_subreddit"] == expected["by_subreddit"]
+            assert stats["by_date"] == expected["by_date"]
+            assert stats["avg_echo_score"] == pytest.approx(expected["avg_echo_score"])
+
+    def test_scan_dir_reads_compressed_logs(self, log_dir):
+        """Test that the default pattern includes gzipped segments"""
+        compress_log(sorted(log_dir.glob("*.jsonl"))[0])
+        assert LogScanner(workers=1).scan_dir(log_dir)["total_flagged"] == 150
+
+    def test_custom_aggregator(self, log_dir):
+        """Test that a new statistic reuses the scan path"""
+        result = LogScanner(MaxScoreAggregator(), workers=2, chunk_bytes=400).scan_dir(log_dir)
+        assert result == {"a": 0.94, "b": 0.98, "c": 0.96}
+
+    def test_rescan_statistics(self, log_dir):
+        """Test the ProvenanceLogger entry point, which ignores the rollups"""
+        logger = ProvenanceLogger(ProvenanceConfig(log_dir=str(log_dir)))
+        assert logger.get_statistics()["total_flagged"] == 150
+        logger.rollup_path.write_text(json.dumps({"version": ROLLUP_VERSION, "files": {}}))
+
+        stats = logger.rescan_statistics(workers=1)
+        assert stats["total_flagged"] == 150
+        assert set(stats["by_date"]) == {"2024-05-01", "2024-05-02", "2024-05-03"}
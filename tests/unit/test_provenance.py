@@ -83,3 +83,271 @@ class TestProvenanceLogger:
 
         assert deleted == 1, "Should delete 1 old log file"
         assert not old_file.exists(), "Old file should be deleted"
+
+    def test_find_post_with_and_without_index(self, temp_log_dir, sample_flagged_post):
+        """Test post lookup through the provenance index and by scanning"""
+        indexed = ProvenanceLogger(
+            ProvenanceConfig(
+                log_dir=str(temp_log_dir), index_path=str(temp_log_dir / "index.sqlite")
+            )
+        )
+        indexed.log(sample_flagged_post)
+        other = dict(sample_flagged_post, post=dict(sample_flagged_post["post"], id="other"))
+        indexed.log(other)
+
+        found = indexed.find_post("test123")
+        assert len(found) == 1
+        assert found[0]["post_id"] == "test123"
+
+        scanning = ProvenanceLogger(ProvenanceConfig(log_dir=str(temp_log_dir)))
+        assert scanning.find_post("test123") == found
+
+    def test_async_writes_match_sync_output(self, tmp_path, sample_flagged_post):
+        """Test that background writing produces the same log lines"""
+        sync_dir, async_dir = tmp_path / "sync", tmp_path / "async"
+        sync_logger = ProvenanceLogger(ProvenanceConfig(log_dir=str(sync_dir)))
+        async_logger = ProvenanceLogger(ProvenanceConfig(log_dir=str(async_dir), async_writes=True))
+
+        for i in range(20):
+            post = dict(sample_flagged_post, post=dict(sample_flagged_post["post"], id=f"p{i}"))
+            sync_logger.log(post)
+            async_logger.log(post)
+
+        assert async_logger.get_statistics()["total_flagged"] == 20
+        async_logger.close()
+
+        def strip_ts(path):
+            return [
+                {k: v for k, v in json.loads(line).items() if k != "timestamp"}
+                for line in path.read_text().splitlines()
+            ]
+
+        (sync_file,) = sync_dir.glob("audit_*.jsonl")
+        (async_file,) = async_dir.glob("audit_*.jsonl")
+        assert strip_ts(sync_file) == strip_ts(async_file)
+
+    def test_buffered_writes_match_write_through(self, tmp_path, sample_flagged_post):
+        """Test that buffered and batched logging write the same bytes as per-entry logging"""
+        posts = [
+            dict(sample_flagged_post, post=dict(sample_flagged_post["post"], id=f"p{i}"))
+            for i in range(30)
+        ]
+        direct = ProvenanceLogger(ProvenanceConfig(log_dir=str(tmp_path / "direct")))
+        buffered = ProvenanceLogger(
+            ProvenanceConfig(
+                log_dir=str(tmp_path / "buffered"), flush_bytes=1 << 20, flush_interval=3600
+            )
+        )
+        for post in posts[:10]:
+            direct.log(post)
+            buffered.log(post)
+        assert len(direct.log_many(posts[10:])) == 20
+        buffered.log_many(posts[10:])
+
+        (buffered_file,) = (tmp_path / "buffered").glob("audit_*.jsonl")
+        assert buffered_file.read_text() == ""
+        buffered.flush()
+
+        def strip_ts(path):
+            return [line.split('"post_id"', 1)[1] for line in path.read_text().splitlines()]
+
+        (direct_file,) = (tmp_path / "direct").glob("audit_*.jsonl")
+        assert strip_ts(direct_file) == strip_ts(buffered_file)
+        assert buffered.get_statistics()["total_flagged"] == 30
+        buffered.close()
+
+    def test_flush_interval_writes_idle_buffer(self, tmp_path, sample_flagged_post):
+        """Test that buffered lines reach disk after flush_interval without another write"""
+        import time
+
+        logger = ProvenanceLogger(
+            ProvenanceConfig(log_dir=str(tmp_path), flush_bytes=1 << 20, flush_interval=0.5)
+        )
+        log_path = Path(logger.log(sample_flagged_post))
+        deadline = time.monotonic() + 5
+        while not log_path.read_text() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert json.loads(log_path.read_text())["post_id"] == "test123"
+
+        flusher = logger._flusher
+        logger.close()
+        assert not flusher.is_alive()
+
+    def test_log_rolls_over_at_utc_midnight(self, temp_log_dir, sample_flagged_post, monkeypatch):
+        """Test that the open log file changes with the UTC date"""
+        import jules.core.provenance as provenance_module
+
+        now = [datetime(2024, 5, 1, 23, 59, 59, tzinfo=timezone.utc)]
+
+        class FakeDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return now[0]
+
+        monkeypatch.setattr(provenance_module, "datetime", FakeDatetime)
+        logger = ProvenanceLogger(
+            ProvenanceConfig(log_dir=str(temp_log_dir), flush_bytes=1 << 20, flush_interval=3600)
+        )
+        first = logger.log(sample_flagged_post)
+        now[0] += timedelta(seconds=2)
+        second = logger.log_many([sample_flagged_post, sample_flagged_post])[0]
+        logger.close()
+
+        assert Path(first).name == "audit_20240501.jsonl"
+        assert Path(second).name == "audit_20240502.jsonl"
+        assert len(Path(first).read_text().splitlines()) == 1
+        assert len(Path(second).read_text().splitlines()) == 2
+
+    def test_statistics_parse_only_appended_bytes(self, logger, sample_flagged_post, monkeypatch):
+        """Test that statistics reuse per-file rollups and parse appended lines only"""
+        import jules.core.provenance as provenance_module
+
+        for _ in range(3):
+            logger.log(sample_flagged_post)
+        first = logger.get_statistics()
+        assert first["total_flagged"] == 3
+        assert logger.rollup_path.exists()
+
+        parsed = []
+        real_loads = json.loads
+
+        def counting_loads(s, **kwargs):
+            if isinstance(s, bytes):  # log lines; the sidecar is read as text
+                parsed.append(s)
+            return real_loads(s, **kwargs)
+
+        monkeypatch.setattr(provenance_module.json, "loads", counting_loads)
+        assert logger.get_statistics() == first
+        assert parsed == []
+
+        other = dict(sample_flagged_post, post=dict(sample_flagged_post["post"], subreddit="other"))
+        logger.log(other)
+        with open(logger._file_path, "a") as f:
+            f.write('{"subreddit": "torn"')  # line still being written
+        stats = logger.get_statistics()
+        assert len(parsed) == 1
+        assert stats["total_flagged"] == 4
+        assert stats["by_subreddit"] == {"test": 3, "other": 1}
+        assert stats["avg_hallucination_score"] == pytest.approx(0.8)
+
+    def test_statistics_of_open_segment_are_kept_while_logging(
+        self, logger, sample_flagged_post, monkeypatch
+    ):
+        """Test that entries logged to the open segment are not parsed back for statistics"""
+        import jules.core.provenance as provenance_module
+
+        logger.log(sample_flagged_post)
+        assert logger.get_statistics()["total_flagged"] == 1
+
+        parsed = []
+        real_loads = json.loads
+
+        def counting_loads(s, **kwargs):
+            if isinstance(s, bytes):
+                parsed.append(s)
+            return real_loads(s, **kwargs)
+
+        monkeypatch.setattr(provenance_module.json, "loads", counting_loads)
+        logger.log_many(
+            [
+                dict(sample_flagged_post, post=dict(sample_flagged_post["post"], id=f"p{i}"))
+                for i in range(4)
+            ]
+        )
+        stats = logger.get_statistics()
+        assert parsed == []
+        assert stats["total_flagged"] == 5
+        assert stats["unique_posts_by_subreddit"] == {"test": 5}
+
+        monkeypatch.undo()
+        logger.rollup_path.unlink()
+        assert logger.rescan_statistics(workers=1) == stats
+
+    def test_rollups_follow_rewrites_and_cleanup(self, logger, temp_log_dir, sample_flagged_post):
+        """Test that rewritten files are rescanned and deleted files lose their rollup"""
+        old_date = (datetime.now(timezone.utc) - timedelta(days=100)).strftime("%Y%m%d")
+        old_file = temp_log_dir / f"audit_{old_date}.jsonl"
+        old_file.write_text(json.dumps({"subreddit": "old", "timestamp": "2000-01-01"}) + "\n")
+        path = Path(logger.log(sample_flagged_post))
+        assert logger.get_statistics()["total_flagged"] == 2
+
+        logger.close()
+        path.write_text("")
+        assert logger.get_statistics()["by_subreddit"] == {"old": 1}
+
+        assert logger.cleanup_old_logs(days=90) == 1
+        rollups = json.loads(logger.rollup_path.read_text())["files"]
+        assert old_file.name not in rollups
+        assert logger.get_statistics()["total_flagged"] == 0
+
+    def test_size_rotation_and_compression(self, tmp_path, sample_flagged_post):
+        """Test that busy days rotate into segments and closed ones are gzipped"""
+        from jules.core.provenance import parse_log_name
+
+        log_dir = tmp_path / "rotating"
+        logger = ProvenanceLogger(
+            ProvenanceConfig(log_dir=str(log_dir), max_file_bytes=2000, compress_closed=True)
+        )
+        posts = [
+            dict(sample_flagged_post, post=dict(sample_flagged_post["post"], id=f"p{i}"))
+            for i in range(20)
+        ]
+        paths = logger.log_many(posts[:10]) + [logger.log(post) for post in posts[10:]]
+        logger.close()
+
+        assert len(set(paths)) > 2
+        names = sorted(p.name for p in log_dir.glob("audit_*"))
+        assert sum(name.endswith(".jsonl.gz") for name in names) == len(set(paths)) - 1
+        assert sum(name.endswith(".jsonl") for name in names) == 1
+
+        stats = logger.get_statistics()
+        assert stats["total_flagged"] == 20
+        assert [e["post_id"] for e in logger.find_post("p15")] == ["p15"]
+        assert logger.rescan_statistics(workers=1)["total_flagged"] == 20
+
+        # a new logger continues the last plain segment of the day
+        again = ProvenanceLogger(ProvenanceConfig(log_dir=str(log_dir), max_file_bytes=1 << 20))
+        assert again.log(posts[0]) == paths[-1]
+        again.close()
+
+        # ... unless it is already full
+        full = ProvenanceLogger(ProvenanceConfig(log_dir=str(log_dir), max_file_bytes=100))
+        next_path = full.log(posts[0])
+        full.close()
+        assert next_path != paths[-1]
+        assert parse_log_name(next_path)[1] == parse_log_name(paths[-1])[1] + 1
+
+    def test_statistics_survive_compression_during_refresh(self, logger, temp_log_dir):
+        """Test that a segment gzipped between listing and rollup is read as its .gz"""
+        from jules.core.provenance import compress_log
+
+        line = json.dumps({"subreddit": "old", "timestamp": "2024-05-01T00:00:00+00:00"}) + "\n"
+        (temp_log_dir / "audit_20240501.jsonl").write_text(line)
+        (temp_log_dir / "audit_20240502.jsonl").write_text(line)
+        rollup = logger._rollup
+
+        def compress_first(log_file, cached=None):
+            if log_file.name == "audit_20240501.jsonl":
+                compress_log(log_file)
+            return rollup(log_file, cached)
+
+        logger._rollup = compress_first
+        assert logger.get_statistics()["total_flagged"] == 2
+        assert (temp_log_dir / "audit_20240501.jsonl.gz").exists()
+
+    def test_cleanup_handles_segments_and_compressed_logs(self, logger, temp_log_dir):
+        """Test that every segment of an expired day is deleted and names are parsed"""
+        from jules.core.provenance import compress_log, parse_log_name
+
+        old_date = (datetime.now(timezone.utc) - timedelta(days=100)).strftime("%Y%m%d")
+        line = json.dumps({"subreddit": "old", "timestamp": "2000-01-01"}) + "\n"
+        (temp_log_dir / f"audit_{old_date}.jsonl").write_text(line)
+        (temp_log_dir / f"audit_{old_date}.1.jsonl").write_text(line)
+        compress_log(temp_log_dir / f"audit_{old_date}.1.jsonl")
+        assert logger.get_statistics()["total_flagged"] == 2
+
+        assert parse_log_name(f"audit_{old_date}.1.jsonl.gz")[1:] == (1, True)
+        assert parse_log_name("audit_notadate.jsonl") is None
+        assert logger.cleanup_old_logs(days=90) == 2
+        assert list(temp_log_dir.glob("audit_*")) == []
+        assert json.loads(logger.rollup_path.read_text())["files"] == {}
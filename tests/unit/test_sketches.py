@@ -0,0 +1,115 @@
+"""Unit tests for streaming sketches"""
+
+import random
+
+import pytest
+
+from jules.core.config import ProvenanceConfig
+from jules.core.provenance import ProvenanceLogger
+from jules.core.sketches import HyperLogLog, TDigest
+
+
+class TestTDigest:
+    """Test t-digest quantile estimates"""
+
+    def test_quantiles_close_to_exact(self):
+        """Test accuracy on a skewed distribution, including the tails"""
+        rng = random.Random(0)
+        values = [rng.random() ** 3 for _ in range(20000)]
+        digest = TDigest()
+        for v in values:
+            digest.add(v)
+
+        exact = sorted(values)
+        for q in (0.01, 0.5, 0.9, 0.99):
+            assert digest.quantile(q) == pytest.approx(exact[int(q * len(exact))], abs=0.01)
+        assert len(digest.to_dict()["means"]) < 200
+
+    def test_merged_digests_match_a_single_one(self):
+        """Test that per-worker digests merge into the same answer"""
+        rng = random.Random(1)
+        values = [rng.gauss(0, 1) for _ in range(9000)]
+        whole, parts = TDigest(), [TDigest() for _ in range(3)]
+        for i, v in enumerate(values):
+            whole.add(v)
+            parts[i % 3].add(v)
+        merged = TDigest()
+        for part in parts:
+            merged.merge(TDigest.from_dict(part.to_dict()))
+
+        assert merged.count == 9000
+        for q in (0.1, 0.5, 0.95):
+            assert merged.quantile(q) == pytest.approx(whole.quantile(q), abs=0.05)
+
+    def test_edge_cases(self):
+        """Test empty and single-value digests"""
+        assert TDigest().quantile(0.5) is None
+        assert TDigest.from_dict(TDigest().to_dict()).quantile(0.5) is None
+        digest = TDigest()
+        digest.add(0.7)
+        assert digest.quantile(0.99) == 0.7
+
+
+class TestHyperLogLog:
+    """Test distinct count estimates"""
+
+    def test_count_within_error(self):
+        """Test small (exact-ish) and large cardinalities"""
+        small, large = HyperLogLog(), HyperLogLog()
+        for i in range(20):
+            small.add(f"user{i}")
+            small.add(f"user{i}")
+        for i in range(50000):
+            large.add(f"user{i}")
+
+        assert small.count() == 20
+        assert large.count() == pytest.approx(50000, rel=0.1)
+
+    def test_merge_is_a_union(self):
+        """Test that merging overlapping sketches counts the union"""
+        a, b = HyperLogLog(), HyperLogLog()
+        for i in range(3000):
+            a.add(i)
+        for i in range(2000, 5000):
+            b.add(i)
+        restored = HyperLogLog.from_dict(b.to_dict())
+
+        assert a.copy().merge(restored).count() == pytest.approx(5000, rel=0.1)
+        with pytest.raises(ValueError):
+            a.merge(HyperLogLog(p=12))
+
+
+class TestSketchStatistics:
+    """Test sketches surfaced through get_statistics"""
+
+    def test_statistics_include_percentiles_and_distinct_counts(self, tmp_path):
+        """Test values and that they survive the rollup sidecar"""
+        logger = ProvenanceLogger(ProvenanceConfig(log_dir=str(tmp_path)))
+        posts = [
+            {
+                "post": {
+                    "id": f"p{i % 50}",
+                    "subreddit": "a" if i % 2 else "b",
+                    "author": f"u{i % 7}",
+                },
+                "hallucination_score": i / 100,
+                "hallucination_flags": [],
+                "echo_score": 0.5,
+                "echo_chains": [],
+            }
+            for i in range(100)
+        ]
+        logger.log_many(posts[:60])
+        first = logger.get_statistics()
+        logger.log_many(posts[60:])
+        stats = logger.get_statistics()
+
+        assert first["total_flagged"] == 60
+        assert stats["hallucination_score_percentiles"]["p50"] == pytest.approx(0.5, abs=0.02)
+        assert stats["echo_score_percentiles"] == {"p50": 0.5, "p90": 0.5, "p99": 0.5}
+        assert stats["unique_authors"] == 7
+        assert stats["unique_posts_by_subreddit"] == {"a": 25, "b": 25}
+        assert logger.rescan_statistics(workers=1)["unique_authors_by_subreddit"] == (
+            stats["unique_authors_by_subreddit"]
+        )
+        logger.close()